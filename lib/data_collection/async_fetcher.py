@@ -0,0 +1,181 @@
+import time
+import random
+import asyncio
+
+from urllib.parse import urlsplit
+from typing import AsyncIterator, Dict, Iterable, Optional, Tuple, TYPE_CHECKING
+
+from lib.data_collection.http_cache import CachedResponse, HttpCache
+
+if TYPE_CHECKING:
+    import httpx
+
+
+# Status codes worth retrying as they are usually temporary server side issues
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = 1):
+        """
+        Token bucket rate limiter. Tokens are added at a constant rate up to the bucket capacity and each request
+        consumes one token, so the requests are spread over time while short bursts up to the capacity are allowed.
+        :param rate: The number of tokens added per second
+        :param capacity: The maximum number of tokens in the bucket
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and consume it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncFetcher:
+    def __init__(self, http_cache: Optional[HttpCache] = None, max_connections: int = 20,
+                 per_host_concurrency: int = 8, per_host_rate: float = 5, per_host_burst: float = 5,
+                 max_retries: int = 3, backoff_base: float = 0.5, timeout: float = 30):
+        """
+        Asynchronous fetch engine used by the web scrapers. All the requests share a pool of keep-alive connections,
+        the number of concurrent requests and the requests rate are limited per host not to overload the websites, and
+        the failed requests are retried with an exponential backoff with jitter.
+        :param http_cache: The HTTP cache used to look up and store the responses (optional)
+        :param max_connections: The maximum number of connections in the pool
+        :param per_host_concurrency: The maximum number of concurrent requests to the same host
+        :param per_host_rate: The maximum number of requests per second to the same host
+        :param per_host_burst: The maximum burst of requests to the same host
+        :param max_retries: The maximum number of retries of a failed request
+        :param backoff_base: The base delay in seconds of the exponential backoff
+        :param timeout: The requests timeout in seconds
+        """
+        self.http_cache = http_cache
+        self.max_connections = max_connections
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_rate = per_host_rate
+        self.per_host_burst = per_host_burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.client: Optional['httpx.AsyncClient'] = None
+        self._host_limits: Dict[str, Tuple[asyncio.Semaphore, TokenBucket]] = {}
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0}
+
+    async def __aenter__(self) -> 'AsyncFetcher':
+        # httpx is only imported when the fetch engine is used
+        import httpx
+        limits = httpx.Limits(max_connections=self.max_connections,
+                              max_keepalive_connections=self.max_connections)
+        self.client = httpx.AsyncClient(limits=limits, timeout=self.timeout, follow_redirects=True)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+        self.client = None
+
+    def _host_limit(self, url: str) -> Tuple[asyncio.Semaphore, TokenBucket]:
+        """
+        Get the concurrency semaphore and the rate limiter of the host of a URL
+        :param url: The URL to request
+        :return: A tuple containing the host semaphore and token bucket
+        """
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = (asyncio.Semaphore(self.per_host_concurrency),
+                                       TokenBucket(self.per_host_rate, self.per_host_burst))
+        return self._host_limits[host]
+
+    async def _request(self, url: str, headers: Dict[str, str], method: str = 'GET') -> 'httpx.Response':
+        """
+        Send a request, respecting the host limits and retrying the failed requests with a jittered backoff
+        :param url: The URL to request
+        :param headers: The request headers
+        :param method: The HTTP method of the request
+        :return: The response
+        """
+        import httpx
+        semaphore, token_bucket = self._host_limit(url)
+        for attempt in range(self.max_retries + 1):
+            async with semaphore:
+                await token_bucket.acquire()
+                self.stats['requests'] += 1
+                try:
+                    response = await self.client.request(method, url, headers=headers)
+                    if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                        return response
+                except httpx.TransportError:
+                    if attempt == self.max_retries:
+                        self.stats['failures'] += 1
+                        raise
+            # Full jitter exponential backoff, sleeping outside the semaphore to let other requests go through
+            self.stats['retries'] += 1
+            await asyncio.sleep(random.uniform(0, self.backoff_base * 2 ** attempt))
+
+    async def fetch(self, url: str) -> CachedResponse:
+        """
+        Get a URL through the HTTP cache if there is one
+        :param url: The URL to get
+        :return: The cached or downloaded response
+        """
+        conditional_headers = {}
+        if self.http_cache is not None:
+            cached_response, conditional_headers = self.http_cache.lookup(url)
+            if cached_response is not None:
+                return cached_response
+        response = await self._request(url, conditional_headers)
+        encoding = response.encoding or 'utf-8'
+        if self.http_cache is not None:
+            return self.http_cache.update(url, response.status_code, response.content, response.headers, encoding)
+        return CachedResponse(url, response.status_code, response.content, dict(response.headers),
+                              from_cache=False, encoding=encoding)
+
+    async def exists(self, url: str) -> bool:
+        """
+        Cheaply check if a page exists with a HEAD request before downloading it. Pages which are not found are cached
+        negatively in the HTTP cache, so they are not requested again on the next runs.
+        :param url: The URL to check
+        :return: False if the page is not found, True if it exists or if the server does not support HEAD requests
+        """
+        if self.http_cache is not None:
+            cached_response, _ = self.http_cache.lookup(url)
+            if cached_response is not None:
+                return cached_response.status_code != 404
+        response = await self._request(url, {}, method='HEAD')
+        if response.status_code == 404:
+            if self.http_cache is not None:
+                self.http_cache.update(url, 404, b'', response.headers, response.encoding or 'utf-8')
+            return False
+        return True
+
+    async def fetch_all(self, requests: Iterable[Tuple[object, str]]) -> AsyncIterator[Tuple[object, CachedResponse]]:
+        """
+        Fetch all the URLs concurrently and yield the responses as soon as they are received
+        :param requests: An iterable of (key, URL) tuples, the key is used to identify the response
+        :return: An asynchronous iterator of (key, response) tuples in completion order. The response is the
+        exception raised if the URL could not be fetched
+        """
+        import httpx
+
+        async def fetch_with_key(key, url):
+            try:
+                return key, await self.fetch(url)
+            except (httpx.HTTPError, OSError) as e:
+                return key, e
+
+        tasks = [asyncio.create_task(fetch_with_key(key, url)) for key, url in requests]
+        try:
+            for next_completed in asyncio.as_completed(tasks):
+                yield await next_completed
+        finally:
+            for task in tasks:
+                task.cancel()
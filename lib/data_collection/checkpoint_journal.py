@@ -0,0 +1,82 @@
+import json
+import threading
+
+from pathlib import Path
+from typing import Any, Dict
+
+
+class CheckpointJournal:
+    def __init__(self, journal_file: Path):
+        """
+        Append-only journal of the results of a long running collection. Each result is appended to the journal as a
+        JSON line as soon as it is completed, so an interrupted or partially failed collection can be resumed by
+        skipping the results already collected and retrying only the failures. The results are grouped by stage (e.g.
+        the NHPP peak profiles and the PeakVisor peaks) and identified by a key within their stage. When a key is
+        recorded several times, the last record wins.
+        :param journal_file: The path of the journal file
+        """
+        self.journal_file = Path(journal_file)
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Start a new journal, forgetting all the results of the previous collections"""
+        with self._lock:
+            self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+            self.journal_file.write_text('', encoding='utf-8')
+
+    def record(self, stage: str, key: str, result: Any = None, error: str = None):
+        """
+        Append a result or a failure to the journal
+        :param stage: The collection stage of the result
+        :param key: The key of the result within its stage
+        :param result: The result, which must be serializable to JSON
+        :param error: The error message if the result could not be collected
+        """
+        line = json.dumps({"stage": stage, "key": key, "result": result, "error": error}) + '\n'
+        with self._lock:
+            self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+            with self.journal_file.open('ab+') as f:
+                # Start a new line if the last line was truncated by an interrupted collection
+                if f.seek(0, 2) > 0:
+                    f.seek(-1, 2)
+                    if f.read(1) != b'\n':
+                        line = '\n' + line
+                f.write(line.encode('utf-8'))
+                f.flush()
+
+    def _last_records(self, stage: str) -> Dict[str, Dict]:
+        """
+        Read the last record of each key of a stage
+        :param stage: The collection stage
+        :return: A dictionary of the last record of each key
+        """
+        records = {}
+        if not self.journal_file.exists():
+            return records
+        with self._lock, self.journal_file.open('r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line may be truncated if the collection was killed while writing it
+                    continue
+                if record['stage'] == stage:
+                    records[record['key']] = record
+        return records
+
+    def results(self, stage: str) -> Dict[str, Any]:
+        """
+        Get the results successfully collected in a stage
+        :param stage: The collection stage
+        :return: A dictionary of the results by key
+        """
+        return {key: record['result'] for key, record in self._last_records(stage).items() if record['error'] is None}
+
+    def failures(self, stage: str) -> Dict[str, str]:
+        """
+        Get the results which could not be collected in a stage
+        :param stage: The collection stage
+        :return: A dictionary of the error messages by key
+        """
+        return {key: record['error'] for key, record in self._last_records(stage).items()
+                if record['error'] is not None}
@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+
+from pathlib import Path
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import requests
+
+
+class CachedResponse:
+    def __init__(self, url: str, status_code: int, content: bytes, headers: Dict[str, str], from_cache: bool,
+                 encoding: str = 'utf-8'):
+        """
+        Minimal response object returned by the HttpCache. It exposes the same attributes as a requests Response
+        used by the scrapers.
+        :param url: The requested URL
+        :param status_code: The HTTP status code
+        :param content: The response body
+        :param headers: The response headers
+        :param from_cache: True if the response body was served from the cache
+        :param encoding: The encoding of the response body
+        """
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = from_cache
+        self.encoding = encoding
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+
+class CacheMissError(Exception):
+    """Raised in offline mode when a URL has never been cached"""
+
+
+class HttpCache:
+    def __init__(self, cache_dir: Path, max_age: float = 0, not_found_ttl: float = 7 * 24 * 3600,
+                 offline: bool = False, timeout: float = 30, session: 'requests.Session' = None):
+        """
+        Persistent on-disk cache of HTTP GET responses used by the web scrapers. The response bodies are stored once
+        per content hash in the objects folder and each URL has a small JSON metadata entry pointing to its body with
+        the ETag and Last-Modified headers returned by the server. Cached responses are revalidated with conditional
+        GET requests so unchanged pages are not downloaded again. 404 responses are cached negatively for a limited
+        time, so URLs which do not exist are not requested again on each run.
+        :param cache_dir: The folder in which the responses are cached
+        :param max_age: The number of seconds during which a cached response is used without revalidation
+        :param not_found_ttl: The number of seconds during which a 404 response is cached
+        :param offline: If True, only replay the cached responses and never access the network
+        :param timeout: The requests timeout in seconds
+        :param session: The requests session to use. A new session is created if not provided
+        """
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / 'objects'
+        self.entries_dir = self.cache_dir / 'entries'
+        self.max_age = max_age
+        self.not_found_ttl = not_found_ttl
+        self.offline = offline
+        self.timeout = timeout
+        self._session = session
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'not_found_hits': 0}
+
+    @property
+    def session(self) -> 'requests.Session':
+        # requests is only imported when the first page is downloaded, replaying the cache does not need it
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    @staticmethod
+    def _hash(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _entry_path(self, url: str) -> Path:
+        url_hash = self._hash(url.encode('utf-8'))
+        return self.entries_dir / url_hash[:2] / f'{url_hash}.json'
+
+    def _object_path(self, content_hash: str) -> Path:
+        return self.objects_dir / content_hash[:2] / content_hash
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes):
+        """
+        Write a file atomically so that concurrent scraper threads never read a partially written file
+        :param path: The path of the file to write
+        :param data: The data to write
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _read_entry(self, url: str) -> Optional[Dict]:
+        try:
+            with self._entry_path(url).open('r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _read_object(self, content_hash: str) -> Optional[bytes]:
+        try:
+            return self._object_path(content_hash).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _store(self, url: str, status_code: int, content: bytes, headers: Dict[str, str], encoding: str) -> Dict:
+        """
+        Store a response in the cache
+        :param url: The requested URL
+        :param status_code: The response status code
+        :param content: The response body
+        :param headers: The response headers
+        :param encoding: The encoding of the response body
+        :return: The cache entry of the URL
+        """
+        entry = {
+            "url": url,
+            "status_code": status_code,
+            "etag": headers.get('ETag'),
+            "last_modified": headers.get('Last-Modified'),
+            "encoding": encoding,
+            "fetched_at": time.time(),
+            "content_hash": None
+        }
+        if status_code == 200:
+            entry['content_hash'] = self._hash(content)
+            if not self._object_path(entry['content_hash']).exists():
+                self._atomic_write(self._object_path(entry['content_hash']), content)
+        if status_code in (200, 404):
+            self._atomic_write(self._entry_path(url), json.dumps(entry).encode('utf-8'))
+        return entry
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _from_entry(self, entry: Dict, content: bytes) -> CachedResponse:
+        return CachedResponse(entry['url'], entry['status_code'], content, {}, from_cache=True,
+                              encoding=entry.get('encoding'))
+
+    def lookup(self, url: str) -> Tuple[Optional[CachedResponse], Dict[str, str]]:
+        """
+        Look up a URL in the cache before requesting it. This is the first half of a cached GET request, shared by the
+        synchronous get() method and the asynchronous fetch engine.
+        :param url: The URL to look up
+        :return: A tuple containing the cached response if it can be used without a request (or None), and the
+        conditional headers to send to revalidate the cached response
+        """
+        entry = self._read_entry(url)
+        content = self._read_object(entry['content_hash']) if entry and entry['content_hash'] else None
+        age = time.time() - entry['fetched_at'] if entry else None
+        # Negatively cached URLs are not requested again until the end of their TTL
+        if entry and entry['status_code'] == 404 and (self.offline or age < self.not_found_ttl):
+            self._count('not_found_hits')
+            return self._from_entry(entry, b''), {}
+        if entry and content is not None and (self.offline or age < self.max_age):
+            self._count('hits')
+            return self._from_entry(entry, content), {}
+        if self.offline:
+            raise CacheMissError(f'{url} is not in the HTTP cache and the cache is in offline mode')
+        # Revalidate the cached response with a conditional GET request
+        headers = {}
+        if entry and content is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        return None, headers
+
+    def update(self, url: str, status_code: int, content: bytes, headers: Dict[str, str],
+               encoding: str) -> CachedResponse:
+        """
+        Update the cache with the response to a GET request. This is the second half of a cached GET request.
+        :param url: The requested URL
+        :param status_code: The response status code
+        :param content: The response body
+        :param headers: The response headers
+        :param encoding: The encoding of the response body
+        :return: The response, with the cached body if the server answered that the page was not modified
+        """
+        if status_code == 304:
+            entry = self._read_entry(url)
+            content = self._read_object(entry['content_hash']) if entry and entry['content_hash'] else None
+            if content is not None:
+                entry['fetched_at'] = time.time()
+                self._atomic_write(self._entry_path(url), json.dumps(entry).encode('utf-8'))
+                self._count('revalidated')
+                return self._from_entry(entry, content)
+        self._count('misses')
+        self._store(url, status_code, content, headers, encoding)
+        return CachedResponse(url, status_code, content, dict(headers), from_cache=False, encoding=encoding)
+
+    def get(self, url: str) -> CachedResponse:
+        """
+        Get a URL through the cache
+        :param url: The URL to get
+        :return: The cached or downloaded response
+        """
+        cached_response, conditional_headers = self.lookup(url)
+        if cached_response is not None:
+            return cached_response
+        response = self.session.get(url, headers=conditional_headers, timeout=self.timeout)
+        return self.update(url, response.status_code, response.content, response.headers,
+                           response.encoding or response.apparent_encoding)
@@ -0,0 +1,133 @@
+import re
+import json
+import argparse
+
+from pathlib import Path
+from typing import Dict, Optional
+
+DATA_DIR = Path(__file__).parent.parent.parent / 'assets/data'
+NHPP_DATA_DIR = DATA_DIR / 'nhpp'
+NEPAL_DISTRICTS_FILE = NHPP_DATA_DIR / 'nepal_districts.geojson'
+# The geoBoundaries open boundaries of the Nepal districts (ADM2). The API returns the metadata of the boundaries with
+# the URL of their GeoJSON file
+GEOBOUNDARIES_API_URL = 'https://www.geoboundaries.org/api/current/gbOpen/NPL/ADM2/'
+DOWNLOAD_TIMEOUT = 60
+# The province of the 77 districts of Nepal, the districts and provinces being named as in the NHPP dataset, so the
+# looked up districts and provinces match the District and Province nodes of the NHPP peaks
+DISTRICT_PROVINCES = {
+    **{district: 'Province 1' for district in [
+        'Bhojpur', 'Dhankuta', 'Ilam', 'Jhapa', 'Khotang', 'Morang', 'Okhaldhunga', 'Panchthar', 'Sankhuwasabha',
+        'Solukhumbu', 'Sunsari', 'Taplejung', 'Terhathum', 'Udayapur']},
+    **{district: 'Madhesh Pradesh' for district in [
+        'Bara', 'Dhanusha', 'Mahottari', 'Parsa', 'Rautahat', 'Saptari', 'Sarlahi', 'Siraha']},
+    **{district: 'Bagmati Pradesh' for district in [
+        'Bhaktapur', 'Chitwan', 'Dhading', 'Dolakha', 'Kathmandu', 'Kavrepalanchok', 'Lalitpur', 'Makwanpur', 'Nuwakot',
+        'Ramechhap', 'Rasuwa', 'Sindhuli', 'Sindhupalchok']},
+    **{district: 'Gandaki Pradesh' for district in [
+        'Baglung', 'Gorkha', 'Kaski', 'Lamjung', 'Manang', 'Mustang', 'Myagdi', 'Nawalpur', 'Parbat', 'Syangja',
+        'Tanahun']},
+    **{district: 'Lumbini' for district in [
+        'Arghakhanchi', 'Banke', 'Bardiya', 'Dang', 'Rukum East', 'Gulmi', 'Kapilvastu', 'Parasi', 'Palpa', 'Pyuthan',
+        'Rolpa', 'Rupandehi']},
+    **{district: 'Karnali Pradesh' for district in [
+        'Dailekh', 'Dolpa', 'Humla', 'Jajarkot', 'Jumla', 'Kalikot', 'Mugu', 'Salyan', 'Surkhet', 'Rukum']},
+    **{district: 'Sudhurpashchim Pradesh' for district in [
+        'Achham', 'Baitadi', 'Bajhang', 'Bajura', 'Dadeldhura', 'Darchula', 'Doti', 'Kailali', 'Kanchanpur']}
+}
+# The other spellings of the district names, normalized, with the name of the district in the NHPP dataset
+DISTRICT_ALIASES = {
+    'dholkha': 'Dolakha', 'dolkha': 'Dolakha', 'sindhupalchowk': 'Sindhupalchok', 'kavre': 'Kavrepalanchok',
+    'kavrepalanchowk': 'Kavrepalanchok', 'kabhrepalanchok': 'Kavrepalanchok', 'makawanpur': 'Makwanpur',
+    'chitawan': 'Chitwan', 'tanahu': 'Tanahun', 'dhanusa': 'Dhanusha', 'kapilbastu': 'Kapilvastu',
+    'bardia': 'Bardiya', 'tehrathum': 'Terhathum', 'udaypur': 'Udayapur', 'illam': 'Ilam', 'acham': 'Achham',
+    'dandeldhura': 'Dadeldhura', 'sankhuwasava': 'Sankhuwasabha',
+    'rukumeast': 'Rukum East', 'easternrukum': 'Rukum East', 'rukume': 'Rukum East',
+    'rukumwest': 'Rukum', 'westernrukum': 'Rukum', 'rukumw': 'Rukum',
+    'nawalparasieast': 'Nawalpur', 'nawalparasibardaghatsustaeast': 'Nawalpur', 'nawalparasie': 'Nawalpur',
+    'nawalparasiwest': 'Parasi', 'nawalparasibardaghatsustawest': 'Parasi', 'nawalparasiw': 'Parasi'
+}
+
+
+def _normalize_district(name: str) -> str:
+    """
+    Normalize a district name to compare its spellings
+    :param name: The district name
+    :return: The lower case name without the spaces, dashes and other non-letter characters
+    """
+    return re.sub(r'[^a-z]', '', name.lower())
+
+
+def nhpp_district_name(name: str) -> Optional[str]:
+    """
+    Get the name of a district as named in the NHPP dataset
+    :param name: The district name in another spelling
+    :return: The district name of the NHPP dataset, or None if the district is unknown
+    """
+    district_names = {**{_normalize_district(district): district for district in DISTRICT_PROVINCES},
+                      **DISTRICT_ALIASES}
+    return district_names.get(_normalize_district(name))
+
+
+def download_boundaries() -> Dict:
+    """
+    Download the boundaries of the Nepal districts from geoBoundaries
+    :return: The GeoJSON feature collection of the districts, with their name in the shapeName property
+    """
+    import requests
+    try:
+        response = requests.get(GEOBOUNDARIES_API_URL, timeout=DOWNLOAD_TIMEOUT)
+        response.raise_for_status()
+        response = requests.get(response.json()['gjDownloadURL'], timeout=DOWNLOAD_TIMEOUT)
+        response.raise_for_status()
+    except Exception as e:
+        print(f"Could not download the boundaries of the Nepal districts from {GEOBOUNDARIES_API_URL}")
+        print(f"Error: {e}")
+        raise e
+    return response.json()
+
+
+def build_districts_geojson(districts: Dict, name_property: str = 'shapeName') -> Dict:
+    """
+    Build the GeoJSON file of the districts used by the RegionLookup, with their DISTRICT and PROVINCE properties named
+    as in the NHPP dataset
+    :param districts: The GeoJSON feature collection of the districts
+    :param name_property: The name of the feature property containing the name of the districts
+    :return: The GeoJSON feature collection of the districts
+    """
+    features, unmapped_names = [], []
+    for feature in districts['features']:
+        district = nhpp_district_name(feature['properties'][name_property])
+        if district is None:
+            unmapped_names.append(feature['properties'][name_property])
+            continue
+        features.append({'type': 'Feature', 'properties': {'DISTRICT': district,
+                                                           'PROVINCE': DISTRICT_PROVINCES[district]},
+                         'geometry': feature['geometry']})
+    # A district with an unknown name would create a District node duplicating an NHPP district
+    if unmapped_names:
+        print(f"Error building the districts boundaries, the districts {', '.join(unmapped_names)} have no NHPP name")
+        raise ValueError('Add the district names to the DISTRICT_ALIASES')
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def save_nepal_districts(output_file: Path = NEPAL_DISTRICTS_FILE) -> Path:
+    """
+    Download the boundaries of the Nepal districts and save the districts GeoJSON file used to look up the district and
+    province of the peaks from their coordinates
+    :param output_file: The path of the districts GeoJSON file
+    :return: The path of the districts GeoJSON file
+    """
+    districts_geojson = build_districts_geojson(download_boundaries())
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    output_file.write_text(json.dumps(districts_geojson), encoding='utf-8')
+    print(f"Saved the boundaries of {len(districts_geojson['features'])} districts in {output_file}")
+    return output_file
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description="Download the boundaries of the Nepal districts used to look up "
+                                                     "the district and province of the peaks")
+    arg_parser.add_argument('--output', type=Path, default=NEPAL_DISTRICTS_FILE,
+                            help="The path of the districts GeoJSON file")
+    args = arg_parser.parse_args()
+    save_nepal_districts(args.output)
@@ -1,26 +1,87 @@
 import os
 import re
 import time
-import requests
 import json
-import concurrent.futures
-import bs4
+import asyncio
+import argparse
 import pandas as pd
 
 from pathlib import Path
-from typing import TypedDict, List, Tuple
+from functools import partial
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, TypedDict, List, Optional, Tuple, TYPE_CHECKING
 from datetime import datetime
-from dbfread.dbf import DBF
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
-from dms2dec.dms_convert import dms2dec
-from tqdm import tqdm
+
+from lib.data_collection.http_cache import HttpCache, CacheMissError
+from lib.data_collection.async_fetcher import AsyncFetcher
+from lib.data_collection.page_archive import PageArchive
+from lib.data_collection.checkpoint_journal import CheckpointJournal
+from lib.data_collection.peaks_corrections import load_peaks_corrections
+from lib.data_collection.nepal_districts import NEPAL_DISTRICTS_FILE
+
+# The scraping and parsing libraries are imported by the functions using them, so importing this module to use a
+# single stage does not load all of them
+if TYPE_CHECKING:
+    import bs4
 
 
 DATA_DIR = Path(__file__).parent.parent.parent / 'assets/data'
 NHPP_DATA_DIR = DATA_DIR / 'nhpp'
 HDB_DATA_DIR = DATA_DIR / 'hdb'
+NHPP_URL = 'https://nepalhimalpeakprofile.org'
+NHPP_PEAK_TABLE_URL = f'{NHPP_URL}/peak-profile/all-peaks'
+# Assumed data source of the AJAX populated peak table, returning the table rows without having to render the page.
+# This endpoint has not been verified against the website: if it fails or returns no peaks, the table page is rendered
+# with Selenium instead
+NHPP_PEAK_TABLE_DATA_URL = f'{NHPP_PEAK_TABLE_URL}?format=json'
+PEAKVISOR_URL = 'https://peakvisor.com'
+# Cache of the scraped web pages. Set the HTTP_CACHE_OFFLINE environment variable to 1 to replay the cached pages
+# without accessing the network
+http_cache = HttpCache(NHPP_DATA_DIR / 'http_cache', offline=os.environ.get('HTTP_CACHE_OFFLINE') == '1')
+# The raw pages downloaded by the fetch stage, read back by the parse stage
+page_archive = PageArchive(NHPP_DATA_DIR / 'pages_archive.sqlite')
+# The results of the collection recorded as they are completed, to resume an interrupted collection
+collection_journal = CheckpointJournal(NHPP_DATA_DIR / 'collection_journal.jsonl')
+# Number of peaks found on PeakVisor by each name variant pattern, kept with the HTTP cache between the runs and used to
+# request the most successful patterns first
+PEAKVISOR_PATTERN_WINS_FILE = 'peakvisor_pattern_wins.json'
+
+
+# Classes of the DIV tags containing the different sections of the NHPP peak profile pages
+PEAK_OVERVIEW_CLASS = "uk-child-width-1-2 uk-child-width-1-2@s uk-child-width-1-2@m uk-child-width-1-3@l " \
+                      "uk-child-width-1-3@xl uk-grid-medium uk-grid-match uk-grid"
+PEAK_HISTORY_CLASS = "uk-child-width-1-2 uk-child-width-1-2@s uk-child-width-1-2@m uk-child-width-1-2@l " \
+                     "uk-child-width-1-2@xl uk-grid-medium uk-grid-match uk-grid"
+PEAK_HISTORY_DETAILS_CLASS = "el-content uk-panel uk-margin-small-top"
+FACTS_CLASS = "uk-child-width-1-1 uk-child-width-1-2@m uk-grid-small uk-grid uk-flex-top uk-flex-wrap-top"
+# XPath queries targeting the sections of the NHPP peak profile pages from the comments separating them
+PEAK_OVERVIEW_DETAILS_XPATH = f"descendant::div[normalize-space(@class)='{PEAK_OVERVIEW_CLASS}'][1]/div"
+PEAK_HISTORY_DETAILS_XPATH = f"descendant::div[normalize-space(@class)='{PEAK_HISTORY_CLASS}'][1]" \
+                             f"/descendant::div[normalize-space(@class)='{PEAK_HISTORY_DETAILS_CLASS}']"
+DESCRIPTION_XPATH = "following-sibling::div[2]" \
+                    "/descendant::div[contains(concat(' ', normalize-space(@class), ' '), ' uk-column-large ')][1]"
+FACTS_SUB_SECTIONS_XPATH = f"following-sibling::div[1]/descendant::div[normalize-space(@class)='{FACTS_CLASS}'][1]/div"
+FACTS_LIST_ITEMS_XPATH = "(((descendant::div)[1]/descendant::div)[1]/descendant::ul)[1]/descendant::li"
+# Regex used to extract the various fields of the NHPP peak profile pages
+ALTERNATE_NAMES_REGEX = re.compile(r'\s*Other Name\s+(?P<alternate_names>[A-Z][\w\s,]+)')
+STATUS_REGEX = re.compile(r'\s*Status\s+(?P<status>[A-Z]\w+(?:\s\w+)*)\s*')
+ELEVATION_REGEX = re.compile(
+    r'\s*Elevation\s+(?P<elevation_m>\d{4}(\.\d{2})?)\sM\s+/\s+(?P<elevation_ft>\d{5}(\.\d{2})?)\sFT')
+LAT_REGEX = re.compile(
+    r'\s*Latitude\s+((?P<degree>\d{2}\s*[º°]?\s*\d{2}\s*\'?\s*\d{2}\s*[",\']*)|(?P<decimal>\d{2}\.\d{2,10}))\s+')
+LON_REGEX = re.compile(
+    r'\s*Longitude\s+((?P<degree>\d{2}\s*[º°]?\s*\d{2}\s*\'?\s*\d{2}\s*[",\']*)|(?P<decimal>\d{2}\.\d{2,10}))\s+')
+FIRST_ASCENT_ON_REGEX = re.compile(r'(\w{3,}\s*\d{1,2}\s*,\s*\d{4})\s*A?\.?D?\.?.*|'
+                                   r'(\d{1,2}\s*\w{3,}\s*,\s*\d{4})\s*A?\.?D?\.?.*|(\d{2}/\d{2}/\d{4})\s*A?\.?D?\.?.*')
+FIRST_ASCENT_BY_REGEX = re.compile(r'\s*([\w\s]+(?:\(\s[\w\s]+\))?),?\s')
+COMMA_SPACES_REGEX = re.compile(r'\s*,\s*')
+PROVINCE_REGEX = re.compile(r'\s*Province:\s+(?P<province>[\w\s]+)')
+DISTRICT_REGEX = re.compile(r'\s*District:\s+(?P<district>[\w\s]+/?\w+)\s*')
+MUNICIPALITY_REGEX = re.compile(r'\s*Municipality/Rural Municipality:\s+(?P<municipality>[\w\s]+/?\w+)\s*')
+RANGE_REGEX = re.compile(r'\s*Mountain Range:\s+(?P<range>[\w\s]+)')
+NEPALESE_FEES_REGEX = re.compile(r'\s*Nepalese \(NRs\):\s+([\w\s]+)')
+FOREIGNER_FEES_REGEX = re.compile(r'\s*Foreigners \(USD\):\s+([\w\s]+)')
 
 
 class PeakUrl (TypedDict):
@@ -52,20 +113,45 @@ class PeakDetails(TypedDict):
     FOREIGNER_FEES: str
 
 
-# Load the peaks_corrections.json file
-with open(NHPP_DATA_DIR / 'peaks_corrections.json', 'r') as f:
-    peaks_corrections = json.load(f)
-NHPP_PEAKS_NOT_TO_IMPORT = peaks_corrections['NHPP_PEAKS_NOT_TO_IMPORT']
-PEAKVISOR_NOT_TO_IMPORT = peaks_corrections['PEAKVISOR_NOT_TO_IMPORT']
+def get_all_nhpp_peak_table() -> List[PeakUrl]:
+    """
+    Get the peak table from the website. The table data are first requested directly over HTTP, and the page is only
+    rendered with Selenium if the table data could not be retrieved.
+    :returns: a list of dictionaries containing the peak ID, NAME and URL as defined in the PeakUrl class
+    """
+    try:
+        all_peaks_data = get_nhpp_peak_table_data()
+        if all_peaks_data:
+            return all_peaks_data
+        print(f"No peaks found in the peak table data from {NHPP_PEAK_TABLE_DATA_URL}")
+    except Exception as e:
+        print(f"Could not retrieve the peak table data from {NHPP_PEAK_TABLE_DATA_URL}")
+        print(f"Error: {e}")
+    print("Rendering the peak table with Selenium instead")
+    return get_all_nhpp_peak_table_with_selenium()
 
 
-def get_all_nhpp_peak_table() -> List[PeakUrl]:
+def get_nhpp_peak_table_data() -> List[PeakUrl]:
     """
-    Use BeautifulSoup to scrape the peak table from the website URL.
-    It extracts the peak ID, NAME and URL from the table.
+    Get the peak table from the data source of the AJAX populated table over HTTP, without rendering the page in a
+    web browser, and archive the response.
     :returns: a list of dictionaries containing the peak ID, NAME and URL as defined in the PeakUrl class
     """
-    url = 'https://nepalhimalpeakprofile.org/peak-profile/all-peaks'
+    response = http_cache.get(NHPP_PEAK_TABLE_DATA_URL)
+    if not response.ok:
+        raise ValueError(f"HTTP {response.status_code} response")
+    all_peaks_data = parse_nhpp_peak_table_data(response.text)
+    page_archive.put_response(response)
+    return all_peaks_data
+
+
+def get_all_nhpp_peak_table_with_selenium() -> List[PeakUrl]:
+    """
+    Use Selenium to render the peak table page from the website URL and archive the rendered page.
+    :returns: a list of dictionaries containing the peak ID, NAME and URL as defined in the PeakUrl class
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
     # Make selenium headless to prevent the display of the web browser
     chrome_options = Options()
     chrome_options.add_argument("--headless")
@@ -73,44 +159,115 @@ def get_all_nhpp_peak_table() -> List[PeakUrl]:
     # not rendered with a simple requests.get() call
     try:
         driver = webdriver.Chrome(options=chrome_options)
-        driver.get(url)
+        driver.get(NHPP_PEAK_TABLE_URL)
         time.sleep(3)
         # Get the page source
         page_source = driver.page_source
-        soup = BeautifulSoup(page_source, "lxml")
-        # Get the peak table
-        peak_table = soup.find('table', attrs={"id": "mountaintable"})
-        # Get the peak table rows in the table body
-        peak_table_rows = peak_table.find('tbody').find_all('tr')
-        all_peaks_data = []
-        for row in peak_table_rows:
-            # Get the table row fields in the TD tags
-            row_fields = row.find_all('td')
-            # Skip the Gimmigela Chuli peak as it is 2 peaks
-            peak_id = row_fields[0].text.strip()
-            if peak_id not in NHPP_PEAKS_NOT_TO_IMPORT:
-                a_peak = {
-                    "ID": peak_id,
-                    "NAME": row_fields[1].text.replace('*', '').strip(),
-                    "URL": f"https://nepalhimalpeakprofile.org{row_fields[1].find('a')['href']}"
-                }
-                all_peaks_data.append(a_peak)
+        all_peaks_data = parse_nhpp_peak_table(page_source)
     except Exception as e:
-        print("Could not connect to https://nepalhimalpeakprofile.org and retrieve all peaks data")
+        print(f"Could not connect to {NHPP_URL} and retrieve all peaks data")
         print(f"Error: {e}")
         raise e
+    page_archive.put(NHPP_PEAK_TABLE_URL, page_source.encode('utf-8'))
     return all_peaks_data
 
 
+def _parse_peak_table_row(peak_id_cell: 'bs4.element.Tag', peak_name_cell: 'bs4.element.Tag') -> Optional[PeakUrl]:
+    """
+    Get the peak ID, NAME and URL from the cells of a peak table row
+    :param peak_id_cell: the cell containing the peak ID
+    :param peak_name_cell: the cell containing the link to the peak profile
+    :returns: a dictionary containing the peak ID, NAME and URL as defined in the PeakUrl class or None if the peak
+    must not be imported
+    """
+    peak_id = peak_id_cell.text.strip()
+    # Skip the Gimmigela Chuli peak as it is 2 peaks
+    if peak_id in load_peaks_corrections()['NHPP_PEAKS_NOT_TO_IMPORT']:
+        return None
+    return {
+        "ID": peak_id,
+        "NAME": peak_name_cell.text.replace('*', '').strip(),
+        "URL": f"{NHPP_URL}{peak_name_cell.find('a')['href']}"
+    }
+
+
+def parse_nhpp_peak_table(page_source: str) -> List[PeakUrl]:
+    """
+    Use BeautifulSoup to scrape the peak table from the rendered peak table page.
+    It extracts the peak ID, NAME and URL from the table.
+    :param page_source: the HTML of the rendered peak table page
+    :returns: a list of dictionaries containing the peak ID, NAME and URL as defined in the PeakUrl class
+    """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(page_source, "lxml")
+    # Get the peak table
+    peak_table = soup.find('table', attrs={"id": "mountaintable"})
+    # Get the peak table rows in the table body
+    peak_table_rows = peak_table.find('tbody').find_all('tr')
+    all_peaks_data = []
+    for row in peak_table_rows:
+        # Get the table row fields in the TD tags
+        row_fields = row.find_all('td')
+        a_peak = _parse_peak_table_row(row_fields[0], row_fields[1])
+        if a_peak is not None:
+            all_peaks_data.append(a_peak)
+    return all_peaks_data
+
+
+def parse_nhpp_peak_table_data(table_data: str) -> List[PeakUrl]:
+    """
+    Parse the peak table from the response of the table data source. The response is either the JSON data of the
+    table rows, with the cells rendered as HTML, or a server rendered variant of the peak table page.
+    :param table_data: the text of the table data source response
+    :returns: a list of dictionaries containing the peak ID, NAME and URL as defined in the PeakUrl class
+    """
+    from bs4 import BeautifulSoup
+    if not table_data.lstrip().startswith(('{', '[')):
+        return parse_nhpp_peak_table(table_data)
+    table_data = json.loads(table_data)
+    # The rows are either in the data field of the response or the response itself, each row being the list of its
+    # cells or a dictionary of its cells by column
+    rows = table_data['data'] if isinstance(table_data, dict) else table_data
+    all_peaks_data = []
+    for row in rows:
+        row_fields = [BeautifulSoup(str(cell), "lxml") for cell in (row.values() if isinstance(row, dict) else row)]
+        a_peak = _parse_peak_table_row(row_fields[0], row_fields[1])
+        if a_peak is not None:
+            all_peaks_data.append(a_peak)
+    return all_peaks_data
+
+
+def load_archived_nhpp_peak_table(archive: PageArchive) -> Optional[List[PeakUrl]]:
+    """
+    Parse the peak table archived by a previous run, without accessing the website
+    :param archive: the archive of the raw pages
+    :returns: a list of dictionaries containing the peak ID, NAME and URL as defined in the PeakUrl class or None if the
+    peak table is not archived
+    """
+    if NHPP_PEAK_TABLE_DATA_URL in archive:
+        return parse_nhpp_peak_table_data(archive.get(NHPP_PEAK_TABLE_DATA_URL).text)
+    if NHPP_PEAK_TABLE_URL in archive:
+        return parse_nhpp_peak_table(archive.get(NHPP_PEAK_TABLE_URL).text)
+    return None
+
+
 def get_nhpp_peak_profile(a_peak: PeakUrl) -> PeakDetails:
     """
-    Use BeautifulSoup to scrape the peak profile data from the website URL. The function scraps from the peak page,
-    overview data, first ascent data, description, location, fees and other information.
+    Scrape the peak profile data from the website URL. The function scraps from the peak page, overview data, first
+    ascent data, description, location, fees and other information.
+    :param a_peak: a dictionary containing the peak ID, NAME and URL as defined in the PeakUrl class
+    :returns: a dictionary containing the peak details as defined in the PeakDetails class
+    """
+    return extract_nhpp_peak_profile(a_peak, http_cache.get(a_peak['URL']).text)
+
+
+def _empty_peak_details(a_peak: PeakUrl) -> PeakDetails:
+    """
+    Initialise the peak details with empty values
     :param a_peak: a dictionary containing the peak ID, NAME and URL as defined in the PeakUrl class
     :returns: a dictionary containing the peak details as defined in the PeakDetails class
     """
-    # Initialise the peak details with empty values
-    peak_details = {
+    return {
         "ID": a_peak['ID'],
         "URL": a_peak['URL'],
         "NAME": a_peak['NAME'],
@@ -130,8 +287,106 @@ def get_nhpp_peak_profile(a_peak: PeakUrl) -> PeakDetails:
         "NEPALESE_FEES": None,
         "FOREIGNER_FEES": None
     }
+
+
+def _parse_overview_detail(detail_text: str, peak_details: PeakDetails):
+    """
+    Parse one of the fields of the peak overview section and edit the peak details dictionary with the found data
+    :param detail_text: the text of the overview field DIV tag
+    :param peak_details: the peak details dictionary to edit
+    """
+    from dms2dec.dms_convert import dms2dec
+    # Search for the various fields
+    alternate_names_match = ALTERNATE_NAMES_REGEX.search(detail_text)
+    status_match = STATUS_REGEX.search(detail_text)
+    elevation_match = ELEVATION_REGEX.search(detail_text)
+    lat_match = LAT_REGEX.search(detail_text)
+    lon_match = LON_REGEX.search(detail_text)
+    # Edit the peak details dictionary with the found data
+    if alternate_names_match:
+        peak_details['ALTERNATE_NAMES'] = alternate_names_match.group('alternate_names').\
+            strip().replace(" *", '').replace("'", '').replace(", ", ',')
+    elif status_match:
+        peak_details['STATUS'] = status_match.group('status')
+    elif elevation_match:
+        peak_details['ELEVATION_M'] = float(elevation_match.group('elevation_m'))
+        peak_details['ELEVATION_FT'] = float(elevation_match.group('elevation_ft'))
+    elif lat_match:
+        # If the latitude is found in degrees through the group 1, convert it to decimal degrees
+        if lat_match.group('degree'):
+            peak_details['LAT'] = dms2dec(lat_match.group('degree') + ' N')
+        # If the latitude is found in decimal degrees through the group 2, convert it to float
+        elif lat_match.group('decimal'):
+            peak_details['LAT'] = float(lat_match.group('decimal'))
+    elif lon_match:
+        # If the longitude is found in degrees through the group 1, convert it to decimal degrees
+        if lon_match.group('degree'):
+            peak_details['LON'] = dms2dec(lon_match.group('degree') + ' E')
+        # If the longitude is found in decimal degrees through the group 2, convert it to float
+        elif lon_match.group('decimal'):
+            peak_details['LON'] = float(lon_match.group('decimal'))
+
+
+def _parse_first_ascent(first_ascent_on_text: str, first_ascent_by_text: str) -> Tuple[str, str]:
+    """
+    Parse the first ascent date and the list of first ascent climbers of the peak history section
+    :param first_ascent_on_text: the text of the first ascent date DIV tag
+    :param first_ascent_by_text: the text of the first ascent climbers DIV tag
+    :returns: the first ascent date in dd/mm/yyyy format and the comma separated list of first ascent climbers
+    """
+    first_ascent_search = FIRST_ASCENT_ON_REGEX.search(first_ascent_on_text)
+    # take the non-empty group in the search result
+    first_ascent_on = next(filter(None, first_ascent_search.groups()))
+    # Try converting the datetime to dd/mm/yyyy format by trying different date formats
+    first_ascent_on = COMMA_SPACES_REGEX.sub(',', first_ascent_on)
+    for date_format in ['%B%d,%Y', '%b%d,%Y', '%B %d,%Y', '%b %d,%Y', '%d %B,%Y', '%d %b,%Y', '%d/%m/%Y']:
+        try:
+            first_ascent_on = datetime.strptime(first_ascent_on, date_format).strftime('%d/%m/%Y')
+            break
+        except ValueError:
+            pass
+    # The second DIV tag contains the list of first ascent climbers
+    first_ascentionists = FIRST_ASCENT_BY_REGEX.findall(first_ascent_by_text)
+    first_ascent_by = ','.join([a.replace('( ', '(').replace('   )', ')') for a in first_ascentionists])
+    return first_ascent_on, first_ascent_by
+
+
+def _parse_location_fact(li_text: str, peak_details: PeakDetails):
+    """
+    Parse one of the location facts and edit the peak details dictionary with the found data
+    :param li_text: the text of the location fact LI tag
+    :param peak_details: the peak details dictionary to edit
+    """
+    # Search for the various fields
+    province_match = PROVINCE_REGEX.search(li_text)
+    district_match = DISTRICT_REGEX.search(li_text)
+    municipality_match = MUNICIPALITY_REGEX.search(li_text)
+    range_match = RANGE_REGEX.search(li_text)
+    # Edit the peak details dictionary with the found data
+    if province_match:
+        peak_details['PROVINCE'] = province_match.group('province').strip()
+    elif district_match:
+        peak_details['DISTRICT'] = district_match.group('district').strip()
+    elif municipality_match:
+        peak_details['MUNICIPALITY'] = municipality_match.group('municipality').strip()
+    elif range_match:
+        peak_details['RANGE'] = range_match.group('range').strip()
+
+
+def parse_nhpp_peak_profile(a_peak: PeakUrl, html: str) -> PeakDetails:
+    """
+    Use BeautifulSoup to parse the peak profile data from the HTML of the peak page. The function parses the overview
+    data, first ascent data, description, location, fees and other information.
+    This parser builds a tree of the whole page. It is kept as the reference implementation of the faster
+    extract_nhpp_peak_profile() function.
+    :param a_peak: a dictionary containing the peak ID, NAME and URL as defined in the PeakUrl class
+    :param html: the HTML of the peak profile page
+    :returns: a dictionary containing the peak details as defined in the PeakDetails class
+    """
+    import bs4
+    peak_details = _empty_peak_details(a_peak)
     # use BeautifulSoup to scrape the peak profile
-    soup = BeautifulSoup(requests.get(a_peak['URL']).text, "lxml")
+    soup = bs4.BeautifulSoup(html, "lxml")
     # Extract all comments in the HTML page, they are used to separate the different sections of the page
     # We reuse them here to find the data in the appropriate sections
     comments = soup.find_all(string=lambda text: isinstance(text, bs4.element.Comment))
@@ -141,79 +396,19 @@ def get_nhpp_peak_profile(a_peak: PeakUrl) -> PeakDetails:
             overview_section = comment.find_next_sibling('div')
             # Peak overview
             # get the peak overview from the overview section
-            peak_overview = overview_section.find(
-                'div',
-                attrs={"class": "uk-child-width-1-2 uk-child-width-1-2@s uk-child-width-1-2@m uk-child-width-1-3@l "
-                                "uk-child-width-1-3@xl uk-grid-medium uk-grid-match uk-grid"}
-            )
-            peak_overview_details = peak_overview.find_all('div', recursive=False)
-            # Define the regex used to extract the various overview fields
-            alternate_names_regex = r'\s*Other Name\s+(?P<alternate_names>[A-Z][\w\s,]+)'
-            status_regex = r'\s*Status\s+(?P<status>[A-Z]\w+(?:\s\w+)*)\s*'
-            elevation_regex = r'\s*Elevation\s+(?P<elevation_m>\d{4}(\.\d{2})?)\sM\s+/\s+(?P<elevation_ft>\d{5}(\.\d{2})?)\sFT'
-            lat_regex = r'\s*Latitude\s+((?P<degree>\d{2}\s*[º°]?\s*\d{2}\s*\'?\s*\d{2}\s*[",\']*)|(?P<decimal>\d{2}\.\d{2,10}))\s+'
-            lon_regex = r'\s*Longitude\s+((?P<degree>\d{2}\s*[º°]?\s*\d{2}\s*\'?\s*\d{2}\s*[",\']*)|(?P<decimal>\d{2}\.\d{2,10}))\s+'
+            peak_overview = overview_section.find('div', attrs={"class": PEAK_OVERVIEW_CLASS})
             # for all DIV tags in the peak overview details search for the regex patterns and extract the data
-            for detail in peak_overview_details:
-                # Search for the various fields
-                alternate_names_match = re.search(alternate_names_regex, detail.text)
-                status_match = re.search(status_regex, detail.text)
-                elevation_match = re.search(elevation_regex, detail.text)
-                lat_match = re.search(lat_regex, detail.text)
-                lon_match = re.search(lon_regex, detail.text)
-                # Edit the peak details dictionary with the found data
-                if alternate_names_match:
-                    peak_details['ALTERNATE_NAMES'] = alternate_names_match.group('alternate_names').\
-                        strip().replace(" *", '').replace("'", '').replace(", ", ',')
-                elif status_match:
-                    peak_details['STATUS'] = status_match.group('status')
-                elif elevation_match:
-                    peak_details['ELEVATION_M'] = float(elevation_match.group('elevation_m'))
-                    peak_details['ELEVATION_FT'] = float(elevation_match.group('elevation_ft'))
-                elif lat_match:
-                    # If the latitude is found in degrees through the group 1, convert it to decimal degrees
-                    if lat_match.group('degree'):
-                        peak_details['LAT'] = dms2dec(lat_match.group('degree') + ' N')
-                    # If the latitude is found in decimal degrees through the group 2, convert it to float
-                    elif lat_match.group('decimal'):
-                        peak_details['LAT'] = float(lat_match.group('decimal'))
-                elif lon_match:
-                    # If the longitude is found in degrees through the group 1, convert it to decimal degrees
-                    if lon_match.group('degree'):
-                        peak_details['LON'] = dms2dec(lon_match.group('degree') + ' E')
-                    # If the longitude is found in decimal degrees through the group 2, convert it to float
-                    elif lon_match.group('decimal'):
-                        peak_details['LON'] = float(lon_match.group('decimal'))
+            for detail in peak_overview.find_all('div', recursive=False):
+                _parse_overview_detail(detail.text, peak_details)
             # Peak history
             # get the peak history section
-            peak_history = overview_section.find(
-                'div',
-                attrs={"class": "uk-child-width-1-2 uk-child-width-1-2@s uk-child-width-1-2@m uk-child-width-1-2@l "
-                                "uk-child-width-1-2@xl uk-grid-medium uk-grid-match uk-grid"}
-            )
+            peak_history = overview_section.find('div', attrs={"class": PEAK_HISTORY_CLASS})
             # If the peak history section is found, extract the first ascent data
             try:
-                peak_history_details = peak_history.find_all(
-                    'div', attrs={"class": "el-content uk-panel uk-margin-small-top"})
-                first_ascent_on_regex = r'(\w{3,}\s*\d{1,2}\s*,\s*\d{4})\s*A?\.?D?\.?.*|' \
-                                        r'(\d{1,2}\s*\w{3,}\s*,\s*\d{4})\s*A?\.?D?\.?.*|(\d{2}/\d{2}/\d{4})\s*A?\.?D?\.?.*'
-                first_ascent_by_regex = r'\s*([\w\s]+(?:\(\s[\w\s]+\))?),?\s'
-                # The first DIV tag contains the first ascent date
-                first_ascent_search = re.search(first_ascent_on_regex, peak_history_details[0].text)
-                # take the non-empty group in the search result
-                first_ascent_on = next(filter(None, first_ascent_search.groups()))
-                # Try converting the datetime to dd/mm/yyyy format by trying different date formats
-                first_ascent_on = re.sub(r'\s*,\s*', ',', first_ascent_on)
-                for date_format in ['%B%d,%Y', '%b%d,%Y', '%B %d,%Y', '%b %d,%Y', '%d %B,%Y', '%d %b,%Y', '%d/%m/%Y']:
-                    try:
-                        first_ascent_on = datetime.strptime(first_ascent_on, date_format).strftime('%d/%m/%Y')
-                        break
-                    except ValueError:
-                        pass
-                peak_details['FIRST_ASCENT_ON'] = first_ascent_on
-                # The second DIV tag contains the list of first ascent climbers
-                first_ascentionists = re.findall(first_ascent_by_regex, peak_history_details[1].text)
-                first_ascent_by = ','.join([a.replace('( ', '(').replace('   )', ')') for a in first_ascentionists])
+                peak_history_details = peak_history.find_all('div', attrs={"class": PEAK_HISTORY_DETAILS_CLASS})
+                # The first DIV tag contains the first ascent date, the second one the list of first ascent climbers
+                first_ascent_on, first_ascent_by = _parse_first_ascent(peak_history_details[0].text,
+                                                                       peak_history_details[1].text)
             except (AttributeError, IndexError, TypeError):
                 first_ascent_on = ''
                 first_ascent_by = ''
@@ -232,11 +427,7 @@ def get_nhpp_peak_profile(a_peak: PeakUrl) -> PeakDetails:
         # If the comment contains "FACT START" we extract both the location facts and fees facts
         elif 'FACTS START' in comment:
             # Get the DIV tag containing the different facts
-            facts_section = comment.find_next_sibling('div').find(
-                'div',
-                attrs={"class": "uk-child-width-1-1 uk-child-width-1-2@m uk-grid-small uk-grid uk-flex-top "
-                                "uk-flex-wrap-top"}
-            )
+            facts_section = comment.find_next_sibling('div').find('div', attrs={"class": FACTS_CLASS})
             # Get the 4 sub-sections of the facts section included in DIV tags just one layer deep
             facts_sub_sections = facts_section.find_all('div', recursive=False)
             # Location details
@@ -244,27 +435,9 @@ def get_nhpp_peak_profile(a_peak: PeakUrl) -> PeakDetails:
             try:
                 # The location facts are in the first section and then 2 DIV tags and 1 UL tag deep
                 location_facts = facts_sub_sections[0].find('div').find('div').find('ul')
-                # Define the different location fields regex patterns
-                province_regex = r'\s*Province:\s+(?P<province>[\w\s]+)'
-                district_regex = r'\s*District:\s+(?P<district>[\w\s]+/?\w+)\s*'
-                municipality_regex = r'\s*Municipality/Rural Municipality:\s+(?P<municipality>[\w\s]+/?\w+)\s*'
-                range_regex = r'\s*Mountain Range:\s+(?P<range>[\w\s]+)'
                 # For all LI tags in the location facts, extract the data using the regex patterns
                 for li in location_facts.find_all('li'):
-                    # Search for the various fields
-                    province_match = re.search(province_regex, li.text)
-                    district_match = re.search(district_regex, li.text)
-                    municipality_match = re.search(municipality_regex, li.text)
-                    range_match = re.search(range_regex, li.text)
-                    # Edit the peak details dictionary with the found data
-                    if province_match:
-                        peak_details['PROVINCE'] = province_match.group('province').strip()
-                    elif district_match:
-                        peak_details['DISTRICT'] = district_match.group('district').strip()
-                    elif municipality_match:
-                        peak_details['MUNICIPALITY'] = municipality_match.group('municipality').strip()
-                    elif range_match:
-                        peak_details['RANGE'] = range_match.group('range').strip()
+                    _parse_location_fact(li.text, peak_details)
             except (AttributeError, IndexError):
                 pass
             # Fees details
@@ -273,17 +446,11 @@ def get_nhpp_peak_profile(a_peak: PeakUrl) -> PeakDetails:
                 # The fees facts are in the third section and then 2 DIV tags and 1 UL tag deep
                 fees_facts = facts_sub_sections[2].find('div').find('div').find('ul')
                 # Get the Nepalese fees from the first LI tag
-                nepalese_fees_regex = r'\s*Nepalese \(NRs\):\s+([\w\s]+)'
-                peak_details['NEPALESE_FEES'] = re.search(
-                    nepalese_fees_regex,
-                    fees_facts.find_all('li')[0].text
-                ).group(1).strip() + ' (NRs)'
+                peak_details['NEPALESE_FEES'] = NEPALESE_FEES_REGEX.search(
+                    fees_facts.find_all('li')[0].text).group(1).strip() + ' (NRs)'
                 # Get the foreigner fees from the second LI tag
-                foreigner_fees_regex = r'\s*Foreigners \(USD\):\s+([\w\s]+)'
-                peak_details['FOREIGNER_FEES'] = re.search(
-                    foreigner_fees_regex,
-                    fees_facts.find_all('li')[1].text
-                ).group(1).strip() + ' (USD)'
+                peak_details['FOREIGNER_FEES'] = FOREIGNER_FEES_REGEX.search(
+                    fees_facts.find_all('li')[1].text).group(1).strip() + ' (USD)'
             except (AttributeError, IndexError):
                 pass
         # Passed the FACT END comment, we can break the loop, we don't need anymore data
@@ -292,69 +459,499 @@ def get_nhpp_peak_profile(a_peak: PeakUrl) -> PeakDetails:
     return peak_details
 
 
-def get_data_from_peakvisor(peak_names: List[str]) -> Tuple[str, str, str, str]:
+def _first(elements: list):
     """
-    Get the latitude, longitude, district and about text of a peak from the PeakVisor website
+    Get the first element of an XPath result, or None if the result is empty, like the BeautifulSoup find() method
+    :param elements: the XPath result
+    :returns: the first element or None
+    """
+    return elements[0] if elements else None
+
+
+def extract_nhpp_peak_profile(a_peak: PeakUrl, html: str) -> PeakDetails:
+    """
+    Extract the peak profile data from the HTML of the peak page. This is a faster version of the
+    parse_nhpp_peak_profile() function returning the same peak details. Instead of building a BeautifulSoup tree of
+    the whole page and walking it, the page is parsed by lxml and the OVERVIEW and FACTS sections are directly
+    targeted by XPath queries scoped by the comments separating the sections of the page.
+    :param a_peak: a dictionary containing the peak ID, NAME and URL as defined in the PeakUrl class
+    :param html: the HTML of the peak profile page
+    :returns: a dictionary containing the peak details as defined in the PeakDetails class
+    """
+    import lxml.html
+    peak_details = _empty_peak_details(a_peak)
+    root = lxml.html.fromstring(html)
+    for comment in root.xpath('//comment()'):
+        # If the comment contains "OVERVIEW START" we extract the overview data from the first DIV tag
+        if 'OVERVIEW START' in comment.text:
+            overview_section = _first(comment.xpath('following-sibling::div[1]'))
+            for detail in overview_section.xpath(PEAK_OVERVIEW_DETAILS_XPATH):
+                _parse_overview_detail(detail.xpath('string()'), peak_details)
+            peak_history_details = overview_section.xpath(PEAK_HISTORY_DETAILS_XPATH)
+            try:
+                first_ascent_on, first_ascent_by = _parse_first_ascent(peak_history_details[0].xpath('string()'),
+                                                                       peak_history_details[1].xpath('string()'))
+            except (AttributeError, IndexError, TypeError):
+                first_ascent_on = ''
+                first_ascent_by = ''
+            peak_details['FIRST_ASCENT_ON'] = first_ascent_on
+            peak_details['FIRST_ASCENT_BY'] = first_ascent_by
+        # If the comment contains "OVERVIEW END" we extract the peak description from the second DIV tag
+        elif 'OVERVIEW END' in comment.text:
+            peak_description = _first(comment.xpath(DESCRIPTION_XPATH))
+            if peak_description is not None:
+                peak_details['DESCRIPTION'] = peak_description.xpath('string()').strip()
+        # If the comment contains "FACT START" we extract both the location facts and fees facts
+        elif 'FACTS START' in comment.text:
+            facts_sub_sections = comment.xpath(FACTS_SUB_SECTIONS_XPATH)
+            # The location facts are in the first section and then 2 DIV tags and 1 UL tag deep
+            if len(facts_sub_sections) > 0:
+                for li in facts_sub_sections[0].xpath(FACTS_LIST_ITEMS_XPATH):
+                    _parse_location_fact(li.xpath('string()'), peak_details)
+            # The fees facts are in the third section and then 2 DIV tags and 1 UL tag deep
+            if len(facts_sub_sections) > 2:
+                fees_facts = facts_sub_sections[2].xpath(FACTS_LIST_ITEMS_XPATH)
+                try:
+                    peak_details['NEPALESE_FEES'] = NEPALESE_FEES_REGEX.search(
+                        fees_facts[0].xpath('string()')).group(1).strip() + ' (NRs)'
+                    peak_details['FOREIGNER_FEES'] = FOREIGNER_FEES_REGEX.search(
+                        fees_facts[1].xpath('string()')).group(1).strip() + ' (USD)'
+                except (AttributeError, IndexError):
+                    pass
+        # Passed the FACT END comment, we can break the loop, we don't need anymore data
+        elif 'FACTS END' in comment.text:
+            break
+    return peak_details
+
+
+def _parse_archived_page(parse_function: Callable, args: tuple, compressed_page: Optional[Tuple[bytes, str]]):
+    """
+    Decompress and parse an archived page. This function is run in the parse stage worker processes.
+    :param parse_function: the function parsing the page, called with the args and the page HTML
+    :param args: the arguments passed to the parse function before the page HTML
+    :param compressed_page: the compressed page and its encoding as returned by PageArchive.get_compressed
+    :returns: the parse function result, None if the page is not archived or the exception raised by the parse function
+    """
+    if compressed_page is None:
+        return None
+    try:
+        return parse_function(*args, PageArchive.decompress(*compressed_page))
+    except Exception as e:
+        # Return the error instead of raising it so a single page failing to parse does not lose the other results
+        return e
+
+
+def parse_archived_pages(parse_function: Callable, pages: List[Tuple[tuple, str]], archive: PageArchive,
+                         max_workers: Optional[int] = None, chunksize: int = 8) -> Iterator:
+    """
+    Parse archived pages in parallel in a pool of worker processes, so the parsing is not limited by the GIL. The pages
+    are sent compressed to the workers, which decompress and parse them.
+    :param parse_function: the function parsing a page, it must be defined at the module level to be sent to the workers
+    :param pages: the list of (parse function arguments, page URL) tuples of the pages to parse
+    :param archive: the archive of the raw pages
+    :param max_workers: the number of worker processes, by default the number of CPUs. With 1 worker the pages are
+    parsed in the current process
+    :param chunksize: the number of pages sent at once to a worker process
+    :returns: an iterator of the parse function results in the same order as the pages, yielded as soon as they are
+    parsed. The result is None for the pages not archived and the exception raised for the pages failing to parse
+    """
+    from tqdm import tqdm
+    parse_page = partial(_parse_archived_page, parse_function)
+    all_args = [args for args, _ in pages]
+    compressed_pages = [archive.get_compressed(url) for _, url in pages]
+    if max_workers == 1:
+        yield from tqdm(map(parse_page, all_args, compressed_pages), total=len(pages))
+        return
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from tqdm(executor.map(parse_page, all_args, compressed_pages, chunksize=chunksize), total=len(pages))
+
+
+async def fetch_nhpp_peak_profiles(all_peaks: List[PeakUrl], archive: PageArchive,
+                                   journal: CheckpointJournal) -> List[PeakUrl]:
+    """
+    Fetch stage of the peak profiles scraping. The profile pages of all the peaks are fetched concurrently with the
+    asynchronous fetch engine, over pooled connections within the NHPP website rate limits, and stored in the archive of
+    the raw pages as soon as they are received. The peaks which could not be fetched are recorded in the journal.
+    :param all_peaks: the list of peaks as defined in the PeakUrl class
+    :param archive: the archive in which the raw pages are stored
+    :param journal: the checkpoint journal of the collection
+    :returns: the list of the peaks successfully fetched
+    """
+    from tqdm import tqdm
+    fetched_peaks = [False] * len(all_peaks)
+    async with AsyncFetcher(http_cache, per_host_concurrency=8) as fetcher:
+        with tqdm(total=len(all_peaks)) as progress_bar:
+            async for i, response in fetcher.fetch_all((i, a_peak['URL']) for i, a_peak in enumerate(all_peaks)):
+                progress_bar.update(1)
+                if isinstance(response, Exception) or response.status_code != 200:
+                    error = str(response) if isinstance(response, Exception) else f"HTTP {response.status_code}"
+                    journal.record('nhpp_profile', all_peaks[i]['ID'], error=error or repr(response))
+                    continue
+                archive.put_response(response)
+                fetched_peaks[i] = True
+    return [a_peak for a_peak, fetched in zip(all_peaks, fetched_peaks) if fetched]
+
+
+def parse_nhpp_peak_profiles(all_peaks: List[PeakUrl], archive: PageArchive, journal: CheckpointJournal,
+                             max_workers: Optional[int] = None):
+    """
+    Parse stage of the peak profiles scraping. The archived profile pages are parsed in parallel in worker processes,
+    without accessing the website, and each peak details are recorded in the journal as soon as they are parsed.
+    :param all_peaks: the list of peaks as defined in the PeakUrl class
+    :param archive: the archive of the raw pages
+    :param journal: the checkpoint journal of the collection
+    :param max_workers: the number of parser worker processes, by default the number of CPUs
+    """
+    parsed_peaks = parse_archived_pages(extract_nhpp_peak_profile,
+                                        [((a_peak,), a_peak['URL']) for a_peak in all_peaks], archive, max_workers)
+    for a_peak, peak_details in zip(all_peaks, parsed_peaks):
+        if peak_details is None:
+            journal.record('nhpp_profile', a_peak['ID'], error="The profile page is not archived")
+        elif isinstance(peak_details, Exception):
+            journal.record('nhpp_profile', a_peak['ID'], error=f"Could not parse the profile page: {peak_details!r}")
+        else:
+            journal.record('nhpp_profile', a_peak['ID'], result=peak_details)
+
+
+def collect_nhpp_peak_profiles(all_peaks: List[PeakUrl], archive: PageArchive, journal: CheckpointJournal,
+                               fetch_pages: bool = True, resume: bool = False,
+                               max_workers: Optional[int] = None) -> List[PeakDetails]:
+    """
+    Collect the details of all the peaks, fetching and parsing their profile pages. In resume mode, the peaks already
+    collected by a previous run are skipped and only the peaks which failed or were not reached are collected again.
+    :param all_peaks: the list of peaks as defined in the PeakUrl class
+    :param archive: the archive of the raw pages
+    :param journal: the checkpoint journal of the collection
+    :param fetch_pages: if False, only parse the pages archived by a previous run
+    :param resume: if True, skip the peaks already collected according to the journal
+    :param max_workers: the number of parser worker processes, by default the number of CPUs
+    :returns: the list of peak details as defined in the PeakDetails class, in the same order as the list of peaks
+    """
+    collected_peaks = journal.results('nhpp_profile') if resume else {}
+    peaks_to_collect = [a_peak for a_peak in all_peaks if a_peak['ID'] not in collected_peaks]
+    if resume:
+        print(f"Resuming the collection, {len(peaks_to_collect)} of {len(all_peaks)} peaks left to collect")
+    if fetch_pages:
+        peaks_to_collect = asyncio.run(fetch_nhpp_peak_profiles(peaks_to_collect, archive, journal))
+    parse_nhpp_peak_profiles(peaks_to_collect, archive, journal, max_workers)
+    collected_peaks = journal.results('nhpp_profile')
+    failures = {peak_id: error for peak_id, error in journal.failures('nhpp_profile').items()
+                if peak_id in {a_peak['ID'] for a_peak in all_peaks}}
+    if failures:
+        for peak_id, error in failures.items():
+            print(f"Could not collect the profile of the peak {peak_id}: {error}")
+        raise RuntimeError(f"Could not collect {len(failures)} peak profiles, run the collection again with the "
+                           f"--resume option to retry only the failed peaks")
+    return [collected_peaks[a_peak['ID']] for a_peak in all_peaks]
+
+
+def save_csv_atomically(df: pd.DataFrame, csv_file: Path):
+    """
+    Save a dataframe to a CSV file through a temporary file renamed at the end, so a failed run never leaves a
+    partially written file tracked by DVC
+    :param df: The dataframe to save
+    :param csv_file: The path of the CSV file
+    """
+    tmp_file = csv_file.with_name(f'.{csv_file.name}.tmp')
+    try:
+        df.to_csv(tmp_file, index=False, encoding='utf-8')
+    except Exception:
+        tmp_file.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_file, csv_file)
+
+
+def get_peakvisor_name_variants(peak_names: List[str]) -> List[Tuple[str, str]]:
+    """
+    Get all the names under which a peak could be found on the PeakVisor website, in order of preference: the names,
+    the names without "peak", the names with "peak" and the names with the "mount" prefix.
     :param peak_names: The list of possible names for the peak
-    :return: The latitude, longitude, district and about of the peak
+    :return: The list of (name variant, variant pattern) tuples in order of preference
     """
-    lat, lon, district, about = None, None, None, None
     # If there is a name which includes "peak" in the peak_names add a possible name without peak
     # Also add for all peaks without "peak" the name with "peak"
     # Also add for all peaks without "peak" the name with prefix "mount"
-    peak_names = peak_names + [p.replace('peak', '').strip() for p in peak_names if 'peak' in p.lower()]
-    peak_names = peak_names + [p + ' peak' for p in peak_names if 'peak' not in p.lower()]
-    peak_names = peak_names + ['mount ' + p for p in peak_names if 'peak' not in p.lower()]
-    # For all the possible names of the peak, try to access the peak page
-    page_found = False
-    for peak_name in peak_names:
-        # Get the peak_page
-        peak_url = f'https://peakvisor.com/peak/{peak_name.lower().replace(" ", "-")}.html'
-        peak_page = requests.get(peak_url)
-        # If the peak_page is not found, continue
-        if peak_page.status_code == 404:
-            continue
-        # If the peak_page is found, break the loop
-        else:
-            # Make sure the peak_page we found is for a peak in Nepal
-            # use BeautifulSoup to scrape the peak profile
-            soup = BeautifulSoup(peak_page.text, "lxml")
-            # Check that we are looking at a peak in Nepal
-            nepal_peak = False
-            try:
-                # Get all countries in the location section
-                countries_section = soup.find_all('div', attrs={"class": "sidebar__hs-country"})
-                # For all countries, check if the first element is Nepal and if it is get the disctrict from
-                # the last element
-                for country in countries_section:
-                    country_detail_section = country.find('div', attrs={"class": "sidebar__hs-chip-content"})
-                    country_details = country_detail_section.find_all('li')
-                    if country_details[0].text == 'Nepal':
-                        district = country_details[-1].text
-                        nepal_peak = True
-                        break
-                # If the peak is not in Nepal, continue
-                if not nepal_peak:
-                    continue
-                # Get the latitude and longitude section
-                location_section = soup.find('div', attrs={"class": "sidebar__hs-chip location-coordinates js-location-coordinates js-copy-to-clipboard"})
-                lat = location_section.find('span', attrs={"id": "lat"}).text
-                lon = location_section.find('span', attrs={"id": "lng"}).text
-                # Get the text from the about section
-                about = soup.find('div', attrs={"class": "sidebar__hs-desc-text"}).text.strip()
-                # We found the peak and the data. We can stop here
-                page_found = True
+    variants = [(p, 'name') for p in peak_names]
+    variants = variants + [(p.replace('peak', '').strip(), 'without_peak') for p, _ in variants if 'peak' in p.lower()]
+    variants = variants + [(p + ' peak', 'with_peak') for p, _ in variants if 'peak' not in p.lower()]
+    variants = variants + [('mount ' + p, 'mount') for p, _ in variants if 'peak' not in p.lower()]
+    # Remove the variants leading to the same URL
+    unique_variants, variant_urls = [], set()
+    for peak_name, pattern in variants:
+        if peak_name.lower() not in variant_urls:
+            variant_urls.add(peak_name.lower())
+            unique_variants.append((peak_name, pattern))
+    return unique_variants
+
+
+def get_peakvisor_probe_order(variants: List[Tuple[str, str]], pattern_wins: Counter) -> List[int]:
+    """
+    Get the order in which the name variants of a peak are requested: the variant patterns which found the most peaks
+    first, then in order of preference. The order only changes the requests sent, the variant kept for a peak is always
+    the preferred variant found in Nepal.
+    :param variants: The list of (name variant, variant pattern) tuples in order of preference
+    :param pattern_wins: The number of peaks found by each variant pattern
+    :return: The list of the indexes of the variants in the order they are requested
+    """
+    return sorted(range(len(variants)), key=lambda i: (-pattern_wins[variants[i][1]], i))
+
+
+def load_peakvisor_pattern_wins() -> Counter:
+    """
+    Load the number of peaks found by each name variant pattern in the previous runs
+    :return: The counter of the peaks found by pattern, empty if there was no previous run
+    """
+    wins_file = http_cache.cache_dir / PEAKVISOR_PATTERN_WINS_FILE
+    return Counter(json.loads(wins_file.read_text(encoding='utf-8'))) if wins_file.exists() else Counter()
+
+
+def save_peakvisor_pattern_wins(pattern_wins: Counter):
+    """
+    Save the number of peaks found by each name variant pattern for the next runs
+    :param pattern_wins: The counter of the peaks found by pattern
+    """
+    http_cache.cache_dir.mkdir(parents=True, exist_ok=True)
+    (http_cache.cache_dir / PEAKVISOR_PATTERN_WINS_FILE).write_text(json.dumps(dict(pattern_wins), indent=2),
+                                                                     encoding='utf-8')
+
+
+def parse_peakvisor_page(html: str) -> Optional[Tuple[str, str, str, str]]:
+    """
+    Parse the latitude, longitude, district and about text of a peak from its PeakVisor page
+    :param html: The HTML of the PeakVisor peak page
+    :return: The latitude, longitude, district and about of the peak or None if the peak is not in Nepal
+    """
+    from bs4 import BeautifulSoup
+    # Make sure the peak_page we found is for a peak in Nepal
+    # use BeautifulSoup to scrape the peak profile
+    soup = BeautifulSoup(html, "lxml")
+    # Check that we are looking at a peak in Nepal
+    district = None
+    try:
+        # Get all countries in the location section
+        countries_section = soup.find_all('div', attrs={"class": "sidebar__hs-country"})
+        # For all countries, check if the first element is Nepal and if it is get the disctrict from
+        # the last element
+        for country in countries_section:
+            country_detail_section = country.find('div', attrs={"class": "sidebar__hs-chip-content"})
+            country_details = country_detail_section.find_all('li')
+            if country_details[0].text == 'Nepal':
+                district = country_details[-1].text
                 break
-            except AttributeError:
-                # If there was an error reset the lat, lon, district and about and continue
-                lat, lon, district, about = None, None, None, None
-                continue
-    # If the peak_page is not found, return None for all the values
-    if not page_found:
-        return None, None, None, None
+        # If the peak is not in Nepal, return None
+        if district is None:
+            return None
+        # Get the latitude and longitude section
+        location_section = soup.find('div', attrs={"class": "sidebar__hs-chip location-coordinates js-location-coordinates js-copy-to-clipboard"})
+        lat = location_section.find('span', attrs={"id": "lat"}).text
+        lon = location_section.find('span', attrs={"id": "lng"}).text
+        # Get the text from the about section
+        about = soup.find('div', attrs={"class": "sidebar__hs-desc-text"}).text.strip()
+    except AttributeError:
+        # If there was an error the page can't be used
+        return None
     return lat, lon, district, about
 
 
+def _peakvisor_url(peak_name: str) -> str:
+    return f'{PEAKVISOR_URL}/peak/{peak_name.lower().replace(" ", "-")}.html'
+
+
+async def fetch_peakvisor_pages(fetcher: AsyncFetcher, peak_names: List[str], archive: PageArchive,
+                                pattern_wins: Counter = None):
+    """
+    Fetch stage of the PeakVisor scraping of a peak. The name variants of the peak are requested one after the other,
+    the variant patterns which found the most peaks first. Each variant is checked with a cheap HEAD request and only
+    the existing pages are downloaded and stored in the archive of the raw pages. Once a page of a peak in Nepal is
+    found, the less preferred variants are not requested anymore, as they would not be kept.
+    :param fetcher: The asynchronous fetch engine
+    :param peak_names: The list of possible names for the peak
+    :param archive: The archive in which the raw pages are stored
+    :param pattern_wins: The number of peaks found by each variant pattern in the previous runs
+    """
+    variants = get_peakvisor_name_variants(peak_names)
+    # The index in order of preference of the best variant found in Nepal
+    found_index = len(variants)
+    for i in get_peakvisor_probe_order(variants, pattern_wins or Counter()):
+        if i > found_index:
+            continue
+        peak_url = _peakvisor_url(variants[i][0])
+        try:
+            peak_page = await fetcher.fetch(peak_url) if await fetcher.exists(peak_url) else None
+        except CacheMissError:
+            # In offline mode, the variants which were never requested are considered as not found
+            continue
+        if peak_page is None or peak_page.status_code != 200:
+            archive.discard(peak_url)
+            continue
+        archive.put_response(peak_page)
+        # Check the page is of a peak in Nepal outside of the event loop, the parse stage parses it again
+        if await asyncio.to_thread(parse_peakvisor_page, peak_page.text) is not None:
+            found_index = i
+
+
+async def fetch_all_peakvisor_pages(all_peak_names: List[List[str]], archive: PageArchive,
+                                    pattern_wins: Counter = None) -> List[Optional[Exception]]:
+    """
+    Fetch the PeakVisor pages of all the peaks concurrently
+    :param all_peak_names: The list of the lists of possible names of each peak
+    :param archive: The archive in which the raw pages are stored
+    :param pattern_wins: The number of peaks found by each variant pattern in the previous runs
+    :return: The list of the errors which occurred while fetching the pages of each peak, None if there was no error
+    """
+    import httpx
+    from tqdm import tqdm
+    async with AsyncFetcher(http_cache, per_host_concurrency=8) as fetcher:
+        with tqdm(total=len(all_peak_names)) as progress_bar:
+            async def fetch(peak_names):
+                try:
+                    await fetch_peakvisor_pages(fetcher, peak_names, archive, pattern_wins)
+                except (httpx.HTTPError, OSError) as e:
+                    return e
+                finally:
+                    progress_bar.update(1)
+                return None
+            return await asyncio.gather(*[fetch(peak_names) for peak_names in all_peak_names])
+
+
+def parse_peakvisor_pages(all_peak_names: List[List[str]], archive: PageArchive, max_workers: Optional[int] = None,
+                          pattern_wins: Counter = None) -> List[Tuple[str, str, str, str]]:
+    """
+    Parse stage of the PeakVisor scraping. The archived pages of all the name variants are parsed in parallel in worker
+    processes, then for each peak the first variant, in order of preference, leading to a peak in Nepal is kept.
+    :param all_peak_names: The list of the lists of possible names of each peak
+    :param archive: The archive of the raw pages
+    :param max_workers: The number of parser worker processes, by default the number of CPUs
+    :param pattern_wins: If set, the counter of the peaks found by variant pattern, updated with the kept variants
+    :return: The list of latitude, longitude, district and about of each peak
+    """
+    variant_urls = {_peakvisor_url(peak_name) for peak_names in all_peak_names
+                    for peak_name, _ in get_peakvisor_name_variants(peak_names)}
+    archived_urls = sorted(variant_urls.intersection(archive.urls(f'{PEAKVISOR_URL}/peak/')))
+    parsed_pages = dict(zip(archived_urls, parse_archived_pages(parse_peakvisor_page,
+                                                                [((), url) for url in archived_urls],
+                                                                archive, max_workers)))
+    # The pages failing to parse cannot be used, as the pages of peaks outside of Nepal
+    parsed_pages = {url: data for url, data in parsed_pages.items() if not isinstance(data, Exception)}
+    all_peakvisor_data = []
+    for peak_names in all_peak_names:
+        # If no page of a peak in Nepal is found, return None for all the values
+        peakvisor_data = (None, None, None, None)
+        for peak_name, pattern in get_peakvisor_name_variants(peak_names):
+            if parsed_pages.get(_peakvisor_url(peak_name)) is not None:
+                if pattern_wins is not None:
+                    pattern_wins[pattern] += 1
+                peakvisor_data = parsed_pages[_peakvisor_url(peak_name)]
+                break
+        all_peakvisor_data.append(peakvisor_data)
+    return all_peakvisor_data
+
+
+def get_data_from_peakvisor(peak_names: List[str]) -> Tuple[str, str, str, str]:
+    """
+    Get the latitude, longitude, district and about text of a peak from the PeakVisor website
+    :param peak_names: The list of possible names for the peak
+    :return: The latitude, longitude, district and about of the peak
+    """
+    pattern_wins = load_peakvisor_pattern_wins()
+
+    async def fetch():
+        async with AsyncFetcher(http_cache) as fetcher:
+            await fetch_peakvisor_pages(fetcher, peak_names, page_archive, pattern_wins)
+    asyncio.run(fetch())
+    peakvisor_data = parse_peakvisor_pages([peak_names], page_archive, max_workers=1, pattern_wins=pattern_wins)[0]
+    save_peakvisor_pattern_wins(pattern_wins)
+    return peakvisor_data
+
+
+def collect_peakvisor_data(peak_ids: List[str], all_peak_names: List[List[str]], archive: PageArchive,
+                           journal: CheckpointJournal, fetch_pages: bool = True, resume: bool = False,
+                           max_workers: Optional[int] = None) -> List[Tuple[str, str, str, str]]:
+    """
+    Collect the data of all the peaks from the PeakVisor website, fetching and parsing their pages. Each peak data is
+    recorded in the journal, and in resume mode the peaks already collected by a previous run are skipped.
+    :param peak_ids: The list of the peak IDs
+    :param all_peak_names: The list of the lists of possible names of each peak
+    :param archive: The archive of the raw pages
+    :param journal: The checkpoint journal of the collection
+    :param fetch_pages: If False, only parse the pages archived by a previous run
+    :param resume: If True, skip the peaks already collected according to the journal
+    :param max_workers: The number of parser worker processes, by default the number of CPUs
+    :return: The list of latitude, longitude, district and about of each peak
+    """
+    collected_peaks = journal.results('peakvisor') if resume else {}
+    peaks_to_collect = [(peak_id, peak_names) for peak_id, peak_names in zip(peak_ids, all_peak_names)
+                        if peak_id not in collected_peaks]
+    # The fetch stage requests the variants in the order learned by the previous runs, the same order for all the peaks
+    # whatever the order in which their pages are received
+    pattern_wins = load_peakvisor_pattern_wins()
+    if fetch_pages:
+        errors = asyncio.run(fetch_all_peakvisor_pages([peak_names for _, peak_names in peaks_to_collect], archive,
+                                                       pattern_wins))
+        for (peak_id, _), error in zip(peaks_to_collect, errors):
+            if error is not None:
+                journal.record('peakvisor', peak_id, error=f"Could not fetch the PeakVisor pages: {error!r}")
+        peaks_to_collect = [peak for peak, error in zip(peaks_to_collect, errors) if error is None]
+    peakvisor_data = parse_peakvisor_pages([peak_names for _, peak_names in peaks_to_collect], archive, max_workers,
+                                           pattern_wins)
+    save_peakvisor_pattern_wins(pattern_wins)
+    for (peak_id, _), data in zip(peaks_to_collect, peakvisor_data):
+        journal.record('peakvisor', peak_id, result=list(data))
+    collected_peaks = journal.results('peakvisor')
+    failures = {peak_id: error for peak_id, error in journal.failures('peakvisor').items() if peak_id in peak_ids}
+    if failures:
+        for peak_id, error in failures.items():
+            print(f"Could not collect the PeakVisor data of the peak {peak_id}: {error}")
+        raise RuntimeError(f"Could not collect the PeakVisor data of {len(failures)} peaks, run the collection again "
+                           f"with the --resume option to retry only the failed peaks")
+    return [tuple(collected_peaks[peak_id]) for peak_id in peak_ids]
+
+
+def _explode_alternate_names(alt_names: pd.Series, remove_question_marks: bool = False) -> pd.Series:
+    """
+    Explode a Series of comma separated alternate names into a Series with one stripped name per row. The Series keeps
+    the index of the row the name comes from, so that the names can be mapped back to their peak.
+    :param alt_names: The Series of comma separated alternate names
+    :param remove_question_marks: If True, remove the question marks from the alternate names
+    :return: The Series of stripped alternate names indexed by the row index of their peak
+    """
+    exploded_alt_names = alt_names.dropna().astype(str).str.split(',').explode()
+    if remove_question_marks:
+        exploded_alt_names = exploded_alt_names.str.replace('?', '', regex=False)
+    return exploded_alt_names.str.strip()
+
+
+def find_non_matching_peaks(hd_peaks_df: pd.DataFrame, nhpp_peaks_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Find the peaks in both the NHPP and HD datasets which are not found in the other, neither by ID nor by any of
+    their names or alternate names. The peaks' names are exploded once and each side is anti-joined against the set of
+    all the names of the other side, so the matching runs in linear time with the number of names.
+    :param hd_peaks_df: The Himalayan Database peaks dataframe
+    :param nhpp_peaks_df: The NHPP peaks dataframe
+    :return: The non-matching peaks dataframe
+    """
+    peaks_df = hd_peaks_df.merge(nhpp_peaks_df, how='outer', left_on='PEAKID', right_on='ID')
+    peaks_df = peaks_df[['PEAKID', 'PKNAME', 'PKNAME2', 'ID', 'NAME', 'ALTERNATE_NAMES']]
+    peaks_df = peaks_df.rename(columns={"PEAKID": "HD_ID", "PKNAME": "HD_NAME", "PKNAME2": "HD_ALT_NAMES",
+                                        "ID": "NHPP_ID", "NAME": "NHPP_NAME", "ALTERNATE_NAMES": "NHPP_ALT_NAMES"})
+    # Get all the possible peak names and alternate names from both datasets as hashed sets of names
+    all_hd_possible_names = set(pd.concat([
+        peaks_df['HD_NAME'].dropna(), _explode_alternate_names(peaks_df['HD_ALT_NAMES'], remove_question_marks=True)]))
+    all_nhpp_possible_names = set(pd.concat([
+        peaks_df['NHPP_NAME'].dropna(), _explode_alternate_names(peaks_df['NHPP_ALT_NAMES'])]))
+    # Keep only rows with PeakID or ID null
+    peaks_df = peaks_df[peaks_df['HD_ID'].isnull() | peaks_df['NHPP_ID'].isnull()]
+    # Explode the names of the remaining peaks once and flag the rows where one of the possible names of the peak
+    # in one dataset is in the names or alternate names of the other dataset
+    hd_names = pd.concat([peaks_df['HD_NAME'].dropna().str.strip(), _explode_alternate_names(peaks_df['HD_ALT_NAMES'])])
+    nhpp_names = pd.concat([peaks_df['NHPP_NAME'].dropna().str.strip(),
+                            _explode_alternate_names(peaks_df['NHPP_ALT_NAMES'])])
+    matching_index = hd_names[hd_names.isin(all_nhpp_possible_names)].index.union(
+        nhpp_names[nhpp_names.isin(all_hd_possible_names)].index)
+    # Anti-join: drop all the peaks matched by name in the other dataset
+    return peaks_df[~peaks_df.index.isin(matching_index)]
+
+
 def get_nhpp_and_hd_non_matching_peaks(nhpp_peaks_df: pd.DataFrame) -> pd.DataFrame:
     """
     This function gets all the peaks in both the NHPP and HD datasets which are not found in the other.
@@ -363,66 +960,29 @@ def get_nhpp_and_hd_non_matching_peaks(nhpp_peaks_df: pd.DataFrame) -> pd.DataFr
     :param nhpp_peaks_df: The NHPP peaks dataframe
     :return: The non-matching peaks dataframe
     """
+    from dbfread.dbf import DBF
     # Get the Himalayan Database peaks data into a Pandas DataFrame
     peaks_dbf = DBF(HDB_DATA_DIR / 'peaks.DBF')
     hd_peaks_df = pd.DataFrame(iter(peaks_dbf))
     # Get the non-matching peaks
-    non_matching_peaks_df = hd_peaks_df.merge(nhpp_peaks_df, how='outer', left_on='PEAKID', right_on='ID')
-    non_matching_peaks_df = non_matching_peaks_df[['PEAKID', 'PKNAME', 'PKNAME2', 'ID', 'NAME', 'ALTERNATE_NAMES']]
-    non_matching_peaks_df.rename(columns={"PEAKID": "HD_ID", "PKNAME": "HD_NAME", "PKNAME2": "HD_ALT_NAMES",
-                                          "ID": "NHPP_ID", "NAME": "NHPP_NAME", "ALTERNATE_NAMES": "NHPP_ALT_NAMES"},
-                                 inplace=True)
-    # Get all the possible peak names and alternate names from the HD dataset in a single flat list
-    all_hd_names = non_matching_peaks_df[non_matching_peaks_df['HD_NAME'].notnull()]['HD_NAME'].tolist()
-    all_hd_alt_names = non_matching_peaks_df[
-        non_matching_peaks_df['HD_ALT_NAMES'].notnull()]['HD_ALT_NAMES'].tolist()
-    all_hd_alt_names = [name.replace('?', '').strip() for names in all_hd_alt_names for name in names.split(',')]
-    all_hd_possible_names = all_hd_names + all_hd_alt_names
-    # Get all the possible peak names and alternate names from the NHPP dataset in a single flat list
-    all_nhpp_names = non_matching_peaks_df[non_matching_peaks_df['NHPP_NAME'].notnull()]['NHPP_NAME'].tolist()
-    all_nhpp_alt_names = non_matching_peaks_df[
-        non_matching_peaks_df['NHPP_ALT_NAMES'].notnull()]['NHPP_ALT_NAMES'].tolist()
-    all_nhpp_alt_names = [name.strip() for names in all_nhpp_alt_names for name in names.split(',')]
-    all_nhpp_possible_names = all_nhpp_names + all_nhpp_alt_names
-    # Keep only rows with PeakID or ID null
-    non_matching_peaks_df = non_matching_peaks_df[
-        non_matching_peaks_df['HD_ID'].isnull() | non_matching_peaks_df['NHPP_ID'].isnull()]
-    # For all the rows in the DataFrame where one of the possible name of the peak in the HD dataset
-    # is in the name or alternate column of the NHPP dataset, then drop the hd_peak
-    for index, hd_peak in non_matching_peaks_df[non_matching_peaks_df['HD_NAME'].notnull()].iterrows():
-        # Get all the possible names of the peak
-        hd_names = [hd_peak['HD_NAME']]
-        if pd.notnull(hd_peak['HD_ALT_NAMES']):
-            hd_names += [name.strip() for name in hd_peak['HD_ALT_NAMES'].split(',')]
-        # For each alternate name, if it is in the name column, drop the hd_peak
-        for name in hd_names:
-            if name.strip() in all_nhpp_possible_names:
-                non_matching_peaks_df.drop(index, inplace=True)
-                break
-    # For all the rows in the DataFrame where one of the possible name of the peak in the NHPP dataset
-    # is in the name or alternate column of the HD dataset, then drop the hd_peak
-    for index, nhpp_peak in non_matching_peaks_df[non_matching_peaks_df['NHPP_NAME'].notnull()].iterrows():
-        # Get all the possible names of the peak
-        nhpp_names = [nhpp_peak['NHPP_NAME']]
-        if pd.notnull(nhpp_peak['NHPP_ALT_NAMES']):
-            nhpp_names += nhpp_peak['NHPP_ALT_NAMES'].split(',')
-        # For each alternate name, if it is in the name column, drop the hd_peak
-        for name in nhpp_names:
-            if name.strip() in all_hd_possible_names:
-                non_matching_peaks_df.drop(index, inplace=True)
-                break
+    non_matching_peaks_df = find_non_matching_peaks(hd_peaks_df, nhpp_peaks_df)
     non_matching_peaks_df.to_csv(NHPP_DATA_DIR / 'non_matching_peaks.csv', index=False)
     return non_matching_peaks_df
 
 
-def get_missing_peak_data_from_peakvisor(nhpp_peaks_df: pd.DataFrame,
-                                         non_matching_peaks_df: pd.DataFrame) -> pd.DataFrame:
+def get_missing_peak_data_from_peakvisor(nhpp_peaks_df: pd.DataFrame, non_matching_peaks_df: pd.DataFrame,
+                                         fetch_pages: bool = True, resume: bool = False,
+                                         max_workers: Optional[int] = None) -> pd.DataFrame:
     """
     This function gets the list of peak which are in the NHPP dataset but not in the HD dataset and vice-versa.
     :param nhpp_peaks_df: The NHPP peaks dataframe
     :param non_matching_peaks_df: The dataframe of non-matching peaks from the NHPP and HD datasets
+    :param fetch_pages: If False, only parse the PeakVisor pages archived by a previous run
+    :param resume: If True, skip the peaks already collected by a previous run according to the collection journal
+    :param max_workers: The number of parser worker processes, by default the number of CPUs
     :return: The dataframe with missing peaks from both the NHPP and HD datasets
     """
+    from dbfread.dbf import DBF
     # Get the Himalayan Database peaks data into a Pandas DataFrame
     peaks_dbf = DBF(HDB_DATA_DIR / 'peaks.DBF')
     hd_peaks_df = pd.DataFrame(iter(peaks_dbf))
@@ -433,7 +993,7 @@ def get_missing_peak_data_from_peakvisor(nhpp_peaks_df: pd.DataFrame,
     # Get the peaks as a list of dictionary records
     peaks = non_matching_peaks_df.to_dict('records')
     # Remove the peaks for which we have an ID in the PEAKVISOR_NOT_TO_IMPORT list
-    peaks = [peak for peak in peaks if peak['HD_ID'] not in PEAKVISOR_NOT_TO_IMPORT]
+    peaks = [peak for peak in peaks if peak['HD_ID'] not in load_peaks_corrections()['PEAKVISOR_NOT_TO_IMPORT']]
     peak_ids = [peak['HD_ID'] for peak in peaks]
     # For all peaks convert the HD_ALT_NAMES to a list and add a field of all the peak possible names as the
     # combination of the HD_NAME and the HD_ALT_NAMES list
@@ -443,32 +1003,39 @@ def get_missing_peak_data_from_peakvisor(nhpp_peaks_df: pd.DataFrame,
         else:
             peak['HD_ALT_NAMES'] = []
         peak['PEAK_POSSIBLE_NAMES'] = [peak['HD_NAME']] + peak['HD_ALT_NAMES']
-    # Use 4 workers in parallel to process the peaks and get their data from peakvisor
+    # Fetch the peaks pages concurrently from peakvisor, then parse the archived pages to get the peaks data
     # And use TQDM to show the progress
-    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-        peakvisor_data = list(
-            tqdm(executor.map(get_data_from_peakvisor, [peak['PEAK_POSSIBLE_NAMES'] for peak in peaks]),
-                 total=len(peaks)))
-    # For all the distict values in peakvisor_data[i][2] check if the value is contained in on of the possible_districts
-    # If it is, replace the value with the one from the possible_districts
+    peakvisor_data = collect_peakvisor_data(peak_ids, [peak['PEAK_POSSIBLE_NAMES'] for peak in peaks], page_archive,
+                                            collection_journal, fetch_pages, resume, max_workers)
+    # Get the district and province of the peaks from their coordinates with the offline spatial lookup when the
+    # districts boundaries are available
+    if NEPAL_DISTRICTS_FILE.exists():
+        from lib.data_collection.region_lookup import RegionLookup
+        regions_df = RegionLookup(NEPAL_DISTRICTS_FILE).lookup([data[0] for data in peakvisor_data],
+                                                               [data[1] for data in peakvisor_data])
+        for peak, border_districts in zip(peaks, regions_df['BORDER_DISTRICTS']):
+            if border_districts is not None:
+                print(f"The peak {peak['HD_ID']} is on the border of the districts {border_districts}")
+    else:
+        print(f"The {NEPAL_DISTRICTS_FILE} districts boundaries are missing, build them with the nepal-districts DVC stage."
+              f" The districts scraped from PeakVisor are used instead")
+        regions_df = pd.DataFrame({'DISTRICT': None, 'PROVINCE': None}, index=range(len(peakvisor_data)))
+    # For the peaks not located by the spatial lookup, check if the district scraped from peakvisor is contained in
+    # one of the possible_districts. If it is, replace the value with the one from the possible_districts
     # If it is not contained in any of the possible_districts keep the value
     districts = []
-    province = []
     for i in range(len(peakvisor_data)):
-        district_found = False
-        for possible_district in possible_districts:
-            if peakvisor_data[i][2] and peakvisor_data[i][2] in possible_district:
-                districts.append(possible_district)
-                district_found = True
-                break
-        # Get the province data for all discticts from district with the same name
-        if not district_found:
-            districts.append(peakvisor_data[i][2])
-        if districts[i]:
-            # Find in the NHPP Dataframe a row with the same district name and get the municipality from it
-            province.append(nhpp_peaks_df[nhpp_peaks_df['DISTRICT'] == districts[i]]['PROVINCE'].values[0])
+        if regions_df.loc[i, 'DISTRICT'] is not None:
+            districts.append(regions_df.loc[i, 'DISTRICT'])
+        elif peakvisor_data[i][2]:
+            districts.append(next((d for d in possible_districts if peakvisor_data[i][2] in d), peakvisor_data[i][2]))
         else:
-            province.append(None)
+            districts.append(None)
+    # Get the province data for all discticts from district with the same name in the NHPP Dataframe
+    district_provinces = nhpp_peaks_df.dropna(subset=['DISTRICT']).drop_duplicates('DISTRICT')
+    district_provinces = dict(zip(district_provinces['DISTRICT'], district_provinces['PROVINCE']))
+    province = [regions_df.loc[i, 'PROVINCE'] if regions_df.loc[i, 'PROVINCE'] is not None
+                else district_provinces.get(district) for i, district in enumerate(districts)]
     # Get the ranges from the LOCATION column of the HD dataset in hd_peaks_df
 
     ranges = hd_peaks_df[hd_peaks_df['PEAKID'].isin(peak_ids)]['LOCATION'].tolist()
@@ -503,30 +1070,62 @@ def get_missing_peak_data_from_peakvisor(nhpp_peaks_df: pd.DataFrame,
         peakvisor_df.loc[peakvisor_df['ID'] == 'SANK', 'RANGE'] = 'Damodar'
     peakvisor_df.dropna(subset=['LAT', 'LON'], inplace=True)
     # Save the peakvisor_df to a csv file
-    peakvisor_df.to_csv(NHPP_DATA_DIR / 'peakvisor_peaks.csv', index=False)
+    save_csv_atomically(peakvisor_df, NHPP_DATA_DIR / 'peakvisor_peaks.csv')
     return peakvisor_df
 
 
-if __name__ == "__main__":
-    # Get all the peaks
-    print("Web Scrapping all the peaks' URLs")
-    all_peaks = get_all_nhpp_peak_table()
+def collect_peaks_data(parse_only: bool = False, resume: bool = False, selenium: bool = False,
+                       max_workers: Optional[int] = None):
+    """
+    Collect the NHPP peak profiles and the missing peaks from PeakVisor, and save them to the nhpp_peaks.csv and
+    peakvisor_peaks.csv files
+    :param parse_only: Only parse again the pages archived by a previous run, without accessing the websites
+    :param resume: Resume the previous collection, skipping the peaks already collected and retrying only the failed
+    ones
+    :param selenium: Render the peaks' table with Selenium instead of requesting its data over HTTP
+    :param max_workers: The number of parser worker processes, by default the number of CPUs
+    :return: None
+    """
+    if not resume:
+        collection_journal.reset()
+    # Reuse the archived peaks' table when parsing the archived pages or resuming a collection
+    all_peaks = load_archived_nhpp_peak_table(page_archive) if parse_only or resume else None
+    if all_peaks is None:
+        if parse_only:
+            raise RuntimeError("The peaks' table is not archived, run the collection without the --parse-only option")
+        # Get all the peaks
+        print("Web Scrapping all the peaks' URLs")
+        all_peaks = get_all_nhpp_peak_table_with_selenium() if selenium else get_all_nhpp_peak_table()
     # Get the peak profile for each peak
     print("Web Scrapping all the peaks' profiles")
-    # Use multi-threading to load the peak details in parallel in groups of 8
-    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-        peaks = list(tqdm(executor.map(get_nhpp_peak_profile, all_peaks), total=len(all_peaks)))
-    # Save the peaks details in a CSV file
+    # Use the asynchronous fetch engine to load the peak profile pages concurrently into the pages archive, then parse
+    # the archived pages in parallel. Each peak details are recorded in the collection journal as they are parsed
+    peaks = collect_nhpp_peak_profiles(all_peaks, page_archive, collection_journal, fetch_pages=not parse_only,
+                                       resume=resume, max_workers=max_workers)
+    # Save the peaks details in a CSV file in the order of the peak table
     print("Saving the peaks' details in a CSV file")
     nhpp_peaks_df = pd.DataFrame(peaks)
-    # Save the NHPP dataset into a CSV file
-    peaks_file = NHPP_DATA_DIR / 'nhpp_peaks.csv'
-    os.makedirs(os.path.dirname(peaks_file), exist_ok=True)
-    nhpp_peaks_df.to_csv(peaks_file, index=False, encoding='utf-8')
-    # Below line is used when testing to avoid web scrapping again
-    # nhpp_peaks_df = pd.read_csv(NHPP_DATA_DIR / 'nhpp_peaks.csv')  # For testing
+    save_csv_atomically(nhpp_peaks_df, NHPP_DATA_DIR / 'nhpp_peaks.csv')
     # Get the peaks from both the NHPP and HD datasets which do not match
     non_matching_peaks_df = get_nhpp_and_hd_non_matching_peaks(nhpp_peaks_df)
     # Try to get the missing peaks from the Peakvisor website
     print("Web Scrapping the missing peaks from Peakvisor")
-    get_missing_peak_data_from_peakvisor(nhpp_peaks_df, non_matching_peaks_df)
+    get_missing_peak_data_from_peakvisor(nhpp_peaks_df, non_matching_peaks_df, fetch_pages=not parse_only,
+                                         resume=resume, max_workers=max_workers)
+    print(f"HTTP cache statistics: {http_cache.stats}")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Scrape the peaks data from the NHPP and PeakVisor websites")
+    arg_parser.add_argument('--parse-only', action='store_true',
+                            help="Only parse again the pages archived by a previous run, without accessing the websites")
+    arg_parser.add_argument('--resume', action='store_true',
+                            help="Resume the previous collection, skipping the peaks already collected and retrying "
+                                 "only the failed ones")
+    arg_parser.add_argument('--selenium', action='store_true',
+                            help="Render the peaks' table with Selenium instead of requesting its data over HTTP")
+    arg_parser.add_argument('--workers', type=int, default=None,
+                            help="Number of parser worker processes, by default the number of CPUs")
+    args = arg_parser.parse_args()
+    collect_peaks_data(parse_only=args.parse_only, resume=args.resume, selenium=args.selenium,
+                       max_workers=args.workers)
@@ -1,18 +1,15 @@
-import json
 import pandas as pd
 
 from typing import List, Dict
 from pathlib import Path
 from dbfread.dbf import DBF
 
+from lib.data_collection.peak_names import PeakNameIndex
+from lib.data_collection.peaks_corrections import load_peaks_corrections
+
 DATA_DIR = Path(__file__).parent.parent.parent / 'assets/data'
 NHPP_DATA_DIR = DATA_DIR / 'nhpp'
 HDB_DATA_DIR = DATA_DIR / 'hdb'
-# Load the peaks_corrections.json file
-with open(NHPP_DATA_DIR / 'peaks_corrections.json', 'r') as f:
-    peaks_corrections = json.load(f)
-NHPP_PEAKS_CORRECTIONS = peaks_corrections['NHPP_PEAKS_CORRECTIONS']
-HD_PEAK_CORRECTIONS = peaks_corrections['HD_PEAK_CORRECTIONS']
 
 
 def apply_corrections(df: pd.DataFrame, corrections_to_apply: List[Dict[str, str]], is_nhpp: bool) -> pd.DataFrame:
@@ -43,7 +40,32 @@ def apply_corrections(df: pd.DataFrame, corrections_to_apply: List[Dict[str, str
     return corected_df
 
 
-def merge_nepal_peaks_datasets():
+def save_peak_match_candidates(nhpp_peaks_df: pd.DataFrame, hd_peaks_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Search with a fuzzy peak name index the Himalayan Database peaks which could match the NHPP, Peakvisor or manually
+    collected peaks without any exact name match (e.g. spelling variants like "Kangchenjunga" and "Kanchenjunga").
+    The candidates are not applied to the data, they are saved in the peak_match_candidates.csv file in the
+    /data/nhpp folder to be reviewed and added to the peaks_corrections.json file.
+    :param nhpp_peaks_df: The merged Nepal peaks DataFrame with a null PEAKID for the peaks without match
+    :param hd_peaks_df: The exploded Himalayan Database peaks DataFrame
+    :return: The DataFrame of the matching candidates
+    """
+    # Only index the HD peaks which have not been matched yet
+    hd_peaks_df = hd_peaks_df[~hd_peaks_df['PEAKID'].isin(nhpp_peaks_df['PEAKID'].dropna())]
+    hd_peaks_df = hd_peaks_df.groupby('PEAKID')['ALL_NAMES'].agg(list).reset_index()
+    unmatched_peaks_df = nhpp_peaks_df[nhpp_peaks_df['PEAKID'].isnull()].copy()
+    unmatched_peaks_df['ALL_NAMES'] = unmatched_peaks_df[['NAME', 'ALTERNATE_NAMES']].fillna('').agg(','.join, axis=1)
+    unmatched_peaks_df['ALL_NAMES'] = unmatched_peaks_df['ALL_NAMES'].apply(
+        lambda x: [name.strip() for name in x.split(',') if name])
+    peak_name_index = PeakNameIndex(hd_peaks_df, id_column='PEAKID', names_column='ALL_NAMES')
+    candidates_df = peak_name_index.match_dataframe(unmatched_peaks_df, id_column='ID', names_column='ALL_NAMES')
+    candidates_df = candidates_df.merge(unmatched_peaks_df[['ID', 'NAME']], how='left', on='ID')
+    candidates_df = candidates_df[['ID', 'NAME', 'MATCH_ID', 'MATCH_NAME', 'MATCH_RANK', 'MATCH_SCORE']]
+    candidates_df.to_csv(NHPP_DATA_DIR / 'peak_match_candidates.csv', index=False)
+    return candidates_df
+
+
+def merge_nepal_peaks_datasets() -> pd.DataFrame:
     """
     This function concatenates the peaks data collected from the NHPP and Peakvisor websites and manually collected data
     and adds the references from the Himalayan Database into result dataset.
@@ -52,7 +74,8 @@ def merge_nepal_peaks_datasets():
     """
     # Read the data from the NHPP website into a Pandas DataFrame
     nhpp_peaks_df = pd.read_csv(NHPP_DATA_DIR / 'nhpp_peaks.csv')
-    nhpp_peaks_df = apply_corrections(nhpp_peaks_df, NHPP_PEAKS_CORRECTIONS, is_nhpp=True)
+    nhpp_peaks_df = apply_corrections(nhpp_peaks_df, load_peaks_corrections()['NHPP_PEAKS_CORRECTIONS'],
+                                      is_nhpp=True)
     # Read the data from the Peakvisor website into a Pandas DataFrame
     peakvisor_peaks_df = pd.read_csv(NHPP_DATA_DIR / 'peakvisor_peaks.csv')  # For testing
     additional_peaks_df = pd.read_csv(NHPP_DATA_DIR / 'manually_collected_peaks.csv', sep=';', encoding='utf-8')
@@ -60,7 +83,7 @@ def merge_nepal_peaks_datasets():
     # Get the Himalayan Database peaks data into a Pandas DataFrame
     peaks_dbf = DBF(HDB_DATA_DIR / 'peaks.DBF')
     hd_peaks_df = pd.DataFrame(iter(peaks_dbf))
-    hd_peaks_df = apply_corrections(hd_peaks_df, HD_PEAK_CORRECTIONS, is_nhpp=False)
+    hd_peaks_df = apply_corrections(hd_peaks_df, load_peaks_corrections()['HD_PEAK_CORRECTIONS'], is_nhpp=False)
     # In both datasets create a new column ALL_NAMES as a list containing the NAME and  the content of the alternate
     # name column transformed as a list split by comma and stripped from spaces
     nhpp_peaks_df['ALL_NAMES'] = nhpp_peaks_df[['NAME', 'ALTERNATE_NAMES']].fillna('').agg(','.join, axis=1)
@@ -76,6 +99,8 @@ def merge_nepal_peaks_datasets():
                                         how='left', on='ALL_NAMES')
     # Regroup the  peaks by ID keeping the first vlu o every column
     nhpp_peaks_df = nhpp_peaks_df.groupby('ID').first().reset_index()
+    # Propose fuzzy matching candidates for the peaks without an exact name match to help curate the corrections
+    save_peak_match_candidates(nhpp_peaks_df, hd_peaks_df)
     # Copy the ID into PEAKID when it is null
     nhpp_peaks_df['PEAKID'] = nhpp_peaks_df['PEAKID'].fillna(nhpp_peaks_df['ID'])
     # Drop the PKNAME, PKNAME2 and ALL_NAMES columns. We don't need them anymore
@@ -90,6 +115,7 @@ def merge_nepal_peaks_datasets():
     nhpp_peaks_df['RANGE'] = nhpp_peaks_df['RANGE'].str.replace(' Himal', '', regex=False)
     # Save the dataset into a CSV file
     nhpp_peaks_df.to_csv(NHPP_DATA_DIR / 'preprocessed_nhpp_peaks.csv', index=False)
+    return nhpp_peaks_df
 
 
 if __name__ == "__main__":
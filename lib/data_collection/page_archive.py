@@ -0,0 +1,136 @@
+import time
+import zlib
+import sqlite3
+import threading
+
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from lib.data_collection.http_cache import CachedResponse
+
+
+class PageArchive:
+    def __init__(self, archive_file: Path, compression_level: int = 6):
+        """
+        Compressed and indexed archive of the raw pages downloaded by the web scrapers. The fetch stage of the scrapers
+        stores the pages in the archive and the parse stage reads them back, so the pages can be parsed again without
+        accessing the websites when the parsers change. The archive is a single SQLite file with one zlib compressed
+        page per URL, indexed by URL.
+        :param archive_file: The path of the archive file
+        :param compression_level: The zlib compression level, from 1 (fastest) to 9 (smallest)
+        """
+        self.archive_file = Path(archive_file)
+        self.compression_level = compression_level
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # The archive file is only opened when first used
+        if self._connection is None:
+            self.archive_file.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.archive_file, check_same_thread=False)
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    status_code INTEGER NOT NULL,
+                    encoding TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    content BLOB NOT NULL
+                )""")
+            self._connection.commit()
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self) -> 'PageArchive':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return self.connection.execute("SELECT 1 FROM pages WHERE url = ?", (url,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def put(self, url: str, content: bytes, status_code: int = 200, encoding: str = 'utf-8'):
+        """
+        Store a page in the archive, replacing the previous version of the page if any
+        :param url: The URL of the page
+        :param content: The raw page content
+        :param status_code: The HTTP status code of the page
+        :param encoding: The encoding of the page content
+        """
+        compressed_content = zlib.compress(content, self.compression_level)
+        with self._lock:
+            self.connection.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                                    (url, status_code, encoding or 'utf-8', time.time(), compressed_content))
+            self.connection.commit()
+
+    def put_response(self, response: CachedResponse):
+        """
+        Store a response of the HTTP cache or of the fetch engine in the archive
+        :param response: The response to store
+        """
+        self.put(response.url, response.content, response.status_code, response.encoding)
+
+    def discard(self, url: str):
+        """
+        Remove a page from the archive if it is archived, e.g. when the page does not exist anymore
+        :param url: The URL of the page
+        """
+        with self._lock:
+            self.connection.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self.connection.commit()
+
+    def get_compressed(self, url: str) -> Optional[Tuple[bytes, str]]:
+        """
+        Get a page without decompressing it, e.g. to send it to a parser worker process
+        :param url: The URL of the page
+        :return: A tuple containing the compressed page content and its encoding, or None if the page is not archived
+        """
+        with self._lock:
+            return self.connection.execute("SELECT content, encoding FROM pages WHERE url = ?", (url,)).fetchone()
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """
+        Get a page from the archive
+        :param url: The URL of the page
+        :return: The archived page or None if the page is not archived
+        """
+        with self._lock:
+            row = self.connection.execute("SELECT status_code, encoding, content FROM pages WHERE url = ?",
+                                          (url,)).fetchone()
+        if row is None:
+            return None
+        status_code, encoding, compressed_content = row
+        return CachedResponse(url, status_code, zlib.decompress(compressed_content), {}, from_cache=True,
+                              encoding=encoding)
+
+    def urls(self, prefix: str = '') -> List[str]:
+        """
+        Get the URLs of the archived pages
+        :param prefix: Only return the URLs starting with this prefix
+        :return: The sorted list of URLs
+        """
+        with self._lock:
+            rows = self.connection.execute("SELECT url FROM pages WHERE substr(url, 1, ?) = ? ORDER BY url",
+                                           (len(prefix), prefix)).fetchall()
+        return [url for url, in rows]
+
+    @staticmethod
+    def decompress(compressed_content: bytes, encoding: str) -> str:
+        """
+        Decompress and decode a page returned by get_compressed
+        :param compressed_content: The compressed page content
+        :param encoding: The encoding of the page content
+        :return: The page text
+        """
+        return zlib.decompress(compressed_content).decode(encoding or 'utf-8', errors='replace')
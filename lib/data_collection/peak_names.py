@@ -0,0 +1,169 @@
+import re
+import math
+import unicodedata
+import pandas as pd
+
+from difflib import SequenceMatcher
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+
+# Words commonly added before or after a peak name which do not help to identify it (e.g. "Mount Everest",
+# "Island Peak", "Ganesh Himal")
+PEAK_NAME_AFFIXES_REGEX = re.compile(r'\b(?:peak|himal|mount|mt|mt\.)(?=\s|$)')
+NON_ALPHANUMERIC_REGEX = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_peak_name(name: str) -> str:
+    """
+    Normalize a peak name to compare it with other peak names. The name is case-folded, the diacritics are removed, the
+    "peak", "himal" and "mount" affixes are removed and all non-alphanumeric characters are replaced by a single space.
+    E.g. "Mount Kāngchenjunga" and "Kangchenjunga Peak" are both normalized to "kangchenjunga".
+    :param name: The peak name
+    :return: The normalized peak name
+    """
+    if not isinstance(name, str):
+        return ''
+    # Decompose the accented characters and drop the combining diacritics marks
+    name = unicodedata.normalize('NFKD', name.casefold())
+    name = ''.join(c for c in name if not unicodedata.combining(c))
+    name = PEAK_NAME_AFFIXES_REGEX.sub(' ', name)
+    return NON_ALPHANUMERIC_REGEX.sub(' ', name).strip()
+
+
+def split_peak_names(name: str, alternate_names: str) -> List[str]:
+    """
+    Get the list of all the possible names of a peak from its name and its comma separated alternate names
+    :param name: The peak name
+    :param alternate_names: The comma separated alternate names of the peak
+    :return: The list of stripped peak names
+    """
+    all_names = [name] if isinstance(name, str) else []
+    if isinstance(alternate_names, str):
+        all_names += alternate_names.split(',')
+    return [n.replace('?', '').strip() for n in all_names if n.replace('?', '').strip()]
+
+
+class PeakNameIndex:
+    def __init__(self, peaks_df: pd.DataFrame, id_column: str, names_column: str, lat_column: Optional[str] = None,
+                 lon_column: Optional[str] = None, prefix_length: int = 3, grid_size: float = 0.1):
+        """
+        Index of peak names to find the peaks of a reference dataset (e.g. the Himalayan Database peaks) matching the
+        names of peaks from another dataset. Instead of comparing all pairs of names, the candidates are blocked by the
+        prefix of their normalized names and, when coordinates are available, by the cell of a coordinates grid.
+        Only the candidates sharing a block with the searched peak are scored with a string similarity ratio.
+        :param peaks_df: The reference peaks dataframe
+        :param id_column: The name of the column containing the peak IDs
+        :param names_column: The name of the column containing the list of all the possible names of the peaks
+        :param lat_column: The name of the column containing the peaks latitude (optional)
+        :param lon_column: The name of the column containing the peaks longitude (optional)
+        :param prefix_length: The number of characters of the normalized names used to block the candidates
+        :param grid_size: The size in decimal degrees of the grid cells used to block the candidates
+        """
+        self.prefix_length = prefix_length
+        self.grid_size = grid_size
+        # For each name of each peak, store the peak ID, the original name and the normalized name
+        self.entries: List[Tuple[str, str, str]] = []
+        self.prefix_blocks: Dict[str, Set[int]] = defaultdict(set)
+        self.cell_blocks: Dict[Tuple[int, int], Set[int]] = defaultdict(set)
+        has_coordinates = lat_column is not None and lon_column is not None
+        for row in peaks_df.to_dict('records'):
+            cell = self._grid_cell(row[lat_column], row[lon_column]) if has_coordinates else None
+            for name in row[names_column]:
+                normalized_name = normalize_peak_name(name)
+                if not normalized_name:
+                    continue
+                entry_id = len(self.entries)
+                self.entries.append((row[id_column], name, normalized_name))
+                self.prefix_blocks[normalized_name[:self.prefix_length]].add(entry_id)
+                if cell is not None:
+                    self.cell_blocks[cell].add(entry_id)
+
+    def _grid_cell(self, lat: float, lon: float) -> Optional[Tuple[int, int]]:
+        """
+        Get the coordinates grid cell of a location
+        :param lat: The latitude in decimal degrees
+        :param lon: The longitude in decimal degrees
+        :return: The grid cell as a tuple of integers or None if the coordinates are missing
+        """
+        try:
+            lat, lon = float(lat), float(lon)
+        except (TypeError, ValueError):
+            return None
+        if math.isnan(lat) or math.isnan(lon):
+            return None
+        return math.floor(lat / self.grid_size), math.floor(lon / self.grid_size)
+
+    def _candidates(self, normalized_names: List[str], lat: float = None, lon: float = None) -> Set[int]:
+        """
+        Get the candidate entries sharing a name prefix block or a neighbouring grid cell with the searched peak
+        :param normalized_names: The normalized names of the searched peak
+        :param lat: The latitude of the searched peak
+        :param lon: The longitude of the searched peak
+        :return: The set of candidate entry IDs
+        """
+        candidates = set()
+        for name in normalized_names:
+            candidates |= self.prefix_blocks.get(name[:self.prefix_length], set())
+        cell = self._grid_cell(lat, lon)
+        if cell is not None:
+            for d_lat in (-1, 0, 1):
+                for d_lon in (-1, 0, 1):
+                    candidates |= self.cell_blocks.get((cell[0] + d_lat, cell[1] + d_lon), set())
+        return candidates
+
+    def match(self, names: List[str], lat: float = None, lon: float = None, limit: int = 3,
+              min_score: float = 0.85) -> List[Tuple[str, str, float]]:
+        """
+        Get the peaks of the index best matching any of the names of a peak
+        :param names: The list of all the possible names of the searched peak
+        :param lat: The latitude of the searched peak (optional)
+        :param lon: The longitude of the searched peak (optional)
+        :param limit: The maximum number of matching peaks to return
+        :param min_score: The minimum similarity score, between 0 and 1, of a matching peak
+        :return: The list of (peak ID, matched name, score) tuples of the matching peaks, sorted by decreasing score
+        """
+        normalized_names = sorted({n for n in map(normalize_peak_name, names) if n})
+        best_matches: Dict[str, Tuple[str, float]] = {}
+        matcher = SequenceMatcher(autojunk=False)
+        for entry_id in self._candidates(normalized_names, lat, lon):
+            peak_id, name, normalized_name = self.entries[entry_id]
+            # SequenceMatcher caches the information about its second sequence, so we set the candidate name as the
+            # second sequence once and compare it to all the names of the searched peak
+            matcher.set_seq2(normalized_name)
+            for searched_name in normalized_names:
+                matcher.set_seq1(searched_name)
+                # Use the cheap upper bounds of the ratio to discard the candidates before computing the actual ratio
+                if matcher.real_quick_ratio() < min_score or matcher.quick_ratio() < min_score:
+                    continue
+                score = matcher.ratio()
+                if score >= min_score and score > best_matches.get(peak_id, (None, 0.0))[1]:
+                    best_matches[peak_id] = (name, score)
+        ranked_matches = sorted(((peak_id, name, score) for peak_id, (name, score) in best_matches.items()),
+                                key=lambda m: (-m[2], m[0]))
+        return ranked_matches[:limit]
+
+    def match_dataframe(self, peaks_df: pd.DataFrame, id_column: str, names_column: str,
+                        lat_column: Optional[str] = None, lon_column: Optional[str] = None, limit: int = 3,
+                        min_score: float = 0.85) -> pd.DataFrame:
+        """
+        Match all the peaks of a dataframe against the index in a single pass
+        :param peaks_df: The dataframe of the peaks to match
+        :param id_column: The name of the column containing the peak IDs
+        :param names_column: The name of the column containing the list of all the possible names of the peaks
+        :param lat_column: The name of the column containing the peaks latitude (optional)
+        :param lon_column: The name of the column containing the peaks longitude (optional)
+        :param limit: The maximum number of matching peaks to return for each peak
+        :param min_score: The minimum similarity score, between 0 and 1, of a matching peak
+        :return: A dataframe with one row per matching peak with the ID, MATCH_ID, MATCH_NAME, MATCH_RANK and
+        MATCH_SCORE columns
+        """
+        matches = []
+        for row in peaks_df.to_dict('records'):
+            lat = row[lat_column] if lat_column else None
+            lon = row[lon_column] if lon_column else None
+            for rank, (peak_id, name, score) in enumerate(
+                    self.match(row[names_column], lat, lon, limit=limit, min_score=min_score), start=1):
+                matches.append({'ID': row[id_column], 'MATCH_ID': peak_id, 'MATCH_NAME': name, 'MATCH_RANK': rank,
+                                'MATCH_SCORE': round(score, 3)})
+        return pd.DataFrame(matches, columns=['ID', 'MATCH_ID', 'MATCH_NAME', 'MATCH_RANK', 'MATCH_SCORE'])
@@ -0,0 +1,20 @@
+import json
+
+from pathlib import Path
+from functools import lru_cache
+from typing import Dict, List
+
+
+PEAKS_CORRECTIONS_FILE = Path(__file__).parent.parent.parent / 'assets/data/nhpp/peaks_corrections.json'
+
+
+@lru_cache(maxsize=None)
+def load_peaks_corrections() -> Dict[str, List]:
+    """
+    Load the peaks_corrections.json file the first time the corrections are needed, instead of when the scripts are
+    imported
+    :return: A dictionary containing the NHPP_PEAKS_NOT_TO_IMPORT, PEAKVISOR_NOT_TO_IMPORT, NHPP_PEAKS_CORRECTIONS and
+    HD_PEAK_CORRECTIONS lists
+    """
+    with open(PEAKS_CORRECTIONS_FILE, 'r') as f:
+        return json.load(f)
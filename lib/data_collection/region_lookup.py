@@ -0,0 +1,65 @@
+import json
+import numpy as np
+import pandas as pd
+import shapely
+
+from pathlib import Path
+from shapely.geometry import shape
+from shapely.strtree import STRtree
+
+
+class RegionLookup:
+    def __init__(self, geojson_file: Path, district_property: str = 'DISTRICT', province_property: str = 'PROVINCE',
+                 border_tolerance: float = 0.005):
+        """
+        Offline lookup of the Nepal district and province of locations. The district boundaries are loaded from a
+        GeoJSON file into an STRtree spatial index, so the districts of many locations are found in bulk by
+        point-in-polygon queries without any network call nor scan of all the districts.
+        :param geojson_file: The GeoJSON file containing one feature per district (or district part)
+        :param district_property: The name of the feature property containing the district name
+        :param province_property: The name of the feature property containing the province name
+        :param border_tolerance: The distance in decimal degrees (about 500 m by default) under which a location is
+        considered on the border of a district. Summits are often on the border between districts, and locations
+        slightly outside of Nepal (e.g. on the border with China) are assigned to the nearest district within this
+        distance
+        """
+        with open(geojson_file, 'r', encoding='utf-8') as f:
+            features = json.load(f)['features']
+        self.border_tolerance = border_tolerance
+        self.geometries = np.array([shape(feature['geometry']) for feature in features])
+        self.districts = np.array([feature['properties'][district_property] for feature in features], dtype=object)
+        self.provinces = np.array([feature['properties'][province_property] for feature in features], dtype=object)
+        self.tree = STRtree(self.geometries)
+
+    def lookup(self, lat, lon) -> pd.DataFrame:
+        """
+        Get the district and province of locations
+        :param lat: The array-like of the latitudes in decimal degrees
+        :param lon: The array-like of the longitudes in decimal degrees
+        :return: A dataframe with one row per location and the DISTRICT, PROVINCE, BORDER and BORDER_DISTRICTS columns.
+        BORDER is True for the locations within the border tolerance of several districts, which are listed in
+        BORDER_DISTRICTS. The district and province are None for the missing coordinates and the locations outside of
+        all the districts
+        """
+        lat = pd.to_numeric(pd.Series(lat), errors='coerce').to_numpy(dtype=float)
+        lon = pd.to_numeric(pd.Series(lon), errors='coerce').to_numpy(dtype=float)
+        regions_df = pd.DataFrame({'DISTRICT': None, 'PROVINCE': None, 'BORDER': False, 'BORDER_DISTRICTS': None},
+                                  index=range(len(lat)))
+        valid = np.flatnonzero(~np.isnan(lat) & ~np.isnan(lon))
+        points = shapely.points(lon[valid], lat[valid])
+        # The containing district is at a distance of 0, otherwise take the nearest district within the tolerance
+        point_index, geometry_index = self.tree.query_nearest(points, max_distance=self.border_tolerance)
+        # Keep a single district for the points on the boundary between several districts
+        point_index, first_match = np.unique(point_index, return_index=True)
+        geometry_index = geometry_index[first_match]
+        regions_df.loc[valid[point_index], 'DISTRICT'] = self.districts[geometry_index]
+        regions_df.loc[valid[point_index], 'PROVINCE'] = self.provinces[geometry_index]
+        # Flag the points within the tolerance of several districts
+        point_index, geometry_index = self.tree.query(points, predicate='dwithin', distance=self.border_tolerance)
+        nearby_districts = pd.DataFrame({'POINT': valid[point_index], 'DISTRICT': self.districts[geometry_index]})
+        nearby_districts = nearby_districts.drop_duplicates().sort_values(['POINT', 'DISTRICT'])
+        border_districts = nearby_districts.groupby('POINT')['DISTRICT'].agg(list)
+        border_districts = border_districts[border_districts.str.len() > 1]
+        regions_df.loc[border_districts.index, 'BORDER'] = True
+        regions_df.loc[border_districts.index, 'BORDER_DISTRICTS'] = border_districts.str.join(',')
+        return regions_df
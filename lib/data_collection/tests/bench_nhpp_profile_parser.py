@@ -0,0 +1,26 @@
+# Benchmark of the NHPP peak profile parsers over the saved corpus of profile pages
+# Run it from the repository root folder with:
+# python -m lib.data_collection.tests.bench_nhpp_profile_parser
+import timeit
+
+from pathlib import Path
+
+from lib.data_collection.nhpp_collection import parse_nhpp_peak_profile, extract_nhpp_peak_profile
+
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures/nhpp_profiles'
+
+
+def load_profile_pages():
+    """Load the saved peak profile pages as a list of (peak URL dictionary, HTML) tuples"""
+    return [({"ID": f.stem, "NAME": f.stem, "URL": f.name}, f.read_text(encoding='utf-8'))
+            for f in sorted(FIXTURES_DIR.glob('*.html'))]
+
+
+if __name__ == '__main__':
+    profile_pages = load_profile_pages()
+    repeat = 20
+    for parser in [parse_nhpp_peak_profile, extract_nhpp_peak_profile]:
+        timings = timeit.repeat(lambda: [parser(a_peak, html) for a_peak, html in profile_pages],
+                                number=repeat, repeat=5)
+        print(f'{parser.__name__}: {min(timings) / (repeat * len(profile_pages)) * 1000:.2f} ms per page')
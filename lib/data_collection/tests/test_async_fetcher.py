@@ -0,0 +1,53 @@
+import time
+import asyncio
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lib.data_collection.async_fetcher import AsyncFetcher
+
+
+class FlakyPeakHandler(BaseHTTPRequestHandler):
+    """Local mock server answering 503 to the first request of the /flaky page"""
+    protocol_version = 'HTTP/1.1'
+    requests_count = {}
+
+    def do_GET(self):
+        self.requests_count[self.path] = self.requests_count.get(self.path, 0) + 1
+        if self.path == '/flaky' and self.requests_count[self.path] == 1:
+            status, body = 503, b''
+        else:
+            status, body = 200, self.path.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_async_fetcher():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyPeakHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    async def fetch_all_pages():
+        async with AsyncFetcher(per_host_concurrency=4, per_host_rate=20, per_host_burst=1,
+                                backoff_base=0.01) as fetcher:
+            pages = [(path, f'{url}{path}') for path in ['/flaky'] + [f'/peak-{i}' for i in range(9)]]
+            responses = {key: response async for key, response in fetcher.fetch_all(pages)}
+            return responses, fetcher.stats
+
+    try:
+        start = time.monotonic()
+        responses, stats = asyncio.run(fetch_all_pages())
+        elapsed = time.monotonic() - start
+    finally:
+        server.shutdown()
+    # All the pages are received, the failed request has been retried
+    assert len(responses) == 10
+    assert all(r.status_code == 200 and r.text == path for path, r in responses.items())
+    assert stats == {'requests': 11, 'retries': 1, 'failures': 0}
+    # 11 requests at 20 requests per second without burst take at least 0.5 second
+    assert elapsed >= 0.5
@@ -0,0 +1,23 @@
+from lib.data_collection.checkpoint_journal import CheckpointJournal
+
+
+def test_checkpoint_journal(tmp_path):
+    journal = CheckpointJournal(tmp_path / 'collection_journal.jsonl')
+    journal.record('nhpp_profile', 'AMAD', result={'ID': 'AMAD', 'ELEVATION_M': 6812.0})
+    journal.record('nhpp_profile', 'EVER', error='HTTP 503')
+    journal.record('peakvisor', 'KANG', result=['27.7', '88.1', 'Taplejung', None])
+    # The last record of a key wins
+    journal.record('nhpp_profile', 'EVER', result={'ID': 'EVER', 'ELEVATION_M': 8848.86})
+    journal.record('nhpp_profile', 'LHOT', error='HTTP 404')
+    # A line truncated by an interrupted collection is ignored
+    with journal.journal_file.open('a') as f:
+        f.write('{"stage": "nhpp_profile", "key": "MAKA", "res')
+    assert journal.results('nhpp_profile') == {'AMAD': {'ID': 'AMAD', 'ELEVATION_M': 6812.0},
+                                               'EVER': {'ID': 'EVER', 'ELEVATION_M': 8848.86}}
+    assert journal.failures('nhpp_profile') == {'LHOT': 'HTTP 404'}
+    assert journal.results('peakvisor') == {'KANG': ['27.7', '88.1', 'Taplejung', None]}
+    # The collection resumes on a new line
+    journal.record('nhpp_profile', 'LHOT', result={'ID': 'LHOT', 'ELEVATION_M': 8516.0})
+    assert journal.failures('nhpp_profile') == {}
+    journal.reset()
+    assert journal.results('nhpp_profile') == {}
@@ -0,0 +1,60 @@
+import pytest
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lib.data_collection.http_cache import HttpCache, CacheMissError
+
+
+class StubPeakHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the scraped websites serving one peak page with an ETag and 404 for any other page"""
+    requests_log = []
+
+    def do_GET(self):
+        self.requests_log.append((self.path, self.headers.get('If-None-Match')))
+        if self.path != '/peak/ama-dablam.html':
+            self.send_response(404)
+            self.end_headers()
+        elif self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+        else:
+            body = '<html><body>Ama Dablam</body></html>'.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('ETag', '"v1"')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubPeakHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    StubPeakHandler.requests_log = []
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+
+
+def test_http_cache(stub_server, tmp_path):
+    http_cache = HttpCache(tmp_path)
+    # The first request downloads the page, the second one revalidates it with a conditional GET
+    assert http_cache.get(f'{stub_server}/peak/ama-dablam.html').text == '<html><body>Ama Dablam</body></html>'
+    response = http_cache.get(f'{stub_server}/peak/ama-dablam.html')
+    assert response.from_cache and response.text == '<html><body>Ama Dablam</body></html>'
+    assert StubPeakHandler.requests_log[1] == ('/peak/ama-dablam.html', '"v1"')
+    # 404 responses are cached negatively and not requested again
+    assert http_cache.get(f'{stub_server}/peak/ama-dablam-peak.html').status_code == 404
+    assert http_cache.get(f'{stub_server}/peak/ama-dablam-peak.html').status_code == 404
+    assert len(StubPeakHandler.requests_log) == 3
+    assert http_cache.stats == {'hits': 0, 'revalidated': 1, 'misses': 2, 'not_found_hits': 1}
+    # In offline mode the cached responses are replayed without accessing the network
+    offline_cache = HttpCache(tmp_path, offline=True)
+    assert offline_cache.get(f'{stub_server}/peak/ama-dablam.html').text == '<html><body>Ama Dablam</body></html>'
+    with pytest.raises(CacheMissError):
+        offline_cache.get(f'{stub_server}/peak/everest.html')
+    assert len(StubPeakHandler.requests_log) == 3
@@ -0,0 +1,32 @@
+import pytest
+
+from lib.data_collection.nepal_districts import build_districts_geojson, nhpp_district_name, DISTRICT_PROVINCES
+
+
+def square(name: str, lon: float, lat: float, size: float) -> dict:
+    return {'type': 'Feature', 'properties': {'shapeName': name},
+            'geometry': {'type': 'Polygon', 'coordinates': [[[lon, lat], [lon + size, lat], [lon + size, lat + size],
+                                                             [lon, lat + size], [lon, lat]]]}}
+
+
+def test_nhpp_district_name():
+    assert len(DISTRICT_PROVINCES) == 77
+    assert nhpp_district_name('Solukhumbu') == 'Solukhumbu'
+    assert nhpp_district_name('Sindhupalchowk') == 'Sindhupalchok'
+    assert nhpp_district_name('Rukum East') == 'Rukum East'
+    assert nhpp_district_name('Rukum_West') == 'Rukum'
+    assert nhpp_district_name('Colombo') is None
+
+
+def test_build_districts_geojson():
+    districts = {'type': 'FeatureCollection', 'features': [square('SOLUKHUMBU', 86.4, 27.4, 0.6),
+                                                           square('Dolkha', 85.9, 27.4, 0.5)]}
+    districts_geojson = build_districts_geojson(districts)
+    # The districts and provinces are named as in the NHPP dataset
+    assert [feature['properties'] for feature in districts_geojson['features']] == [
+        {'DISTRICT': 'Solukhumbu', 'PROVINCE': 'Province 1'}, {'DISTRICT': 'Dolakha', 'PROVINCE': 'Bagmati Pradesh'}]
+    assert districts_geojson['features'][0]['geometry'] == districts['features'][0]['geometry']
+    # The districts which can not be named as in the NHPP dataset fail the build
+    districts['features'].append(square('Colombo', 79.8, 6.9, 0.1))
+    with pytest.raises(ValueError):
+        build_districts_geojson(districts)
@@ -0,0 +1,204 @@
+import pytest
+import threading
+import pandas as pd
+
+from collections import Counter
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lib.data_collection import nhpp_collection
+from lib.data_collection.http_cache import HttpCache
+from lib.data_collection.page_archive import PageArchive
+from lib.data_collection.checkpoint_journal import CheckpointJournal
+from lib.data_collection.nhpp_collection import find_non_matching_peaks
+from lib.data_collection.tests.bench_nhpp_profile_parser import load_profile_pages
+
+
+def test_non_matching_peaks():
+    hd_peaks_df = pd.DataFrame({
+        'PEAKID': ['AMAD', 'KANG', 'ANNE', 'PUMO'],
+        'PKNAME': ['Ama Dablam', 'Kangchenjunga', 'Annapurna I East', 'Pumori'],
+        'PKNAME2': [None, 'Kanchenjunga', None, 'Pumo Ri, Pumori Peak']
+    })
+    nhpp_peaks_df = pd.DataFrame({
+        'ID': ['AMAD', 'KANC', 'GIMC', 'PMRI'],
+        'NAME': ['Ama Dablam', 'Kanchenjunga Main', 'Gimmigela Chuli', 'Pumo Ri'],
+        'ALTERNATE_NAMES': [None, 'Kanchenjunga,Kangchenjunga', 'The Twins', None]
+    })
+    non_matching_peaks_df = find_non_matching_peaks(hd_peaks_df, nhpp_peaks_df)
+    # Matching IDs and peaks matched by one of their names or alternate names are not reported
+    assert non_matching_peaks_df['HD_ID'].dropna().tolist() == ['ANNE'], \
+        "Only the HD peaks without any matching ID or name in the NHPP dataset should be reported"
+    assert non_matching_peaks_df['NHPP_ID'].dropna().tolist() == ['GIMC'], \
+        "Only the NHPP peaks without any matching ID or name in the HD dataset should be reported"
+    assert non_matching_peaks_df.columns.tolist() == ['HD_ID', 'HD_NAME', 'HD_ALT_NAMES', 'NHPP_ID', 'NHPP_NAME',
+                                                      'NHPP_ALT_NAMES']
+
+
+def peakvisor_page(country: str, district: str) -> bytes:
+    return f"""<html><body>
+    <div class="sidebar__hs-country"><div class="sidebar__hs-chip-content">
+    <ul><li>{country}</li><li>{district}</li></ul></div></div>
+    <div class="sidebar__hs-chip location-coordinates js-location-coordinates js-copy-to-clipboard">
+    <span id="lat">27.9</span><span id="lng">86.8</span></div>
+    <div class="sidebar__hs-desc-text"> A mountain in the Himalayas. </div>
+    </body></html>""".encode('utf-8')
+
+
+class StubPeakvisorHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the PeakVisor website"""
+    pages = {'/peak/tsering-peak.html': peakvisor_page('China', 'Tingri'),
+             '/peak/mount-tsering.html': peakvisor_page('Nepal', 'Solukhumbu'),
+             '/peak/mount-lobuche.html': peakvisor_page('Nepal', 'Solukhumbu'),
+             '/peak/ama-dablam.html': peakvisor_page('Nepal', 'Solukhumbu'),
+             '/peak/mount-ama-dablam.html': peakvisor_page('Nepal', 'Khumbu')}
+    requests_log = []
+
+    def do_HEAD(self):
+        self.requests_log.append(('HEAD', self.path))
+        self.send_response(200 if self.path in self.pages else 404)
+        self.end_headers()
+
+    def do_GET(self):
+        self.requests_log.append(('GET', self.path))
+        if self.path not in self.pages:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.end_headers()
+        self.wfile.write(self.pages[self.path])
+
+    def log_message(self, *args):
+        pass
+
+
+def test_peakvisor_probing(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubPeakvisorHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(nhpp_collection, 'PEAKVISOR_URL', f'http://127.0.0.1:{server.server_address[1]}')
+    monkeypatch.setattr(nhpp_collection, 'http_cache', HttpCache(tmp_path / 'http_cache'))
+    monkeypatch.setattr(nhpp_collection, 'page_archive', PageArchive(tmp_path / 'pages_archive.sqlite'))
+    try:
+        # The China page found under the "peak" variant is skipped, the Nepal page is found with the "mount" variant
+        assert nhpp_collection.get_data_from_peakvisor(['Tsering']) == \
+               ('27.9', '86.8', 'Solukhumbu', 'A mountain in the Himalayas.')
+        # Only the existing pages are downloaded
+        assert sorted(path for method, path in StubPeakvisorHandler.requests_log if method == 'GET') == \
+               ['/peak/mount-tsering.html', '/peak/tsering-peak.html']
+        # The winning variant pattern is saved and requested first on the next lookups
+        assert nhpp_collection.load_peakvisor_pattern_wins() == Counter(mount=1)
+        variants = nhpp_collection.get_peakvisor_name_variants(['Lobuche'])
+        assert variants == [('Lobuche', 'name'), ('Lobuche peak', 'with_peak'), ('mount Lobuche', 'mount')]
+        assert nhpp_collection.get_peakvisor_probe_order(variants, Counter(mount=1)) == [2, 0, 1]
+        assert nhpp_collection.get_data_from_peakvisor(['Lobuche'])[2] == 'Solukhumbu'
+        assert nhpp_collection.get_data_from_peakvisor(['Unknown']) == (None, None, None, None)
+        # The "mount" variant is requested first, but the preferred variant is kept, and the variants less preferred
+        # than a page found in Nepal are not requested
+        assert nhpp_collection.get_data_from_peakvisor(['Ama Dablam'])[2] == 'Solukhumbu'
+        ama_dablam_requests = [path for _, path in StubPeakvisorHandler.requests_log if 'ama-dablam' in path]
+        assert ama_dablam_requests[0] == '/peak/mount-ama-dablam.html'
+        assert '/peak/ama-dablam-peak.html' not in ama_dablam_requests
+        assert nhpp_collection.load_peakvisor_pattern_wins() == Counter(mount=2, name=1)
+        # The fetched pages are archived and can be parsed again offline
+        assert len(nhpp_collection.page_archive) == 5
+        assert nhpp_collection.parse_peakvisor_pages([['Tsering'], ['Unknown']], nhpp_collection.page_archive,
+                                                     max_workers=1) == \
+               [('27.9', '86.8', 'Solukhumbu', 'A mountain in the Himalayas.'), (None, None, None, None)]
+    finally:
+        server.shutdown()
+
+
+def test_peak_profile_extraction():
+    # The fast extractor must return exactly the same peak details as the BeautifulSoup parser
+    profile_pages = load_profile_pages()
+    assert len(profile_pages) > 0
+    for a_peak, html in profile_pages:
+        assert nhpp_collection.extract_nhpp_peak_profile(a_peak, html) == \
+               nhpp_collection.parse_nhpp_peak_profile(a_peak, html), f"Different peak details for {a_peak['ID']}"
+    a_peak, html = next(p for p in profile_pages if p[0]['ID'] == 'sagarmatha')
+    peak_details = nhpp_collection.extract_nhpp_peak_profile(a_peak, html)
+    assert peak_details['ALTERNATE_NAMES'] == 'Everest,Jomolangma,Chomolungma'
+    assert peak_details['ELEVATION_M'] == 8848.86
+    assert round(peak_details['LAT'], 4) == 27.9881
+    assert peak_details['FIRST_ASCENT_ON'] == '29/05/1953'
+    assert peak_details['DISTRICT'] == 'Solukhumbu'
+    assert peak_details['FOREIGNER_FEES'] == 'Spring 11000 (USD)'
+
+
+def test_archived_peak_profiles_parsing(tmp_path):
+    # The parse stage parses the archived pages in worker processes, without accessing the website
+    profile_pages = load_profile_pages()
+    all_peaks = [a_peak for a_peak, _ in profile_pages]
+    journal = CheckpointJournal(tmp_path / 'collection_journal.jsonl')
+    with PageArchive(tmp_path / 'pages_archive.sqlite') as archive:
+        for a_peak, html in profile_pages[1:]:
+            archive.put(a_peak['URL'], html.encode('utf-8'))
+        # The peak whose page is missing is recorded as failed, the other peaks are recorded as collected
+        with pytest.raises(RuntimeError):
+            nhpp_collection.collect_nhpp_peak_profiles(all_peaks, archive, journal, fetch_pages=False, max_workers=2)
+        assert list(journal.failures('nhpp_profile')) == [all_peaks[0]['ID']]
+        assert len(journal.results('nhpp_profile')) == len(all_peaks) - 1
+        # On resume, only the failed peak is collected again
+        archive.put(all_peaks[0]['URL'], profile_pages[0][1].encode('utf-8'))
+        peaks = nhpp_collection.collect_nhpp_peak_profiles(all_peaks, archive, journal, fetch_pages=False,
+                                                           resume=True, max_workers=1)
+        assert peaks == [nhpp_collection.extract_nhpp_peak_profile(a_peak, html) for a_peak, html in profile_pages]
+        assert len(journal.journal_file.read_text().splitlines()) == len(all_peaks) + 1
+
+
+class StubPeakTableHandler(BaseHTTPRequestHandler):
+    """
+    Local stand-in for the NHPP peak table data source. The response is synthetic, written in the format of a DataTables
+    server-side response, and not recorded from the website
+    """
+    synthetic_response = (Path(__file__).parent / 'fixtures/synthetic_nhpp_peak_table.json').read_bytes()
+    status_code = 200
+
+    def do_GET(self):
+        self.send_response(self.status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        if self.status_code == 200:
+            self.wfile.write(self.synthetic_response)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_peak_table_without_selenium(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubPeakTableHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(nhpp_collection, 'NHPP_PEAK_TABLE_DATA_URL',
+                        f'http://127.0.0.1:{server.server_address[1]}/peak-profile/all-peaks?format=json')
+    monkeypatch.setattr(nhpp_collection, 'http_cache', HttpCache(tmp_path / 'http_cache'))
+    monkeypatch.setattr(nhpp_collection, 'page_archive', PageArchive(tmp_path / 'pages_archive.sqlite'))
+    monkeypatch.setattr(nhpp_collection, 'get_all_nhpp_peak_table_with_selenium', lambda: ['rendered with Selenium'])
+    try:
+        all_peaks = nhpp_collection.get_all_nhpp_peak_table()
+        # The peaks not to import are skipped and the names are cleaned as in the rendered table
+        assert [a_peak['ID'] for a_peak in all_peaks] == ['SGRM', 'AMAD', 'KJRB']
+        assert all_peaks[0] == {"ID": "SGRM", "NAME": "Sagarmatha",
+                                "URL": f"{nhpp_collection.NHPP_URL}/sagarmatha"}
+        # The response is archived, so the table can be parsed again offline
+        assert nhpp_collection.load_archived_nhpp_peak_table(nhpp_collection.page_archive) == all_peaks
+        # Selenium is only used if the table data cannot be retrieved
+        monkeypatch.setattr(StubPeakTableHandler, 'status_code', 503)
+        assert nhpp_collection.get_all_nhpp_peak_table() == ['rendered with Selenium']
+    finally:
+        server.shutdown()
+
+
+def test_save_csv_atomically(tmp_path):
+    csv_file = tmp_path / 'nhpp_peaks.csv'
+    nhpp_collection.save_csv_atomically(pd.DataFrame({'ID': ['SGRM', 'AMAD']}), csv_file)
+    assert pd.read_csv(csv_file)['ID'].tolist() == ['SGRM', 'AMAD']
+    # A write failing midway keeps the previous file
+    class Unwritable:
+        def __str__(self):
+            raise ValueError('Unwritable value')
+    with pytest.raises(ValueError):
+        nhpp_collection.save_csv_atomically(pd.DataFrame({'ID': ['SGRM', Unwritable()]}), csv_file)
+    assert pd.read_csv(csv_file)['ID'].tolist() == ['SGRM', 'AMAD']
+    assert [f.name for f in tmp_path.iterdir()] == ['nhpp_peaks.csv']
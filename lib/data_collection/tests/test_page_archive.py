@@ -0,0 +1,21 @@
+from lib.data_collection.page_archive import PageArchive
+
+
+def test_page_archive(tmp_path):
+    archive_file = tmp_path / 'pages_archive.sqlite'
+    page = '<html><body>Sagarmatha – 8848.86 m</body></html>' * 1000
+    with PageArchive(archive_file) as archive:
+        archive.put('https://example.org/peak/sagarmatha', page.encode('utf-8'))
+        archive.put('https://example.org/peak/lhotse', b'<html>Lhotse</html>')
+        archive.put('https://example.org/about', b'<html>About</html>')
+        archive.discard('https://example.org/about')
+    # The pages are compressed and are still available after reopening the archive
+    assert archive_file.stat().st_size < len(page.encode('utf-8'))
+    with PageArchive(archive_file) as archive:
+        assert len(archive) == 2
+        assert 'https://example.org/peak/lhotse' in archive
+        assert archive.urls('https://example.org/peak/') == ['https://example.org/peak/lhotse',
+                                                             'https://example.org/peak/sagarmatha']
+        assert archive.get('https://example.org/peak/sagarmatha').text == page
+        assert PageArchive.decompress(*archive.get_compressed('https://example.org/peak/sagarmatha')) == page
+        assert archive.get('https://example.org/about') is None
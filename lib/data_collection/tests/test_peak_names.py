@@ -0,0 +1,37 @@
+import pandas as pd
+
+from lib.data_collection.peak_names import PeakNameIndex, normalize_peak_name, split_peak_names
+
+
+def test_normalize_peak_name():
+    assert normalize_peak_name('Mount Kāngchenjunga') == 'kangchenjunga'
+    assert normalize_peak_name('Island Peak') == 'island'
+    assert normalize_peak_name('Ganesh Himal I') == 'ganesh i'
+    assert normalize_peak_name('Pumo-Ri') == 'pumo ri'
+    assert normalize_peak_name(None) == ''
+
+
+def test_peak_name_index():
+    hd_peaks_df = pd.DataFrame({
+        'PEAKID': ['KANG', 'KANS', 'AMAD', 'PUMO'],
+        'ALL_NAMES': [split_peak_names('Kangchenjunga', 'Kanchenjunga Main?'),
+                      split_peak_names('Kangchenjunga South', None),
+                      split_peak_names('Ama Dablam', None),
+                      split_peak_names('Pumori', 'Pumo Ri')],
+        'LAT': [27.7025, 27.6778, 27.8617, None],
+        'LON': [88.1475, 88.1556, 86.8614, None]
+    })
+    index = PeakNameIndex(hd_peaks_df, id_column='PEAKID', names_column='ALL_NAMES', lat_column='LAT',
+                          lon_column='LON')
+    # Spelling variants and affixes are matched, the best match is ranked first
+    matches = index.match(['Kanchenjunga Peak'], min_score=0.7)
+    assert [m[0] for m in matches] == ['KANG', 'KANS']
+    assert matches[0][1] == 'Kangchenjunga' and matches[0][2] > matches[1][2]
+    assert index.match(['Mount Pumo-Ri']) == [('PUMO', 'Pumo Ri', 1.0)]
+    # Peaks with a different name prefix are found through their coordinates grid cell
+    assert index.match(['Aama Dablam'], lat=27.86, lon=86.86, min_score=0.8)[0][0] == 'AMAD'
+    assert index.match(['Aama Dablam'], min_score=0.8) == []
+    # The whole dataframe is matched in a single pass
+    nhpp_peaks_df = pd.DataFrame({'ID': ['KANC', 'GIMC'], 'ALL_NAMES': [['Kanchenjunga'], ['Gimmigela Chuli']]})
+    matches_df = index.match_dataframe(nhpp_peaks_df, id_column='ID', names_column='ALL_NAMES', limit=1)
+    assert matches_df[['ID', 'MATCH_ID', 'MATCH_RANK']].values.tolist() == [['KANC', 'KANG', 1]]
@@ -0,0 +1,15 @@
+from pathlib import Path
+
+from lib.data_collection.region_lookup import RegionLookup
+
+
+def test_region_lookup():
+    region_lookup = RegionLookup(Path(__file__).parent / 'fixtures/nepal_districts.geojson')
+    regions_df = region_lookup.lookup(['27.9881', 27.9, 27.6, 28.002, None, 20.0],
+                                      ['86.9250', 86.2, 86.401, 86.9, 86.9, 86.9])
+    # Inside a district, inside another district, on a district border, just across the country border, no
+    # coordinates and far outside of all the districts
+    assert regions_df['DISTRICT'].tolist() == ['Solukhumbu', 'Dolakha', 'Solukhumbu', 'Solukhumbu', None, None]
+    assert regions_df['PROVINCE'].tolist() == ['Koshi', 'Bagmati', 'Koshi', 'Koshi', None, None]
+    assert regions_df['BORDER'].tolist() == [False, False, True, False, False, False]
+    assert regions_df.loc[2, 'BORDER_DISTRICTS'] == 'Dolakha,Solukhumbu'
@@ -9,15 +9,26 @@ import pandas as pd
 from typing import Dict, List
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
 from pydoc import locate
 from dbfread.dbf import DBF
 
+from lib.data_etl.member_resolution import resolve_members
+
 DATA_DIR = Path(__file__).parent.parent.parent / 'assets/data'
 HD_DATA_DIR = DATA_DIR / 'hdb'
 STAGED_DATA_DIR = DATA_DIR / 'staged'
 dytpes_file = Path(__file__).with_name('hd_dtypes.json')
-with dytpes_file.open('r') as f:
-    hd_dytpes = json.load(f)
+
+
+@lru_cache(maxsize=None)
+def load_hd_dtypes() -> Dict[str, Dict[str, str]]:
+    """
+    Load the data types of the Himalayan Database columns the first time they are needed
+    :return: A dictionary of the data types by column name of each table
+    """
+    with dytpes_file.open('r') as f:
+        return json.load(f)
 
 
 class GetDescriptions:
@@ -93,7 +104,7 @@ class ExpeditionsEtl(HimalayanDatabaseEtl):
         Class for the ETL process of the expeditions data
         :param file_name: The name of the file to process
         """
-        super().__init__(file_name, hd_dytpes['EXPED_DTYPE'])
+        super().__init__(file_name, load_hd_dtypes()['EXPED_DTYPE'])
 
     def _discard_expeditions_without_members(self, members_df: pd.DataFrame):
         """
@@ -181,12 +192,18 @@ class ExpeditionsEtl(HimalayanDatabaseEtl):
 
 
 class MembersEtl(HimalayanDatabaseEtl):
-    def __init__(self, file_name: str = 'members.DBF'):
+    def __init__(self, file_name: str = 'members.DBF', resolve_duplicates: bool = True):
         """
         Class for the ETL process of the members data
         :param file_name: The name of the file to process
-        """
-        super().__init__(file_name, hd_dytpes['MEMBERS_DTYPE'])
+        :param resolve_duplicates: If True, the members with several unique IDs because of spelling variants of their
+        first name or of their birth year are merged under a single ID
+        """
+        super().__init__(file_name, load_hd_dtypes()['MEMBERS_DTYPE'])
+        self.resolve_duplicates = resolve_duplicates
+        self.merges_file = self.target_dir / 'member_merges.csv'
+        # The list of the matching pairs of members IDs, to review the merges
+        self.merges_df = None
 
     def _create_member_unique_id(self):
         """
@@ -245,6 +262,20 @@ class MembersEtl(HimalayanDatabaseEtl):
         # We remove any leading or trailing spaces
         self.df['CITIZEN'] = self.df['CITIZEN'].str.strip()
 
+    def _resolve_duplicate_members(self):
+        """
+        Merge the unique IDs of the same member created for the spelling variants of their first name (e.g. "N. A." and
+        "Nicolas Alexander") or for a birth year differing by a year, and keep the list of the merges to review them
+        """
+        self.df, self.merges_df = resolve_members(self.df)
+
+    def save_merges(self):
+        """
+        Save the list of the merges of the members unique IDs, to review them
+        """
+        if self.merges_df is not None:
+            self.merges_df.to_csv(self.merges_file, index=False)
+
     def _memb_descriptions(self):
         """
         Add descriptions to coded labels in dataframe
@@ -288,6 +319,9 @@ class MembersEtl(HimalayanDatabaseEtl):
         self._cleanup_countries()
         # Create a unique ID for each member
         self._create_member_unique_id()
+        # Merge the unique IDs of the near-duplicate members
+        if self.resolve_duplicates:
+            self._resolve_duplicate_members()
         self._memb_descriptions()
 
 
@@ -297,7 +331,7 @@ class PeaksEtl(HimalayanDatabaseEtl):
         Class for the ETL process of the peaks data
         :param file_name: The name of the file to process
         """
-        super().__init__(file_name, hd_dytpes['PEAKS_DTYPE'])
+        super().__init__(file_name, load_hd_dtypes()['PEAKS_DTYPE'])
 
     def _fix_peaks_dates(self, expeditions_df: pd.DataFrame):
         """
@@ -339,7 +373,13 @@ class PeaksEtl(HimalayanDatabaseEtl):
         self._replace_none_values(['PEAKMEMO', 'REFERMEMO', 'PHOTOMEMO'])
 
 
-if __name__ == '__main__':
+def stage_hd_data() -> Dict[str, pd.DataFrame]:
+    """
+    Load the Himalayan Database files, process the peaks, members and expeditions data and save them to the staged
+    CSV files
+    :return: The staged expeditions, members and peaks dataframes by table name, to hand them over in memory to the
+    next stage
+    """
     # Check if the ETL_DATA_DIR exist. If it does not, create it
     os.makedirs(STAGED_DATA_DIR, exist_ok=True)
     # Load all the data
@@ -354,5 +394,11 @@ if __name__ == '__main__':
     expeditions.process(members.df)
     # Save all the dataframes to csv files
     members.save_data()
+    members.save_merges()
     expeditions.save_data()
     peaks.save_data()
+    return {'expeditions': expeditions.df, 'members': members.df, 'peaks': peaks.df}
+
+
+if __name__ == '__main__':
+    stage_hd_data()
@@ -0,0 +1,234 @@
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+
+from typing import Dict, List, Set, Tuple
+
+
+# The maximum difference between the birth years of two records of the same member
+YEAR_WINDOW = 1
+# The minimum similarity score, between 0 and 1, of two records of the same member
+MIN_SCORE = 0.85
+# The score of a first name given as initials only (e.g. "N. A.") matching the initials of the other first name
+INITIALS_SCORE = 0.9
+# The score removed for each year of difference between the birth years
+YEAR_PENALTY = 0.05
+NON_ALPHANUMERIC_REGEX = re.compile(r'[^0-9a-z]+')
+MERGE_COLUMNS = ['PERSID', 'FNAME', 'LNAME', 'SEX', 'YOB', 'MATCH_PERSID', 'MATCH_FNAME', 'MATCH_LNAME', 'MATCH_SEX',
+                 'MATCH_YOB', 'SCORE', 'STATUS']
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a member name to compare it with other names. The name is case-folded, the diacritics are removed and
+    all non-alphanumeric characters are replaced by a single space. E.g. "Nicolás-Alexander" is normalized to
+    "nicolas alexander"
+    :param name: The name
+    :return: The normalized name
+    """
+    if not isinstance(name, str):
+        return ''
+    # Decompose the accented characters and drop the combining diacritics marks
+    name = unicodedata.normalize('NFKD', name.casefold())
+    name = ''.join(c for c in name if not unicodedata.combining(c))
+    return NON_ALPHANUMERIC_REGEX.sub(' ', name).strip()
+
+
+def member_identities(members_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Get the identity of each member ID: its first record names, gender and birth year, the normalized names and the
+    blocking key of the comparisons
+    :param members_df: The members dataframe with the PERSID, FNAME, LNAME, SEX, YOB, RESIDENCE, SHERPA and EXPID
+    columns
+    :return: A dataframe with one row per PERSID with the FNAME, LNAME, SEX, YOB, FIRST_NAME, INITIALS, INITIALS_ONLY,
+    BLOCK, YEAR and NB_MEMBERSHIPS columns
+    """
+    identities_df = members_df.groupby('PERSID', sort=False) \
+        .agg(FNAME=('FNAME', 'first'), LNAME=('LNAME', 'first'), SEX=('SEX', 'first'), YOB=('YOB', 'first'),
+             RESIDENCE=('RESIDENCE', 'first'), SHERPA=('SHERPA', 'first'), NB_MEMBERSHIPS=('EXPID', 'size')) \
+        .reset_index()
+    identities_df['FIRST_NAME'] = identities_df['FNAME'].map(normalize_name)
+    identities_df['INITIALS'] = identities_df['FIRST_NAME'].map(lambda name: ''.join(t[0] for t in name.split()))
+    # A first name given as initials only has the length of its initials once the spaces are removed
+    identities_df['INITIALS_ONLY'] = identities_df['FIRST_NAME'].str.replace(' ', '', regex=False).str.len() == \
+        identities_df['INITIALS'].str.len()
+    # The Sherpas share a few surnames, so as for their member ID their residence is part of their blocking key
+    residence = identities_df['RESIDENCE'].map(normalize_name).str.replace(' ', '', regex=False)
+    identities_df['BLOCK'] = identities_df['LNAME'].map(normalize_name) + '|' + \
+        residence.where(identities_df['SHERPA'].fillna(False).astype(bool), '')
+    # The unknown birth years (empty or 0) are only compared with other unknown birth years
+    identities_df['YEAR'] = pd.to_numeric(identities_df['YOB'], errors='coerce').fillna(0).astype(int)
+    identities_df.loc[identities_df['YEAR'] <= 0, 'YEAR'] = -1
+    return identities_df.drop(columns=['RESIDENCE', 'SHERPA'])
+
+
+def candidate_pairs(identities_df: pd.DataFrame, year_window: int = YEAR_WINDOW) -> pd.DataFrame:
+    """
+    Get the pairs of identities sharing a blocking key and with birth years in the year window. Instead of comparing all
+    the pairs of identities, each identity is only joined with the identities of its block born in its window, so the
+    number of pairs grows with the size of the blocks and not with the square of the number of members
+    :param identities_df: The identities dataframe returned by member_identities
+    :param year_window: The maximum difference between the birth years of a pair
+    :return: A dataframe with the PERSID_A and PERSID_B columns, with PERSID_A < PERSID_B
+    """
+    named_df = identities_df.loc[identities_df['FIRST_NAME'] != '', ['PERSID', 'BLOCK', 'YEAR', 'SEX']]
+    # Each identity is searched in the years of its window, the unknown birth years only in the unknown year
+    windows_df = named_df.assign(SEARCHED_YEAR=[[year] if year < 0 else list(range(year - year_window,
+                                                                                   year + year_window + 1))
+                                                for year in named_df['YEAR']]).explode('SEARCHED_YEAR')
+    windows_df['SEARCHED_YEAR'] = windows_df['SEARCHED_YEAR'].astype(int)
+    pairs_df = windows_df.merge(named_df, left_on=['BLOCK', 'SEARCHED_YEAR'], right_on=['BLOCK', 'YEAR'],
+                                suffixes=('_A', '_B'))
+    # The genders must match when they are both known
+    sex_a, sex_b = pairs_df['SEX_A'].fillna(''), pairs_df['SEX_B'].fillna('')
+    same_sex = (sex_a == sex_b) | (sex_a == '') | (sex_b == '')
+    pairs_df = pairs_df[(pairs_df['PERSID_A'] < pairs_df['PERSID_B']) & same_sex]
+    return pairs_df[['PERSID_A', 'PERSID_B']].drop_duplicates(ignore_index=True)
+
+
+def _trigrams(identities_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Get the distinct character trigrams of the normalized first names of the identities
+    :param identities_df: The identities dataframe returned by member_identities
+    :return: A dataframe with one row per PERSID and TRIGRAM
+    """
+    padded_names = '  ' + identities_df['FIRST_NAME'] + ' '
+    trigrams = padded_names.map(lambda name: list({name[i:i + 3] for i in range(len(name) - 2)}))
+    return pd.DataFrame({'PERSID': identities_df['PERSID'], 'TRIGRAM': trigrams}).explode('TRIGRAM')
+
+
+def score_pairs(identities_df: pd.DataFrame, pairs_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Score the similarity of the candidate pairs of identities. The score is the Jaccard similarity of the trigrams of
+    their first names, or the INITIALS_SCORE if one first name is given as initials only and they have the same
+    initials, minus the YEAR_PENALTY for each year between their birth years. The trigrams shared by all the pairs are
+    counted at once with joins instead of comparing the names pair by pair
+    :param identities_df: The identities dataframe returned by member_identities
+    :param pairs_df: The candidate pairs dataframe returned by candidate_pairs
+    :return: The pairs dataframe with a SCORE column
+    """
+    trigrams_df = _trigrams(identities_df)
+    shared_df = pairs_df.merge(trigrams_df.rename(columns={'PERSID': 'PERSID_A'}), on='PERSID_A') \
+        .merge(trigrams_df.rename(columns={'PERSID': 'PERSID_B'}), on=['PERSID_B', 'TRIGRAM'])
+    shared = shared_df.groupby(['PERSID_A', 'PERSID_B']).size().rename('SHARED').reset_index()
+    nb_trigrams = trigrams_df.groupby('PERSID').size()
+    identities = identities_df.set_index('PERSID')
+    scored_df = pairs_df.merge(shared, how='left', on=['PERSID_A', 'PERSID_B']).fillna({'SHARED': 0})
+    nb_trigrams_a = scored_df['PERSID_A'].map(nb_trigrams)
+    nb_trigrams_b = scored_df['PERSID_B'].map(nb_trigrams)
+    jaccard = scored_df['SHARED'] / (nb_trigrams_a + nb_trigrams_b - scored_df['SHARED'])
+    initials_a = scored_df['PERSID_A'].map(identities['INITIALS'])
+    initials_b = scored_df['PERSID_B'].map(identities['INITIALS'])
+    initials_only = scored_df['PERSID_A'].map(identities['INITIALS_ONLY']) | \
+        scored_df['PERSID_B'].map(identities['INITIALS_ONLY'])
+    initials_score = np.where(initials_only & (initials_a == initials_b), INITIALS_SCORE, 0.0)
+    year_a = scored_df['PERSID_A'].map(identities['YEAR'])
+    year_b = scored_df['PERSID_B'].map(identities['YEAR'])
+    scored_df['SCORE'] = (np.maximum(jaccard, initials_score) - YEAR_PENALTY * (year_a - year_b).abs()).round(3)
+    return scored_df.drop(columns=['SHARED'])
+
+
+def cluster_pairs(identities_df: pd.DataFrame, matches_df: pd.DataFrame,
+                  expeditions: Dict[int, Set[str]]) -> Tuple[Dict[int, int], List[str]]:
+    """
+    Cluster the matching pairs of identities with a union-find, from the best to the worst score. Two clusters are only
+    merged if all the pairs of their members match (complete linkage), so a first name given as initials only (e.g.
+    "J.") does not chain different first names with the same initials (e.g. "John" and "James"). Two clusters are not
+    merged either if they have a member in the same expedition, as a person is only once a member of an expedition
+    :param identities_df: The identities dataframe returned by member_identities
+    :param matches_df: The matching pairs dataframe with the PERSID_A, PERSID_B and SCORE columns
+    :param expeditions: The set of expedition IDs of each PERSID
+    :return: A tuple with the dictionary of the cluster PERSID of the merged PERSIDs, the PERSID of the member with the
+    most memberships of the cluster, and the list of the status of each pair, "merged", "same expedition" or
+    "partial match"
+    """
+    parents = {}
+    cluster_expeditions = {}
+    cluster_members = {}
+    clustered = set()
+    matched_pairs = set(matches_df[['PERSID_A', 'PERSID_B']].itertuples(index=False, name=None))
+
+    def find(persid: int) -> int:
+        """Get the root PERSID of the cluster of a PERSID, compressing the path to the root"""
+        root = persid
+        while parents.get(root, root) != root:
+            root = parents[root]
+        while persid != root:
+            parents[persid], persid = root, parents.get(persid, persid)
+        return root
+
+    statuses = []
+    for persid_a, persid_b in matches_df[['PERSID_A', 'PERSID_B']].itertuples(index=False):
+        root_a, root_b = find(persid_a), find(persid_b)
+        if root_a == root_b:
+            statuses.append('merged')
+            continue
+        expeditions_a = cluster_expeditions.get(root_a, expeditions.get(root_a, set()))
+        expeditions_b = cluster_expeditions.get(root_b, expeditions.get(root_b, set()))
+        if expeditions_a & expeditions_b:
+            statuses.append('same expedition')
+            continue
+        members_a = cluster_members.get(root_a, [root_a])
+        members_b = cluster_members.get(root_b, [root_b])
+        if any((min(a, b), max(a, b)) not in matched_pairs for a in members_a for b in members_b):
+            statuses.append('partial match')
+            continue
+        parents[root_b] = root_a
+        cluster_expeditions[root_a] = expeditions_a | expeditions_b
+        cluster_members[root_a] = members_a + members_b
+        clustered |= {persid_a, persid_b}
+        statuses.append('merged')
+    # The PERSID of a cluster is the PERSID of its member with the most memberships, the smallest PERSID if tied
+    clusters_df = pd.DataFrame({'PERSID': sorted(clustered)})
+    clusters_df['ROOT'] = clusters_df['PERSID'].map(find)
+    clusters_df = clusters_df.merge(identities_df[['PERSID', 'NB_MEMBERSHIPS']], on='PERSID') \
+        .sort_values(['ROOT', 'NB_MEMBERSHIPS', 'PERSID'], ascending=[True, False, True])
+    cluster_persids = clusters_df.groupby('ROOT')['PERSID'].first()
+    return dict(zip(clusters_df['PERSID'], clusters_df['ROOT'].map(cluster_persids))), statuses
+
+
+def resolve_members(members_df: pd.DataFrame, year_window: int = YEAR_WINDOW,
+                    min_score: float = MIN_SCORE) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Find the members with several PERSIDs because of spelling variants of their first name or of a different birth year
+    in some records, and merge them under a single PERSID
+    :param members_df: The members dataframe with the PERSID, FNAME, LNAME, SEX, YOB, RESIDENCE, SHERPA and EXPID
+    columns
+    :param year_window: The maximum difference between the birth years of two records of the same member
+    :param min_score: The minimum similarity score of two records of the same member
+    :return: A tuple with the members dataframe with the merged PERSIDs, the records of a merged member having the
+    names, gender and birth year of the member with the most memberships, and its first name preferring a full first
+    name over initials, and the merge list dataframe of the matching pairs with their names, SCORE and STATUS, "merged",
+    "same expedition" or "partial match", sorted by decreasing score
+    """
+    identities_df = member_identities(members_df)
+    scored_df = score_pairs(identities_df, candidate_pairs(identities_df, year_window))
+    matches_df = scored_df[scored_df['SCORE'] >= min_score] \
+        .sort_values(['SCORE', 'PERSID_A', 'PERSID_B'], ascending=[False, True, True], ignore_index=True)
+    expeditions = members_df.groupby('PERSID')['EXPID'].agg(set).to_dict()
+    cluster_persids, statuses = cluster_pairs(identities_df, matches_df, expeditions)
+    identity_columns = ['PERSID', 'FNAME', 'LNAME', 'SEX', 'YOB']
+    merges_df = matches_df.assign(STATUS=statuses) \
+        .merge(identities_df[identity_columns], left_on='PERSID_A', right_on='PERSID') \
+        .merge(identities_df[identity_columns].add_prefix('MATCH_'), left_on='PERSID_B', right_on='MATCH_PERSID')
+    resolved_df = members_df.copy()
+    resolved_df['PERSID'] = resolved_df['PERSID'].map(cluster_persids).fillna(resolved_df['PERSID']) \
+        .astype(members_df['PERSID'].dtype)
+    # The members nodes are merged on their names, gender and birth year, which must be the same for all their records
+    canonical_df = identities_df.set_index('PERSID')[['FNAME', 'LNAME', 'SEX', 'YOB']]
+    # The first name of a merged member is a full first name rather than initials, of the member with the most
+    # memberships
+    first_names_df = identities_df.assign(CLUSTER_PERSID=identities_df['PERSID'].map(cluster_persids)) \
+        .dropna(subset=['CLUSTER_PERSID']) \
+        .sort_values(['CLUSTER_PERSID', 'INITIALS_ONLY', 'NB_MEMBERSHIPS', 'PERSID'],
+                     ascending=[True, True, False, True])
+    canonical_df['FNAME'] = first_names_df.groupby('CLUSTER_PERSID')['FNAME'].first() \
+        .reindex(canonical_df.index).fillna(canonical_df['FNAME'])
+    merged = resolved_df['PERSID'].isin(set(cluster_persids.values()))
+    for column in canonical_df.columns:
+        resolved_df.loc[merged, column] = resolved_df.loc[merged, 'PERSID'].map(canonical_df[column])
+    print(f'{(merges_df["STATUS"] == "merged").sum()} pairs of members merged into {merged.sum()} records, '
+          f'{(merges_df["STATUS"] == "same expedition").sum()} pairs not merged as they are in the same expedition, '
+          f'{(merges_df["STATUS"] == "partial match").sum()} pairs not merged as their clusters do not fully match')
+    return resolved_df, merges_df[MERGE_COLUMNS]
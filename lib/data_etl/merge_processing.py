@@ -3,6 +3,7 @@ import pandas as pd
 import shutil
 
 from pathlib import Path
+from typing import Dict
 
 DATA_DIR = Path(__file__).parent.parent.parent / 'assets/data'
 NHPP_DATA_DIR = DATA_DIR / 'nhpp'
@@ -50,13 +51,24 @@ def merge_peaks(nepal_peaks_df: pd.DataFrame, hd_peaks_df: pd.DataFrame) -> pd.D
     return peaks_df
 
 
-if __name__ == '__main__':
+def merge_processed_data(nepal_peaks_df: pd.DataFrame = None,
+                         staged_data: Dict[str, pd.DataFrame] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Merge the preprocessed NHPP peaks into the staged HD peaks and save the processed data files
+    :param nepal_peaks_df: The preprocessed Nepal peaks dataframe handed over in memory by the preprocessing stage, by
+    default it is read from its file
+    :param staged_data: The staged expeditions, members and peaks dataframes by table name handed over in memory by the
+    staging stage, by default they are read from their files
+    :return: The processed expeditions, members and peaks dataframes by table name, or None if the staged data is read
+    from the files
+    """
     # Check if the ETL_DATA_DIR exist. If it does not, create it
     os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
     # read in the Nepal peaks data
-    nepal_peaks_df = pd.read_csv(NHPP_DATA_DIR / 'preprocessed_nhpp_peaks.csv')
+    if nepal_peaks_df is None:
+        nepal_peaks_df = pd.read_csv(NHPP_DATA_DIR / 'preprocessed_nhpp_peaks.csv')
     # read in the ETL processed HD peaks data
-    hd_peaks_df = pd.read_csv(STAGED_DATA_DIR / 'peaks.csv')
+    hd_peaks_df = pd.read_csv(STAGED_DATA_DIR / 'peaks.csv') if staged_data is None else staged_data['peaks'].copy()
     # merge the peaks data
     merged_peaks_df = merge_peaks(nepal_peaks_df, hd_peaks_df)
     # save the merged peaks data
@@ -65,3 +77,10 @@ if __name__ == '__main__':
     # from the staged folder to the processed folder
     shutil.copyfile(STAGED_DATA_DIR / 'exped.csv', PROCESSED_DATA_DIR / 'exped.csv')
     shutil.copyfile(STAGED_DATA_DIR / 'members.csv', PROCESSED_DATA_DIR / 'members.csv')
+    if staged_data is None:
+        return None
+    return {'expeditions': staged_data['expeditions'], 'members': staged_data['members'], 'peaks': merged_peaks_df}
+
+
+if __name__ == '__main__':
+    merge_processed_data()
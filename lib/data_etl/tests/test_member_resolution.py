@@ -0,0 +1,56 @@
+import pandas as pd
+
+from lib.data_etl.member_resolution import normalize_name, member_identities, candidate_pairs, resolve_members
+
+
+members_df = pd.DataFrame({
+    'PERSID': [1, 2, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+    'FNAME': ['Nicolas Alexander', 'N. A.', 'N. A.', 'Reinhold', 'Reinhold', 'Pasang', 'Pasang', 'John', 'Jon',
+              'Ang Rita', 'Reinhold'],
+    'LNAME': ['Tombazi', 'Tombazi', 'Tombazi', 'Messner', 'Messner', 'Sherpa', 'Sherpa', 'Smith', 'Smith', 'Sherpa',
+              'Messner'],
+    'SEX': ['M', 'M', 'M', 'M', 'M', 'M', 'M', 'M', 'M', 'M', 'F'],
+    'YOB': [1951, 1951, 1951, 1944, 1945, 1970, 1970, 1960, 1960, 1948, 1944],
+    'RESIDENCE': ['', '', '', '', '', 'Khumjung', 'Thame', '', '', 'Thame', ''],
+    'SHERPA': [False, False, False, False, False, True, True, False, False, True, False],
+    'EXPID': ['KANG55101', 'EVER63101', 'LHOT65101', 'NANG70101', 'EVER78101', 'EVER90101', 'EVER90102', 'AMAD80101',
+              'AMAD80101', 'EVER85101', 'EVER88101']
+})
+
+
+def test_normalize_name():
+    assert normalize_name('Nicolás-Alexander') == 'nicolas alexander'
+    assert normalize_name(' N. A. ') == 'n a'
+    assert normalize_name(None) == ''
+
+
+def test_candidate_pairs():
+    pairs = candidate_pairs(member_identities(members_df)).values.tolist()
+    # The Sherpas living in different villages and the members of different genders are not compared
+    assert sorted(pairs) == [[1, 2], [3, 4], [7, 8]]
+    # The members born more than the year window apart are not compared
+    assert [3, 4] not in candidate_pairs(member_identities(members_df), year_window=0).values.tolist()
+
+
+def test_resolve_members():
+    resolved_df, merges_df = resolve_members(members_df)
+    # The records of the same member have the same ID, of the member with the most memberships, and the full first name
+    assert resolved_df['PERSID'].tolist() == [2, 2, 2, 3, 3, 5, 6, 7, 8, 9, 10]
+    assert set(resolved_df.loc[resolved_df['PERSID'] == 2, 'FNAME']) == {'Nicolas Alexander'}
+    assert set(resolved_df.loc[resolved_df['PERSID'] == 3, 'YOB']) == {1944}
+    assert merges_df[['PERSID', 'MATCH_PERSID', 'STATUS']].values.tolist() == [[3, 4, 'merged'], [1, 2, 'merged']]
+    # The members of the same expedition are never merged
+    resolved_df, merges_df = resolve_members(members_df, min_score=0.2)
+    assert merges_df.loc[merges_df['PERSID'] == 7, 'STATUS'].tolist() == ['same expedition']
+    assert resolved_df['PERSID'].nunique() == 8
+
+
+def test_resolve_initials_chain():
+    chain_df = pd.DataFrame({'PERSID': [1, 2, 3], 'FNAME': ['J.', 'John', 'James'], 'LNAME': ['Smith'] * 3,
+                             'SEX': ['M'] * 3, 'YOB': [1960] * 3, 'RESIDENCE': [''] * 3, 'SHERPA': [False] * 3,
+                             'EXPID': ['AMAD80101', 'EVER82101', 'LHOT84101']})
+    resolved_df, merges_df = resolve_members(chain_df)
+    # The initials match both first names, but John and James do not match, so James is not merged
+    assert resolved_df['PERSID'].tolist() == [1, 1, 3]
+    assert resolved_df['FNAME'].tolist() == ['John', 'John', 'James']
+    assert merges_df['STATUS'].tolist() == ['merged', 'partial match']
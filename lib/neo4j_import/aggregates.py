@@ -0,0 +1,111 @@
+import pandas as pd
+
+from typing import List
+
+
+# Height in meters from which a peak is counted as an 8000m peak
+EIGHT_THOUSANDER_HEIGHT = 8000
+
+
+def _as_bool(series: pd.Series) -> pd.Series:
+    """
+    Convert a boolean column read from a CSV file, which may contain missing values, to a boolean series
+    :param series: The column to convert
+    :return: The boolean series, with the missing values set to False
+    """
+    if series.dtype == object:
+        series = series.map(lambda x: str(x).lower() == 'true')
+    return series.fillna(False).astype(bool)
+
+
+def _as_nullable_years(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """
+    Convert year columns with missing values to integers. The missing values are converted to empty strings during the
+    import, as all the other missing values, and set to null in the Cypher queries.
+    :param df: The dataframe
+    :param columns: The year columns to convert
+    :return: The dataframe with the year columns as objects
+    """
+    for column in columns:
+        df[column] = df[column].astype('Int64').astype(object).where(df[column].notna(), None)
+    return df
+
+
+def compute_peak_aggregates(exped_df: pd.DataFrame, members_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute the summary metrics of each peak from its expeditions and their members
+    :param exped_df: The expeditions dataframe
+    :param members_df: The members dataframe
+    :return: A dataframe with one row per peak with the PEAKID, NB_EXPEDITIONS, NB_SUCCESSFUL_EXPEDITIONS, NB_SUMMITS,
+    NB_DEATHS, DEATH_RATE and FIRST_SUMMIT_YEAR columns
+    """
+    # An expedition is successful if it climbed any of its routes
+    successful = pd.concat([_as_bool(exped_df[f'SUCCESS{i}']) for i in range(1, 5)], axis=1).any(axis=1)
+    expeditions = pd.DataFrame({'PEAKID': exped_df['PEAKID'], 'SUCCESSFUL': successful}).groupby('PEAKID').agg(
+        NB_EXPEDITIONS=('SUCCESSFUL', 'size'),
+        NB_SUCCESSFUL_EXPEDITIONS=('SUCCESSFUL', 'sum'))
+    members = pd.DataFrame({'PEAKID': members_df['PEAKID'],
+                            'SUMMIT': _as_bool(members_df['MSUCCESS']),
+                            'DEATH': _as_bool(members_df['DEATH']),
+                            'MYEAR': members_df['MYEAR']})
+    members['SUMMIT_YEAR'] = members['MYEAR'].where(members['SUMMIT'])
+    members = members.groupby('PEAKID').agg(NB_MEMBERS=('SUMMIT', 'size'),
+                                            NB_SUMMITS=('SUMMIT', 'sum'),
+                                            NB_DEATHS=('DEATH', 'sum'),
+                                            FIRST_SUMMIT_YEAR=('SUMMIT_YEAR', 'min'))
+    peaks_df = expeditions.join(members, how='outer')
+    peaks_df[['NB_EXPEDITIONS', 'NB_SUCCESSFUL_EXPEDITIONS', 'NB_MEMBERS', 'NB_SUMMITS', 'NB_DEATHS']] = \
+        peaks_df[['NB_EXPEDITIONS', 'NB_SUCCESSFUL_EXPEDITIONS', 'NB_MEMBERS', 'NB_SUMMITS', 'NB_DEATHS']] \
+        .fillna(0).astype(int)
+    # The death rate is the share of the expeditions members (including the hired personnel) who died on the peak
+    peaks_df['DEATH_RATE'] = (peaks_df['NB_DEATHS'] / peaks_df['NB_MEMBERS'].where(peaks_df['NB_MEMBERS'] > 0)) \
+        .fillna(0.0).round(4)
+    peaks_df = _as_nullable_years(peaks_df, ['FIRST_SUMMIT_YEAR'])
+    return peaks_df.reset_index()[['PEAKID', 'NB_EXPEDITIONS', 'NB_SUCCESSFUL_EXPEDITIONS', 'NB_SUMMITS', 'NB_DEATHS',
+                                   'DEATH_RATE', 'FIRST_SUMMIT_YEAR']]
+
+
+def compute_expedition_aggregates(members_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute the summary metrics of each expedition from its members, including the hired personnel
+    :param members_df: The members dataframe
+    :return: A dataframe with one row per expedition with the EXPID, YEAR, NB_PARTICIPANTS, NB_SUMMITERS, NB_DEATHS,
+    SUMMIT_RATE and DEATH_RATE columns
+    """
+    members = pd.DataFrame({'EXPID': members_df['EXPID'],
+                            'YEAR': members_df['MYEAR'],
+                            'SUMMIT': _as_bool(members_df['MSUCCESS']),
+                            'DEATH': _as_bool(members_df['DEATH'])})
+    expeditions_df = members.groupby(['EXPID', 'YEAR']).agg(NB_PARTICIPANTS=('SUMMIT', 'size'),
+                                                            NB_SUMMITERS=('SUMMIT', 'sum'),
+                                                            NB_DEATHS=('DEATH', 'sum'))
+    expeditions_df['SUMMIT_RATE'] = (expeditions_df['NB_SUMMITERS'] / expeditions_df['NB_PARTICIPANTS']).round(4)
+    expeditions_df['DEATH_RATE'] = (expeditions_df['NB_DEATHS'] / expeditions_df['NB_PARTICIPANTS']).round(4)
+    return expeditions_df.reset_index()
+
+
+def compute_member_aggregates(members_df: pd.DataFrame, peaks_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute the summary metrics of each member across all their expeditions
+    :param members_df: The members dataframe
+    :param peaks_df: The peaks dataframe, used to get the height of the peaks
+    :return: A dataframe with one row per member with the PERSID, NB_EXPEDITIONS, NB_SUMMITS, NB_8000M_SUMMITS,
+    NB_8000M_PEAKS, FIRST_EXPEDITION_YEAR, LAST_EXPEDITION_YEAR and FIRST_SUMMIT_YEAR columns
+    """
+    peak_heights = peaks_df.drop_duplicates('PEAKID').set_index('PEAKID')['HEIGHTM']
+    members = pd.DataFrame({'PERSID': members_df['PERSID'],
+                            'PEAKID': members_df['PEAKID'],
+                            'MYEAR': members_df['MYEAR'],
+                            'SUMMIT': _as_bool(members_df['MSUCCESS'])})
+    members['SUMMIT_8000M'] = members['SUMMIT'] & (members['PEAKID'].map(peak_heights) >= EIGHT_THOUSANDER_HEIGHT)
+    members['SUMMIT_YEAR'] = members['MYEAR'].where(members['SUMMIT'])
+    members['PEAK_8000M'] = members['PEAKID'].where(members['SUMMIT_8000M'])
+    aggregates_df = members.groupby('PERSID').agg(NB_EXPEDITIONS=('SUMMIT', 'size'),
+                                                  NB_SUMMITS=('SUMMIT', 'sum'),
+                                                  NB_8000M_SUMMITS=('SUMMIT_8000M', 'sum'),
+                                                  NB_8000M_PEAKS=('PEAK_8000M', 'nunique'),
+                                                  FIRST_EXPEDITION_YEAR=('MYEAR', 'min'),
+                                                  LAST_EXPEDITION_YEAR=('MYEAR', 'max'),
+                                                  FIRST_SUMMIT_YEAR=('SUMMIT_YEAR', 'min'))
+    aggregates_df = _as_nullable_years(aggregates_df, ['FIRST_SUMMIT_YEAR'])
+    return aggregates_df.reset_index()
@@ -0,0 +1,127 @@
+import time
+import queue
+import threading
+import pandas as pd
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+# The number of batches prepared in advance while the current batch is committed
+PREPARED_BATCHES = 4
+# The end of the prepared batches
+_END = object()
+
+
+def prepare_batches(chunks: Iterable[pd.DataFrame], batch_size: int) -> Iterator[List[Dict]]:
+    """
+    Split the chunks of data to import into batches of records sent to the Neo4j server
+    :param chunks: The dataframe chunks of the data to import
+    :param batch_size: The number of records of a batch
+    :return: An iterator of the batches, as lists of records dictionaries
+    """
+    for chunk_df in chunks:
+        # Get the list of all the columns which have a string type and fill their NaN values with an empty string
+        # because the Neo4j doesn't support NaN values for strings
+        columns_to_convert_nan = [k for k, v in chunk_df.dtypes.items() if v == str or v == object]
+        chunk_df = chunk_df.fillna({column: '' for column in columns_to_convert_nan})
+        for i in range(0, chunk_df.shape[0], batch_size):
+            yield chunk_df.iloc[i:i + batch_size].to_dict('records')
+
+
+class BatchPrefetcher:
+    def __init__(self, items: Iterable[Any], max_size: int = PREPARED_BATCHES):
+        """
+        Prepare the items of an iterable in a background thread into a bounded queue, while the consumer processes the
+        previous items. The import prepares the next batches (reading the chunks, slicing them and converting them to
+        records) while the server commits the current batch, so the client work and the server latency overlap even
+        with a single connection. The queue is bounded, so at most max_size batches are held in memory.
+        :param items: The iterable of the items to prepare, iterated in the background thread
+        :param max_size: The maximum number of prepared items waiting in the queue
+        """
+        self.items = items
+        self.queue = queue.Queue(maxsize=max_size)
+        # The number of items consumed and the sum of the queue depths when they were consumed
+        self.nb_items = 0
+        self.total_depth = 0
+        # The time the consumer waited for an item to be prepared, and the time the producer waited for room in the
+        # queue
+        self.consumer_stall = 0.0
+        self.producer_stall = 0.0
+        self._error: Optional[BaseException] = None
+        self._stop_event = threading.Event()
+        self._producer: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop_event.clear()
+        self._producer = threading.Thread(target=self._produce, name='batch-prefetcher', daemon=True)
+        self._producer.start()
+
+    def stop(self):
+        self._stop_event.set()
+        # Free a slot of the queue, in case the producer is waiting for room to put an item
+        try:
+            self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        self._producer.join()
+
+    def __enter__(self) -> 'BatchPrefetcher':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _put(self, item: Any) -> bool:
+        """
+        Put an item in the queue, waiting for room in the queue unless the prefetcher is stopped
+        :param item: The item
+        :return: True if the item was put in the queue, False if the prefetcher was stopped
+        """
+        start = time.perf_counter()
+        while not self._stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                self.producer_stall += time.perf_counter() - start
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        """Prepare the items until they are all prepared, the prefetcher is stopped or the preparation fails"""
+        try:
+            for item in self.items:
+                if not self._put(item):
+                    return
+        except BaseException as e:
+            # The error is raised in the consumer thread
+            self._error = e
+        self._put(_END)
+
+    def __iter__(self) -> Iterator[Any]:
+        while True:
+            start = time.perf_counter()
+            depth = self.queue.qsize()
+            item = self.queue.get()
+            self.consumer_stall += time.perf_counter() - start
+            if item is _END:
+                if self._error is not None:
+                    raise self._error
+                return
+            self.nb_items += 1
+            self.total_depth += depth
+            yield item
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the statistics of the prefetching
+        :return: A dictionary with the number of BATCHES, the MEAN_QUEUE_DEPTH when a batch was consumed, the
+        WRITER_STALL seconds the consumer waited for a batch to be prepared and the PREPARER_STALL seconds the producer
+        waited for the consumer. A high writer stall means the import is bound by the client preparation, a high
+        preparer stall that it is bound by the server commits
+        """
+        return {'BATCHES': self.nb_items,
+                'MEAN_QUEUE_DEPTH': round(self.total_depth / self.nb_items, 2) if self.nb_items else 0.0,
+                'WRITER_STALL': round(self.consumer_stall, 3),
+                'PREPARER_STALL': round(self.producer_stall, 3)}
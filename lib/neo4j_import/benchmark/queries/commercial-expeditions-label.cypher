@@ -0,0 +1,2 @@
+// Commercial expeditions selected by label, from the "Multi-labels nodes" section of docs/NEO4J_DATABASE.md
+MATCH (e:CommercialExpedition) RETURN e
@@ -0,0 +1,5 @@
+// Number of expeditions per season of the last 10 years
+MATCH (e:Expedition)
+WHERE e.year >= 2012
+RETURN e.year AS year, e.season AS season, count(e) AS nbExpeditions
+ORDER BY year, season
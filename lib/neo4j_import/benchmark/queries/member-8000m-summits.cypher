@@ -0,0 +1,8 @@
+// Members with the most summits and number of different 8000m peaks summited
+MATCH (m:Member)-[r:LED|JOINED|WORKED_FOR]->(e:Expedition)-[:CLIMBED]->(:Route)-[:ON_PEAK]->(p:Peak)
+WHERE r.summitSuccess
+WITH DISTINCT m, e, p
+RETURN m.name AS member, count(*) AS nbSummits,
+       count(DISTINCT CASE WHEN p.heightMeters >= 8000 THEN p END) AS nb8000mPeaks
+ORDER BY nbSummits DESC
+LIMIT 20
@@ -0,0 +1,5 @@
+// Members who climbed together the most often
+MATCH (m1:Member)-[r:PARTNERED_WITH]->(m2:Member)
+RETURN m1.name AS member1, m2.name AS member2, r.expeditionCount AS nbExpeditions
+ORDER BY nbExpeditions DESC
+LIMIT 20
@@ -0,0 +1,8 @@
+// Death rate of the members of the expeditions of each peak
+MATCH (m:Member)-[r:LED|JOINED|WORKED_FOR]->(e:Expedition)-[:CLIMBED|ATTEMPTED]->(:Route)-[:ON_PEAK]->(p:Peak)
+WITH DISTINCT p, e, m, r
+WITH p, count(*) AS nbMembers, sum(CASE WHEN r.death THEN 1 ELSE 0 END) AS nbDeaths
+WHERE nbMembers >= 100
+RETURN p.name AS peak, nbMembers, nbDeaths, toFloat(nbDeaths) / nbMembers AS deathRate
+ORDER BY deathRate DESC
+LIMIT 20
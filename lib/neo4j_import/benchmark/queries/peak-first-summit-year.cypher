@@ -0,0 +1,4 @@
+// Year of the first expedition reaching the summit of each peak
+MATCH (e:Expedition)-[:CLIMBED]->(:Route)-[:ON_PEAK]->(p:Peak)
+RETURN p.name AS peak, min(e.year) AS firstSummitYear
+ORDER BY firstSummitYear
@@ -0,0 +1,6 @@
+// Number of members who reached the summit of each peak, using the precomputed aggregates
+MATCH (p:Peak)
+WHERE p.nbSummits > 0
+RETURN p.name AS peak, p.nbSummits AS nbSummits
+ORDER BY nbSummits DESC
+LIMIT 20
@@ -0,0 +1,7 @@
+// Number of members who reached the summit of each peak, traversing the members relationships
+MATCH (m:Member)-[r:LED|JOINED|WORKED_FOR]->(e:Expedition)-[:CLIMBED]->(:Route)-[:ON_PEAK]->(p:Peak)
+WHERE r.summitSuccess
+WITH DISTINCT p, e, m
+RETURN p.name AS peak, count(*) AS nbSummits
+ORDER BY nbSummits DESC
+LIMIT 20
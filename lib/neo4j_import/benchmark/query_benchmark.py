@@ -0,0 +1,196 @@
+import json
+import time
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from lib.neo4j_import.settings import get_neo4j_settings, get_neo4j_driver
+
+if TYPE_CHECKING:
+    import neo4j
+
+
+# Increment the version when the benchmark queries are changed on purpose, the hash of the queries texts is added to
+# the version to detect unintended changes
+QUERY_SET_VERSION = 1
+BENCHMARK_PATH = Path(__file__).parent
+# The representative queries of the benchmark and the data quality queries of the tests
+QUERY_FILES = [(BENCHMARK_PATH / 'queries', '*.cypher'), (BENCHMARK_PATH.parent / 'tests', 'test-*.cypher')]
+RESULTS_PATH = BENCHMARK_PATH / 'results'
+PERCENTILES = [50, 95, 99]
+
+
+def _query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()[:12]
+
+
+def load_query_set(query_files: List[Tuple[Path, str]] = None) -> Tuple[Dict[str, str], str]:
+    """
+    Load the benchmark queries
+    :param query_files: The list of (folder, glob pattern) tuples of the query files, the benchmark and tests queries by
+    default
+    :return: A tuple containing the dictionary of the queries by name and the version of the query set
+    """
+    queries = {}
+    for folder, pattern in query_files or QUERY_FILES:
+        for query_file in sorted(folder.glob(pattern)):
+            try:
+                queries[query_file.stem] = query_file.read_text(encoding='utf-8')
+            except Exception as e:
+                print(f'Error reading the Neo4j Cypher query file {query_file}', e)
+                raise e
+    query_set_hash = _query_hash(''.join(f'{name}\n{query}' for name, query in sorted(queries.items())))
+    return queries, f'{QUERY_SET_VERSION}-{query_set_hash}'
+
+
+def latency_percentiles(latencies: List[float]) -> Dict[str, float]:
+    """
+    Compute the latency percentiles of a query
+    :param latencies: The latencies of the repetitions of the query in seconds
+    :return: A dictionary of the p50, p95 and p99 latencies in milliseconds
+    """
+    values = np.percentile(np.array(latencies) * 1000, PERCENTILES)
+    return {f'p{percentile}_ms': round(float(value), 3) for percentile, value in zip(PERCENTILES, values)}
+
+
+def sum_db_hits(profile: Optional[Dict]) -> int:
+    """
+    Sum the database hits of all the operators of a profiled query plan
+    :param profile: The profiled plan returned in the result summary of a PROFILE query
+    :return: The total number of database hits
+    """
+    if not profile:
+        return 0
+    return profile.get('dbHits', 0) + sum(sum_db_hits(child) for child in profile.get('children', []))
+
+
+def benchmark_query(session: 'neo4j.Session', query: str, warmup: int, repetitions: int) -> Dict:
+    """
+    Measure the latency of a query. The warm-up runs fill the query plan and page caches and are not measured. All the
+    records are fetched, so the latencies include the transfer of the results.
+    :param session: The Neo4j session
+    :param query: The Cypher query
+    :param warmup: The number of warm-up runs
+    :param repetitions: The number of measured runs
+    :return: A dictionary of the latency statistics, the number of rows and the database hits of the query
+    """
+    for _ in range(warmup):
+        session.run(query).consume()
+    latencies = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        records = list(session.run(query))
+        latencies.append(time.perf_counter() - start)
+    summary = session.run(f'PROFILE {query}').consume()
+    return {**latency_percentiles(latencies),
+            'mean_ms': round(float(np.mean(latencies)) * 1000, 3),
+            'rows': len(records),
+            'db_hits': sum_db_hits(summary.profile)}
+
+
+def run_benchmark(driver: 'neo4j.Driver', db_name: str, queries: Dict[str, str], query_set_version: str,
+                  warmup: int = 3, repetitions: int = 20) -> Dict:
+    """
+    Run all the benchmark queries
+    :param driver: The Neo4j driver
+    :param db_name: The name of the Neo4j database
+    :param queries: The dictionary of the queries by name
+    :param query_set_version: The version of the query set
+    :param warmup: The number of warm-up runs of each query
+    :param repetitions: The number of measured runs of each query
+    :return: The benchmark results
+    """
+    results = {'query_set_version': query_set_version,
+               'database': db_name,
+               'server': driver.get_server_info().agent,
+               'started_at': datetime.now().isoformat(timespec='seconds'),
+               'warmup': warmup,
+               'repetitions': repetitions,
+               'queries': {}}
+    with driver.session(database=db_name) as session:
+        for name, query in queries.items():
+            print(f'Running the {name} query')
+            results['queries'][name] = {'hash': _query_hash(query),
+                                        **benchmark_query(session, query, warmup, repetitions)}
+    return results
+
+
+def save_results(results: Dict, results_path: Path = RESULTS_PATH) -> Path:
+    """
+    Save the benchmark results to a JSON file named after the start time of the benchmark
+    :param results: The benchmark results
+    :param results_path: The folder of the results files
+    :return: The path of the results file
+    """
+    results_path.mkdir(parents=True, exist_ok=True)
+    results_file = results_path / f"{results['started_at'].replace(':', '-')}.json"
+    results_file.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    return results_file
+
+
+def load_latest_results(results_path: Path = RESULTS_PATH) -> Optional[Dict]:
+    """
+    Load the results of the latest benchmark run
+    :param results_path: The folder of the results files
+    :return: The benchmark results or None if there are no previous results
+    """
+    results_files = sorted(results_path.glob('*.json'))
+    if len(results_files) == 0:
+        return None
+    return json.loads(results_files[-1].read_text(encoding='utf-8'))
+
+
+def compare_results(baseline: Dict, results: Dict) -> pd.DataFrame:
+    """
+    Compare the results of two benchmark runs. Only the queries which have not changed between the runs are compared.
+    :param baseline: The results of the baseline run
+    :param results: The results of the new run
+    :return: A dataframe with one row per query with the baseline and new p50, p95 and p99 latencies and db hits, and
+    the relative change of the p50 latency
+    """
+    rows = []
+    for name, query_results in results['queries'].items():
+        baseline_results = baseline['queries'].get(name)
+        if baseline_results is None or baseline_results['hash'] != query_results['hash']:
+            continue
+        row = {'QUERY': name}
+        for metric in [f'p{percentile}_ms' for percentile in PERCENTILES] + ['db_hits']:
+            row[f'{metric.upper()}_BASELINE'] = baseline_results[metric]
+            row[metric.upper()] = query_results[metric]
+        row['P50_CHANGE'] = round(query_results['p50_ms'] / baseline_results['p50_ms'] - 1, 4) \
+            if baseline_results['p50_ms'] > 0 else None
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the representative queries of the Himalayas database')
+    parser.add_argument('--database', help='the name of the Neo4j database, by default the NEO4J_DATABASE_NAME '
+                                           'environment variable')
+    parser.add_argument('--warmup', type=int, default=3, help='the number of warm-up runs of each query')
+    parser.add_argument('--repetitions', type=int, default=20, help='the number of measured runs of each query')
+    parser.add_argument('--results-dir', type=Path, default=RESULTS_PATH, help='the folder of the results files')
+    parser.add_argument('--baseline', type=Path,
+                        help='the results file to compare with, the latest results by default')
+    args = parser.parse_args()
+
+    benchmark_queries, version = load_query_set()
+    with get_neo4j_driver() as neo4j_driver:
+        benchmark_results = run_benchmark(neo4j_driver, args.database or get_neo4j_settings().database_name,
+                                          benchmark_queries, version, args.warmup, args.repetitions)
+    baseline_results = json.loads(args.baseline.read_text(encoding='utf-8')) if args.baseline \
+        else load_latest_results(args.results_dir)
+    print(f'Results saved to {save_results(benchmark_results, args.results_dir)}')
+    pd.set_option('display.width', 200)
+    print(pd.DataFrame.from_dict(benchmark_results['queries'], orient='index').drop(columns='hash').to_string())
+    if baseline_results is not None:
+        if baseline_results['query_set_version'] != version:
+            print(f"The query set changed since the baseline run ({baseline_results['query_set_version']}), only the "
+                  f"unchanged queries are compared")
+        print(f"Comparison with the run of {baseline_results['started_at']}")
+        print(compare_results(baseline_results, benchmark_results).to_string(index=False))
@@ -0,0 +1,250 @@
+import argparse
+import pandas as pd
+
+from pathlib import Path
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+from lib.neo4j_import.neo4j_import import import_himalayas_database, compute_data_version, compute_frames_version
+from lib.neo4j_import.settings import get_neo4j_settings, get_neo4j_driver
+
+if TYPE_CHECKING:
+    import neo4j
+
+
+DATA_DIR = Path(__file__).parent.parent.parent / 'assets/data'
+IMPORT_FILES = [DATA_DIR / 'processed/exped.csv', DATA_DIR / 'processed/members.csv', DATA_DIR / 'processed/peaks.csv']
+# The data quality queries of the tests, which return the nodes breaking a rule, checked on the new version before the
+# alias is switched to it
+CHECK_QUERY_FILES = sorted((Path(__file__).parent / 'tests').glob('test-*.cypher'))
+# The labels which must have nodes in the new version
+REQUIRED_LABELS = ['Expedition', 'Member', 'Peak']
+# The versions kept: the version served by the alias and the previous one, for a fast rollback
+KEEP_VERSIONS = 2
+
+
+def version_database_name(alias: str, version: str) -> str:
+    """
+    Get the name of the database of a data version. The Neo4j database names can not contain underscores, so the
+    version is separated by a dash
+    :param alias: The name of the alias serving the database
+    :param version: The version of the data
+    :return: The name of the database
+    """
+    return f'{alias}-{version}'
+
+
+def is_version_database(db_name: Optional[str], alias: str, version: str) -> bool:
+    """
+    Check if a database contains a data version, imported in the database named after the version or, when imported
+    again, in a database with a numbered suffix
+    :param db_name: The name of the database
+    :param alias: The name of the alias serving the database
+    :param version: The version of the data
+    :return: True if the database contains the version
+    """
+    version_db_name = version_database_name(alias, version)
+    return db_name is not None and (db_name == version_db_name or db_name.startswith(f'{version_db_name}-'))
+
+
+def reimport_database_name(alias: str, version: str, existing_db_names: List[str]) -> str:
+    """
+    Get the name of a new database to import again a data version, so the database of the version served by the alias
+    is not replaced during the import
+    :param alias: The name of the alias serving the database
+    :param version: The version of the data
+    :param existing_db_names: The names of the existing databases
+    :return: The name of the database of the version with the first numbered suffix not used by an existing database
+    """
+    suffix = 2
+    while f'{version_database_name(alias, version)}-{suffix}' in existing_db_names:
+        suffix += 1
+    return f'{version_database_name(alias, version)}-{suffix}'
+
+
+def get_alias_target(driver: 'neo4j.Driver', alias: str) -> Optional[str]:
+    """
+    Get the database an alias points to
+    :param driver: The Neo4j driver
+    :param alias: The name of the alias
+    :return: The name of the database, or None if the alias does not exist
+    """
+    with driver.session(database='system') as session:
+        record = session.run('SHOW ALIASES FOR DATABASE YIELD name, database WHERE name = $alias RETURN database',
+                             parameters={'alias': alias}).single()
+    return record['database'] if record else None
+
+
+def list_version_databases(driver: 'neo4j.Driver', alias: str) -> List[str]:
+    """
+    List the databases of the data versions of an alias
+    :param driver: The Neo4j driver
+    :param alias: The name of the alias
+    :return: The names of the databases
+    """
+    with driver.session(database='system') as session:
+        records = session.run('SHOW DATABASES YIELD name WHERE name STARTS WITH $prefix RETURN DISTINCT name',
+                              parameters={'prefix': version_database_name(alias, '')})
+        return [record['name'] for record in records]
+
+
+def get_imported_at(driver: 'neo4j.Driver', db_name: str) -> Optional[str]:
+    """
+    Get when the data of a database was imported
+    :param driver: The Neo4j driver
+    :param db_name: The name of the database
+    :return: The ISO import date time recorded in the ImportVersion node, or None if the import did not complete
+    """
+    with driver.session(database=db_name) as session:
+        record = session.run('MATCH (v:ImportVersion) RETURN toString(max(v.importedAt)) AS importedAt').single()
+    return record['importedAt'] if record else None
+
+
+def check_database(driver: 'neo4j.Driver', db_name: str, query_files: List[Path] = None) -> pd.DataFrame:
+    """
+    Check a newly imported database before serving it: the required labels must have nodes and the data quality
+    queries must return no rows
+    :param driver: The Neo4j driver
+    :param db_name: The name of the database
+    :param query_files: The data quality query files, by default the CHECK_QUERY_FILES
+    :return: A dataframe of the failed checks with the CHECK and ROWS columns, empty if all the checks passed
+    """
+    failed_checks = []
+    with driver.session(database=db_name) as session:
+        for label in REQUIRED_LABELS:
+            nb_nodes = session.run(f'MATCH (n:{label}) RETURN count(n) AS nbNodes').single()['nbNodes']
+            if nb_nodes == 0:
+                failed_checks.append({'CHECK': f'{label} nodes', 'ROWS': 0})
+        for query_file in CHECK_QUERY_FILES if query_files is None else query_files:
+            rows = session.run(query_file.read_text(encoding='utf-8')).data()
+            if rows:
+                failed_checks.append({'CHECK': query_file.stem, 'ROWS': len(rows)})
+    return pd.DataFrame(failed_checks, columns=['CHECK', 'ROWS'])
+
+
+def switch_alias(driver: 'neo4j.Driver', alias: str, db_name: str):
+    """
+    Point the alias to a database. The switch is atomic: the clients of the alias query either the previous or the new
+    database, never an empty or partially imported one
+    :param driver: The Neo4j driver
+    :param alias: The name of the alias
+    :param db_name: The name of the database
+    :return: None
+    """
+    with driver.session(database='system') as session:
+        # An alias can not have the name of an existing database, e.g. the database of the imports without versions
+        if session.run('SHOW DATABASES YIELD name WHERE name = $alias RETURN name',
+                       parameters={'alias': alias}).single():
+            print(f'Error switching the {alias} alias, a database has the same name')
+            raise RuntimeError(f'The {alias} database must be dropped before serving the versions with an alias')
+        print(f'Switching the {alias} alias to the {db_name} database')
+        session.run(f'CREATE OR REPLACE ALIAS `{alias}` FOR DATABASE `{db_name}`').consume()
+
+
+def drop_old_versions(driver: 'neo4j.Driver', alias: str, keep: List[str]):
+    """
+    Drop the databases of the versions which are not kept
+    :param driver: The Neo4j driver
+    :param alias: The name of the alias
+    :param keep: The names of the databases to keep
+    :return: None
+    """
+    for db_name in list_version_databases(driver, alias):
+        if db_name not in keep:
+            print(f'Dropping the {db_name} database of an old version')
+            with driver.session(database='system') as session:
+                session.run(f'DROP DATABASE `{db_name}` IF EXISTS').consume()
+
+
+def import_blue_green(alias: str = None, import_batch_size: int = 50, test: bool = False, test_size: int = 100,
+                      validate: bool = True, force: bool = False, profile_dir: Path = None,
+                      data: Dict[str, pd.DataFrame] = None) -> str:
+    """
+    Import the data in a new database named after the version of the data, check it, and switch the alias to it. The
+    alias keeps serving the previous version during the import, which is kept for a rollback
+    :param alias: The name of the alias queried by the clients, by default the NEO4J_DATABASE_NAME environment variable
+    :param import_batch_size: The number of records to import in a batch
+    :param test: If True, only the test_size first expeditions and their related data are imported
+    :param test_size: The number of expeditions to import in test mode
+    :param validate: If True, the data is validated before the database is created
+    :param force: If True, the data is imported again even if the alias already serves its version, in a new database
+    with a numbered suffix so the served database is not replaced
+    :param profile_dir: If set, a batch of each import query is profiled and the plan reports are saved in this folder
+    :param data: The dataframes handed over in memory by the previous pipeline stages, imported instead of the files
+    :return: The name of the database served by the alias
+    """
+    alias = alias or get_neo4j_settings().database_name
+    # The version of the imported data, the dataframes handed over in memory if any or else the data files
+    version_options = f'test={test_size}' if test else ''
+    version = compute_data_version(IMPORT_FILES, version_options) if data is None \
+        else compute_frames_version(data, version_options)
+    db_name = version_database_name(alias, version)
+    with get_neo4j_driver() as driver:
+        previous_db_name = get_alias_target(driver, alias)
+        if is_version_database(previous_db_name, alias, version):
+            if not force:
+                print(f'The {alias} alias already serves the {version} version of the data')
+                return previous_db_name
+            # The database is created or replaced by the import, which must not replace the served database
+            db_name = reimport_database_name(alias, version, list_version_databases(driver, alias))
+        print(f'====> Importing the {version} version of the data in the {db_name} database')
+        import_himalayas_database(db_name=db_name, import_batch_size=import_batch_size, test=test,
+                                  test_size=test_size, validate=validate, profile_dir=profile_dir,
+                                  data=data)
+        print(f'====> Checking the {db_name} database')
+        failed_checks_df = check_database(driver, db_name)
+        if not failed_checks_df.empty:
+            print(failed_checks_df.to_string(index=False))
+            print(f'Error checking the {db_name} database, the {alias} alias still serves {previous_db_name}')
+            raise RuntimeError(f'{len(failed_checks_df)} checks failed on the {db_name} database')
+        switch_alias(driver, alias, db_name)
+        drop_old_versions(driver, alias, keep=[db_name, previous_db_name][:KEEP_VERSIONS])
+    return db_name
+
+
+def rollback(alias: str = None) -> str:
+    """
+    Switch the alias back to the most recent other imported version
+    :param alias: The name of the alias, by default the NEO4J_DATABASE_NAME environment variable
+    :return: The name of the database served by the alias
+    """
+    alias = alias or get_neo4j_settings().database_name
+    with get_neo4j_driver() as driver:
+        current_db_name = get_alias_target(driver, alias)
+        # The databases of the imports which did not complete have no import date and can not be served
+        versions = {db_name: get_imported_at(driver, db_name) for db_name in list_version_databases(driver, alias)
+                    if db_name != current_db_name}
+        versions = {db_name: imported_at for db_name, imported_at in versions.items() if imported_at}
+        if not versions:
+            print(f'Error rolling back the {alias} alias, there is no other imported version')
+            raise RuntimeError(f'No version to roll back the {alias} alias to')
+        db_name = max(versions, key=versions.get)
+        switch_alias(driver, alias, db_name)
+    return db_name
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description="Import the Himalayan Database data into a new versioned Neo4j "
+                                                     "database and switch the alias served to the clients to it")
+    arg_parser.add_argument('--alias', help="The name of the alias, by default the NEO4J_DATABASE_NAME environment "
+                                            "variable")
+    arg_parser.add_argument('--rollback', action='store_true',
+                            help="Switch the alias back to the previous version instead of importing the data")
+    arg_parser.add_argument('--force', action='store_true',
+                            help="Import the data again even if the alias already serves its version, in a new "
+                                 "database")
+    arg_parser.add_argument('--batch-size', type=int, default=50, help="The number of records to import in a batch")
+    arg_parser.add_argument('--test', action='store_true',
+                            help="Only import the first expeditions and their related data")
+    arg_parser.add_argument('--test-size', type=int, default=100,
+                            help="The number of expeditions to import in test mode")
+    arg_parser.add_argument('--skip-validation', action='store_true',
+                            help="Do not validate the data before the import")
+    arg_parser.add_argument('--profile-dir', type=Path,
+                            help="Profile a batch of each import query and save the query plan reports in this folder")
+    args = arg_parser.parse_args()
+    if args.rollback:
+        rollback(alias=args.alias)
+    else:
+        import_blue_green(alias=args.alias, import_batch_size=args.batch_size, test=args.test,
+                          test_size=args.test_size, validate=not args.skip_validation, force=args.force,
+                          profile_dir=args.profile_dir)
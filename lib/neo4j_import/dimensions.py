@@ -0,0 +1,114 @@
+import pandas as pd
+
+from typing import Dict
+
+
+# The peaks at the border of two districts which are also at the border of two provinces. Only one province is given
+# for these peaks, so the peaks and their districts are not linked to the province, as it could be the wrong one and
+# create districts which are in two provinces
+BORDER_DISTRICTS = ['Darchula/Bajhang', 'Dolpa/Mustang', 'Dolpa/Myagdi', 'Dolpa/Rukum', 'Dolakha/Solukhumbu',
+                    'Gorkha/Dhading', 'Myagdi/Rukum', 'Ramechhap/Solukhumbu', 'Humla/Bajhang']
+# The district codes of the peaks at the border with China and India
+FOREIGN_DISTRICTS = {'NC': 'China', 'NI': 'India'}
+
+
+def _distinct(values: pd.Series, column: str = 'NAME') -> pd.DataFrame:
+    """
+    Get the distinct non-empty values of a column
+    :param values: The column values
+    :param column: The name of the column of the returned dataframe
+    :return: A dataframe of the distinct values, in the order of their first appearance
+    """
+    values = values.dropna()
+    values = values[values.astype(str) != '']
+    return pd.DataFrame({column: values.drop_duplicates().tolist()})
+
+
+def compute_expedition_dimensions(exped_df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Extract the distinct Peak, Agency, Country and Route nodes referenced by the expeditions
+    :param exped_df: The expeditions dataframe, with the successful routes without a name set to "Unknown"
+    :return: A dictionary of the peaks (PEAKID), agencies and countries (NAME) and routes (NAME, PEAKID) dataframes by
+    name of the parameter of the dimensions import query
+    """
+    # The routes names include the peak ID to differentiate the SW RIDGE of mountain A from the SW RIDGE of mountain B
+    routes_df = pd.concat([exped_df[[f'ROUTE{i}', 'PEAKID']].set_axis(['ROUTE', 'PEAKID'], axis=1)
+                           for i in range(1, 5)])
+    routes_df = routes_df[routes_df['ROUTE'].notna() & (routes_df['ROUTE'] != '')]
+    routes_df = pd.DataFrame({'NAME': routes_df['ROUTE'] + ' (' + routes_df['PEAKID'] + ')',
+                              'PEAKID': routes_df['PEAKID']}).drop_duplicates(ignore_index=True)
+    return {
+        'peaks': _distinct(exped_df['PEAKID'], 'PEAKID'),
+        'agencies': _distinct(exped_df['AGENCY']),
+        'countries': _distinct(exped_df['HOST_DESC']),
+        'routes': routes_df
+    }
+
+
+def compute_peak_locations(peaks_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Split the districts of the peaks. The peaks are only located if they have a province. The DISTRICT column lists
+    the districts of the peaks at the border of several districts separated by "/", where the NC and NI codes are the
+    Chinese and Indian borders
+    :param peaks_df: The peaks dataframe
+    :return: A dataframe with one row per peak and district with the PEAKID, DISTRICT, PROVINCE, LINKED (if the peak is
+    in the district and the district in the province) and COUNTRY columns
+    """
+    locations_df = peaks_df[['PEAKID', 'DISTRICT', 'PROVINCE']].fillna('')
+    locations_df = locations_df[(locations_df['PROVINCE'] != '') & (locations_df['DISTRICT'] != '')].copy()
+    locations_df['PROVINCE'] = locations_df['PROVINCE'].str.strip()
+    multiple_districts = locations_df['DISTRICT'].str.contains('/', regex=False)
+    # The peaks in multiple districts are in Nepal, China or India. The peaks in a single district have no country
+    locations_df['PART'] = locations_df['DISTRICT'].where(~multiple_districts, locations_df['DISTRICT'].str.split('/'))
+    locations_df = locations_df.explode('PART', ignore_index=True)
+    multiple_districts = locations_df['DISTRICT'].str.contains('/', regex=False)
+    foreign_district = multiple_districts & locations_df['PART'].isin(FOREIGN_DISTRICTS.keys())
+    locations_df['COUNTRY'] = None
+    locations_df.loc[multiple_districts, 'COUNTRY'] = locations_df.loc[multiple_districts, 'PART'] \
+        .map(FOREIGN_DISTRICTS).fillna('Nepal')
+    locations_df['LINKED'] = ~foreign_district & ~locations_df['DISTRICT'].isin(BORDER_DISTRICTS)
+    # The NC and NI codes of the border districts are not districts
+    locations_df['DISTRICT'] = locations_df['PART'].str.strip().where(~foreign_district)
+    return locations_df[['PEAKID', 'DISTRICT', 'PROVINCE', 'LINKED', 'COUNTRY']]
+
+
+def compute_peak_dimensions(peaks_df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Extract the distinct Peak, Range, Province, District and Country nodes of the peaks, and the relationships between
+    the districts and the provinces
+    :param peaks_df: The peaks dataframe
+    :return: A dictionary of the peaks (PEAKID), ranges, provinces, districts and countries (NAME) and
+    district_provinces (NAME, PROVINCE) dataframes by name of the parameter of the dimensions import query
+    """
+    locations_df = compute_peak_locations(peaks_df)
+    linked_df = locations_df[locations_df['LINKED']]
+    provinces = peaks_df['PROVINCE'].fillna('').str.strip()
+    return {
+        'peaks': _distinct(peaks_df['PEAKID'], 'PEAKID'),
+        'ranges': _distinct(peaks_df['RANGE']),
+        'provinces': _distinct(provinces),
+        'districts': _distinct(locations_df['DISTRICT']),
+        'district_provinces': linked_df[['DISTRICT', 'PROVINCE']].set_axis(['NAME', 'PROVINCE'], axis=1)
+                                                                .drop_duplicates(ignore_index=True),
+        'countries': _distinct(locations_df['COUNTRY'])
+    }
+
+
+def add_peak_locations(peaks_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the lists of the districts and countries each peak is linked to, which are attached to the existing District
+    and Country nodes by the peaks import
+    :param peaks_df: The peaks dataframe
+    :return: The peaks dataframe with the DISTRICTS and COUNTRIES list columns
+    """
+    locations_df = compute_peak_locations(peaks_df)
+    districts = locations_df[locations_df['LINKED']].groupby('PEAKID')['DISTRICT'].agg(lambda x: list(dict.fromkeys(x)))
+    countries = locations_df.dropna(subset=['COUNTRY']).groupby('PEAKID')['COUNTRY'] \
+        .agg(lambda x: list(dict.fromkeys(x)))
+    located_df = peaks_df.copy()
+    located_df['DISTRICTS'] = located_df['PEAKID'].map(districts)
+    located_df['COUNTRIES'] = located_df['PEAKID'].map(countries)
+    # The peaks without district or country have empty lists
+    for column in ['DISTRICTS', 'COUNTRIES']:
+        located_df[column] = located_df[column].apply(lambda x: x if isinstance(x, list) else [])
+    return located_df
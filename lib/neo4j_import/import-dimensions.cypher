@@ -0,0 +1,25 @@
+// Create the nodes shared by many expeditions and peaks once, before the expeditions and peaks are imported. Each
+// statement imports the distinct values of a dimension, so the import of the expeditions and peaks rows only matches
+// these nodes and creates relationships, instead of merging the same few nodes for every row.
+// The statements are separated by semicolons and each one is run with the dimension named by its UNWIND parameter
+UNWIND $peaks AS row
+MERGE (:Peak {peakId: row.PEAKID});
+UNWIND $agencies AS row
+MERGE (:Agency {name: row.NAME});
+UNWIND $countries AS row
+MERGE (:Country {name: row.NAME});
+// The Route nodes are on a single peak, the peak ID is part of their name
+UNWIND $routes AS row
+MATCH (p:Peak {peakId: row.PEAKID})
+MERGE (r:Route {name: row.NAME})
+MERGE (r)-[:ON_PEAK]->(p);
+UNWIND $ranges AS row
+MERGE (:Range {name: row.NAME});
+UNWIND $provinces AS row
+MERGE (:Province {name: row.NAME});
+UNWIND $districts AS row
+MERGE (:District {name: row.NAME});
+UNWIND $district_provinces AS row
+MATCH (d:District {name: row.NAME})
+MATCH (p:Province {name: row.PROVINCE})
+MERGE (d)-[:IN_PROVINCE]->(p);
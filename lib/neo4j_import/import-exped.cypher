@@ -1,4 +1,6 @@
 UNWIND $expeditions AS row
+// Match the Peak node, created with the expeditions dimensions
+MATCH (p:Peak {peakId: row.PEAKID})
 // Create the Expedition nodes with its features
 MERGE (e:Expedition {
     expeditionId: row.EXPID,
@@ -46,9 +48,6 @@ ON CREATE
         e.achievements = CASE WHEN row.ACHIEVEMENTS = "" THEN null ELSE row.ACHIEVEMENTS END,
         e.standardRoute = CASE WHEN row.STDRTE = "" THEN null ELSE toBoolean(row.STDRTE) END
 
-// Create the Peak Nodes. It should be merged later with data from the peak.csv data
-MERGE (p:Peak {peakId: row.PEAKID})
-
 WITH e, p, row
 // Add a CommercialExpedition label to expedition nodes with the COMRTE property set to TRUE and the year is after 1987
 FOREACH(ignoreMe IN CASE WHEN (NOT row.COMRTE = "") AND toBoolean(row.COMRTE) AND (e.year > 1987) THEN [1] ELSE [] END |
@@ -63,54 +62,34 @@ FOREACH(ignoreMe IN CASE WHEN (row.COMRTE = "") AND (e.year > 1987) AND (NOT row
 // Commercial expeditions started in 1988, so for all expeditions before that we set them as non-commercial by default
 FOREACH(ignoreMe IN CASE WHEN (e.year < 1988) THEN [1] ELSE [] END |
     SET e:NonCommercialExpedition)
-// Create the Agencies
-FOREACH(ignoreMe IN CASE WHEN NOT row.AGENCY = "" THEN [1] ELSE [] END |
-    MERGE (a:Agency {name: row.AGENCY})
-    MERGE (e)-[:ORGANIZED_BY]->(a))
-// Create the HOSTED_IN relationships
-FOREACH(ignoreMe IN CASE WHEN NOT row.HOST_DESC = "" THEN [1] ELSE [] END |
-    MERGE (c:Country {name: row.HOST_DESC})
-    MERGE (e)-[:HOSTED_IN]->(c))
-// If the ROUTE1 is not null and it was climbed,
-// 1- We create a Route node. It has the PEAKID in the feature (not just a relation) to differentiate
-// the SW RIDGE of mountain A from the SW RIDGE of mountain B.
-// 2- As the climb was successful, the relation is 'CLIMBED' and the ascent number is attached to the relation.
-// 3- The Route is linked to the Peak it is on.
+// Link the expedition to its Agency and host Country, created with the expeditions dimensions
+CALL {
+    WITH e, row
+    WITH e, row WHERE NOT row.AGENCY = ""
+    MATCH (a:Agency {name: row.AGENCY})
+    MERGE (e)-[:ORGANIZED_BY]->(a)
+}
+CALL {
+    WITH e, row
+    WITH e, row WHERE NOT row.HOST_DESC = ""
+    MATCH (c:Country {name: row.HOST_DESC})
+    MERGE (e)-[:HOSTED_IN]->(c)
+}
+// For each of the 4 routes of the expedition which is not null, we match the Route node, created with the expeditions
+// dimensions and linked to the Peak it is on. The Route name has the PEAKID in the feature (not just a relation) to
+// differentiate the SW RIDGE of mountain A from the SW RIDGE of mountain B.
+// - If the route was climbed, the relation is 'CLIMBED' and the ascent number is attached to the relation.
 // As a result, the nodes and relations state: "this is the Xth ascent of this route which is on that Peak"
-FOREACH(ignoreMe IN CASE WHEN (NOT row.ROUTE1 = "") AND row.SUCCESS1 THEN [1] ELSE [] END |
-    MERGE (r1:Route {name:row.ROUTE1 + " (" + row.PEAKID + ")"})
-    MERGE (e)-[:CLIMBED{ascent:apoc.text.replace(coalesce(row.ASCENT1, 'Unknown'),'st.*|nd.*|rd.*|th.*', '')}]->(r1)
-    MERGE (r1)-[:ON_PEAK]->(p))
-// If the ascent of the Route was not successful, the relation is then ATTEMPTED
-// In this case the relation has no "ascent" number since it has not been climbed.
-FOREACH(ignoreMe IN CASE WHEN (NOT row.ROUTE1 = "") AND (NOT row.SUCCESS1) THEN [1] ELSE [] END |
-    MERGE (r1:Route {name:row.ROUTE1 + " (" + row.PEAKID + ")"})
-    MERGE (e)-[:ATTEMPTED]->(r1)
-    MERGE (r1)-[:ON_PEAK]->(p))
-// Same as above for the 2nd route of the expedition
-FOREACH(ignoreMe IN CASE WHEN (NOT row.ROUTE2 = "") AND row.SUCCESS2 THEN [1] ELSE [] END |
-    MERGE (r2:Route {name:row.ROUTE2 + " (" + row.PEAKID + ")"})
-    MERGE (e)-[:CLIMBED{ascent:apoc.text.replace(coalesce(row.ASCENT2, 'Unknown'),'st.*|nd.*|rd.*|th.*', '')}]->(r2)
-    MERGE (r2)-[:ON_PEAK]->(p))
-FOREACH(ignoreMe IN CASE WHEN (NOT row.ROUTE2 = "") AND (NOT row.SUCCESS2) THEN [1] ELSE [] END |
-    MERGE (r2:Route {name:row.ROUTE2 + " (" + row.PEAKID + ")"})
-    MERGE (e)-[:ATTEMPTED]->(r2)
-    MERGE (r2)-[:ON_PEAK]->(p))
-// Same as above for the 3rd route of the expedition
-FOREACH(ignoreMe IN CASE WHEN (NOT row.ROUTE3 = "") AND row.SUCCESS3 THEN [1] ELSE [] END |
-    MERGE (r3:Route {name:row.ROUTE3 + " (" + row.PEAKID + ")"})
-    MERGE (e)-[:CLIMBED{ascent:apoc.text.replace(coalesce(row.ASCENT3, 'Unknown'),'st.*|nd.*|rd.*|th.*', '')}]->(r3)
-    MERGE (r3)-[:ON_PEAK]->(p))
-FOREACH(ignoreMe IN CASE WHEN (NOT row.ROUTE3 = "") AND (NOT row.SUCCESS3) THEN [1] ELSE [] END |
-    MERGE (r3:Route {name:row.ROUTE3 + " (" + row.PEAKID + ")"})
-    MERGE (e)-[:ATTEMPTED]->(r3)
-    MERGE (r3)-[:ON_PEAK]->(p))
-// Same as above for the 4th route of the expedition
-FOREACH(ignoreMe IN CASE WHEN (NOT row.ROUTE4 = "") AND row.SUCCESS4 THEN [1] ELSE [] END |
-    MERGE (r4:Route {name:row.ROUTE4 + " (" + row.PEAKID + ")"})
-    MERGE (e)-[:CLIMBED{ascent:apoc.text.replace(coalesce(row.ASCENT4, 'Unknown'),'st.*|nd.*|rd.*|th.*', '')}]->(r4)
-    MERGE (r4)-[:ON_PEAK]->(p))
-FOREACH(ignoreMe IN CASE WHEN (NOT row.ROUTE4 = "") AND (NOT row.SUCCESS4) THEN [1] ELSE [] END |
-    MERGE (r4:Route {name:row.ROUTE4 + " (" + row.PEAKID + ")"})
-    MERGE (e)-[:ATTEMPTED]->(r4)
-    MERGE (r4)-[:ON_PEAK]->(p))
+// - If the ascent of the Route was not successful, the relation is then ATTEMPTED. In this case the relation has no
+// "ascent" number since it has not been climbed.
+CALL {
+    WITH e, row
+    UNWIND [[row.ROUTE1, row.SUCCESS1, row.ASCENT1], [row.ROUTE2, row.SUCCESS2, row.ASCENT2],
+            [row.ROUTE3, row.SUCCESS3, row.ASCENT3], [row.ROUTE4, row.SUCCESS4, row.ASCENT4]] AS route
+    WITH e, row, route WHERE NOT route[0] = ""
+    MATCH (r:Route {name: route[0] + " (" + row.PEAKID + ")"})
+    FOREACH(ignoreMe IN CASE WHEN route[1] THEN [1] ELSE [] END |
+        MERGE (e)-[:CLIMBED{ascent:apoc.text.replace(coalesce(route[2], 'Unknown'),'st.*|nd.*|rd.*|th.*', '')}]->(r))
+    FOREACH(ignoreMe IN CASE WHEN NOT route[1] THEN [1] ELSE [] END |
+        MERGE (e)-[:ATTEMPTED]->(r))
+}
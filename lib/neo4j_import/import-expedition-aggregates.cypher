@@ -0,0 +1,8 @@
+UNWIND $expeditions AS row
+// Set the summary metrics precomputed during the import on the existing Expedition nodes
+MATCH (e:Expedition {expeditionId: row.EXPID, year: row.YEAR})
+SET e.nbParticipants = row.NB_PARTICIPANTS,
+    e.nbSummiters = row.NB_SUMMITERS,
+    e.nbDeaths = row.NB_DEATHS,
+    e.summitRate = row.SUMMIT_RATE,
+    e.deathRate = row.DEATH_RATE
@@ -0,0 +1,10 @@
+UNWIND $members AS row
+// Set the summary metrics precomputed during the import on the existing Member nodes
+MATCH (m:Member {personId: row.PERSID})
+SET m.nbExpeditions = row.NB_EXPEDITIONS,
+    m.nbSummits = row.NB_SUMMITS,
+    m.nb8000mSummits = row.NB_8000M_SUMMITS,
+    m.nb8000mPeaks = row.NB_8000M_PEAKS,
+    m.firstExpeditionYear = row.FIRST_EXPEDITION_YEAR,
+    m.lastExpeditionYear = row.LAST_EXPEDITION_YEAR,
+    m.firstSummitYear = CASE WHEN row.FIRST_SUMMIT_YEAR = "" THEN null ELSE toInteger(row.FIRST_SUMMIT_YEAR) END
@@ -0,0 +1,9 @@
+UNWIND $peaks AS row
+// Set the summary metrics precomputed during the import on the existing Peak nodes
+MATCH (p:Peak {peakId: row.PEAKID})
+SET p.nbExpeditions = row.NB_EXPEDITIONS,
+    p.nbSuccessfulExpeditions = row.NB_SUCCESSFUL_EXPEDITIONS,
+    p.nbSummits = row.NB_SUMMITS,
+    p.nbDeaths = row.NB_DEATHS,
+    p.deathRate = row.DEATH_RATE,
+    p.firstSummitYear = CASE WHEN row.FIRST_SUMMIT_YEAR = "" THEN null ELSE toInteger(row.FIRST_SUMMIT_YEAR) END
@@ -1,12 +1,19 @@
 UNWIND $peaks AS row
-// Update the Peaks nodes with its features
-MERGE (peak:Peak {peakId: row.PEAKID})
+// Update the Peaks nodes, created with the peaks dimensions, with its features
+MATCH (peak:Peak {peakId: row.PEAKID})
+// The coordinates of the peak, null if they are missing (empty or NaN)
+WITH peak, row,
+     CASE WHEN row.LAT = "" OR isNaN(toFloat(row.LAT)) THEN null ELSE toFloat(row.LAT) END AS latitude,
+     CASE WHEN row.LON = "" OR isNaN(toFloat(row.LON)) THEN null ELSE toFloat(row.LON) END AS longitude
 SET peak.name = row.PKNAME,
     peak.alternateNames = CASE WHEN row.PKNAMES2 = "" THEN null ELSE row.PKNAMES2 END,
     peak.heightMeters = row.HEIGHTM,
     peak.heightFeet = row.HEIGHTF,
-    peak.latitude = CASE WHEN row.LAT = "" THEN null ELSE toFloat(row.LAT) END,
-    peak.longitude = CASE WHEN row.LON = "" THEN null ELSE toFloat(row.LON) END,
+    peak.latitude = latitude,
+    peak.longitude = longitude,
+    // The WGS-84 location of the peak, indexed by the peak_location point index for the geographic lookups
+    peak.location = CASE WHEN latitude IS NULL OR longitude IS NULL THEN null
+                         ELSE point({latitude: latitude, longitude: longitude}) END,
     peak.opened = row.OPEN,
     peak.unlisted = row.UNLISTED,
     peak.trekking = row.TREKKING,
@@ -18,55 +25,29 @@ SET peak.name = row.PKNAME,
     peak.photoMemo = CASE WHEN row.PHOTOMEMO = "" THEN null ELSE row.PHOTOMEMO END,
     peak.nepaleseFees = CASE WHEN row.NEPALESE_FEES = "" THEN null ELSE row.NEPALESE_FEES END,
     peak.foreignerFees = CASE WHEN row.FOREIGNER_FEES = "" THEN null ELSE row.FOREIGNER_FEES END
-// Create Provinces, Districts and Ranges and their relationships
+// Link the peak to its Districts, Countries and Range. The Province, District, Range and Country nodes and the
+// relationships between the districts and the provinces are created with the peaks dimensions, and the DISTRICTS and
+// COUNTRIES lists of the peak are computed with them:
+// - The peaks are only located in districts and countries if they have a province
+// - Peaks in multiple districts (separated by "/") are in Nepal, China (NC district) or India (NI district)
+// - Peaks at the border of two districts which is also the border of two provinces are not linked to the districts,
+// as only one province is given, which could be the wrong one for one of the districts
 WITH peak, row
-// Create the Province, the peak is in
-FOREACH(ignoreMe IN CASE WHEN NOT row.PROVINCE = "" THEN [1] ELSE [] END |
-    MERGE (province:Province {name: trim(row.PROVINCE)})
-    // Create the District, the peak is in if there is one
-    FOREACH(ignoreMe IN CASE WHEN NOT row.DISTRICT = "" THEN [1] ELSE [] END |
-        // We check if there is a '/' in the district name, if so we create multiple nodes, one for each district
-        FOREACH(ignoreMe IN CASE WHEN NOT row.DISTRICT CONTAINS "/" THEN [1] ELSE [] END |
-            MERGE (d:District {name: trim(row.DISTRICT)})
-            // Create the Peak->IN_DISTRICT->District->IN_PROVINCE->Province relationships
-            MERGE (d)-[:IN_PROVINCE]->(province)
-            MERGE (peak)-[:IN_DISTRICT]->(d))
-        FOREACH(ignoreMe IN CASE WHEN row.DISTRICT CONTAINS "/" THEN [1] ELSE [] END |
-            FOREACH(district in split(row.DISTRICT, "/") |
-                // If the district is NC or NI, we don't create a node for it
-                FOREACH(ignoreMe IN CASE WHEN (NOT district = "NC") AND (NOT district = "NI") THEN [1] ELSE [] END |
-                    MERGE (d:District {name: trim(district)})
-                    // Create a relationship between the Peak and Nepal Country
-                    MERGE (c:Country {name: "Nepal"})
-                    MERGE (peak)-[:IN_COUNTRY]->(c)
-                    // Peaks can be at the border of two districts which is also the border of two provinces
-                    // unfortunately in this case only one province is given, so in this case we do not create a
-                    // relationship between the district and the province because it can create a wrong relationship
-                    // and create districts which will be in two provinces
-                    FOREACH(ignoreMe IN CASE WHEN NOT row.DISTRICT IN ["Darchula/Bajhang", "Dolpa/Mustang", "Dolpa/Myagdi",
-                             "Dolpa/Rukum", "Dolakha/Solukhumbu", "Gorkha/Dhading", "Myagdi/Rukum", "Ramechhap/Solukhumbu",
-                             "Humla/Bajhang"] THEN [1] ELSE [] END |
-                        // Create the Peak->IN_DISTRICT->District->IN_PROVINCE->Province relationships
-                        MERGE (d)-[:IN_PROVINCE]->(province)
-                        MERGE (peak)-[:IN_DISTRICT]->(d))
-                    // For the "Rukum East/Rukum" district, we create the relation between the first district and the province
-                    // because there is no other peak with this district alone, so if we don't create this relation, the
-                    // district will not be in any province
-                    FOREACH(ignoreMe IN CASE WHEN row.DISTRICT = "Rukum East/Rukum" AND district = "Rukum East" THEN [1] ELSE [] END |
-                        // Create the Peak->IN_DISTRICT->District->IN_PROVINCE->Province relationships
-                        MERGE (d)-[:IN_PROVINCE]->(province)
-                        MERGE (peak)-[:IN_DISTRICT]->(d)))
-                // Create the Peak relationship with the China country
-                FOREACH(ignoreMe IN CASE WHEN (district = "NC")THEN [1] ELSE [] END |
-                    MERGE (c:Country {name: "China"})
-                    MERGE (peak)-[:IN_COUNTRY]->(c))
-                // Create the Peak relationship with the India country
-                FOREACH(ignoreMe IN CASE WHEN (district = "NI")THEN [1] ELSE [] END |
-                    MERGE (c:Country {name: "India"})
-                    MERGE (peak)-[:IN_COUNTRY]->(c))
-                ))))
-
-// Create the Range, the peak is in
-FOREACH(ignoreMe IN CASE WHEN NOT row.RANGE = "" THEN [1] ELSE [] END |
-    MERGE (r:Range {name: row.RANGE})
-    MERGE (peak)-[:IN_RANGE]->(r))
\ No newline at end of file
+CALL {
+    WITH peak, row
+    UNWIND row.DISTRICTS AS district
+    MATCH (d:District {name: district})
+    MERGE (peak)-[:IN_DISTRICT]->(d)
+}
+CALL {
+    WITH peak, row
+    UNWIND row.COUNTRIES AS country
+    MATCH (c:Country {name: country})
+    MERGE (peak)-[:IN_COUNTRY]->(c)
+}
+CALL {
+    WITH peak, row
+    WITH peak, row WHERE NOT row.RANGE = ""
+    MATCH (r:Range {name: row.RANGE})
+    MERGE (peak)-[:IN_RANGE]->(r)
+}
@@ -0,0 +1,76 @@
+import json
+import pandas as pd
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# The operators which read all the nodes, or all the nodes of a label, instead of using an index
+SCAN_OPERATORS = {'AllNodesScan', 'NodeByLabelScan'}
+# The operator materializing all the rows of the previous operators before the next ones, to protect the reads from the
+# writes of the same query. All the rows of the batch are then held in memory
+EAGER_OPERATORS = {'Eager'}
+PROFILE_COLUMNS = ['DEPTH', 'OPERATOR', 'DETAILS', 'ESTIMATED_ROWS', 'ROWS', 'DB_HITS']
+
+
+def flatten_profile(profile: Dict, depth: int = 0) -> List[Dict]:
+    """
+    Flatten a profiled query plan into the list of its operators, from the root to the leaves
+    :param profile: The profiled plan returned in the result summary of a PROFILE query
+    :param depth: The depth of the operator in the plan
+    :return: A list of dictionaries with the DEPTH, OPERATOR, DETAILS, ESTIMATED_ROWS, ROWS and DB_HITS of the operators
+    """
+    args = profile.get('args', {})
+    # The operator types are suffixed by the runtime name, e.g. "NodeByLabelScan@neo4j"
+    operators = [{'DEPTH': depth, 'OPERATOR': profile.get('operatorType', '').split('@')[0],
+                  'DETAILS': args.get('Details', ''), 'ESTIMATED_ROWS': args.get('EstimatedRows'),
+                  'ROWS': profile.get('rows', args.get('Rows')), 'DB_HITS': profile.get('dbHits', args.get('DbHits'))}]
+    for child in profile.get('children', []):
+        operators += flatten_profile(child, depth + 1)
+    return operators
+
+
+def summarize_profile(operators_df: pd.DataFrame) -> Dict:
+    """
+    Summarize the operators of a profiled query plan
+    :param operators_df: The dataframe of the operators returned by flatten_profile
+    :return: A dictionary with the total DB_HITS, the number of EAGER operators and the SCANS operators reading all the
+    nodes or all the nodes of a label
+    """
+    return {'DB_HITS': int(operators_df['DB_HITS'].fillna(0).sum()),
+            'EAGER': int(operators_df['OPERATOR'].isin(EAGER_OPERATORS).sum()),
+            'SCANS': operators_df.loc[operators_df['OPERATOR'].isin(SCAN_OPERATORS), 'DETAILS'].tolist()}
+
+
+def save_profile_report(profile: Optional[Dict], query_name: str, report_dir: Path, batch_index: int,
+                        batch_rows: int) -> Optional[Path]:
+    """
+    Save the report of a profiled import batch: a summary and the table of the plan operators with their estimated and
+    actual rows and their database hits, and the raw profiled plan in a JSON file
+    :param profile: The profiled plan returned in the result summary of a PROFILE query
+    :param query_name: The name of the import query, the name of its file
+    :param report_dir: The folder of the reports
+    :param batch_index: The index of the profiled batch
+    :param batch_rows: The number of rows of the profiled batch
+    :return: The path of the report, or None if there is no profile
+    """
+    if not profile:
+        return None
+    report_dir.mkdir(parents=True, exist_ok=True)
+    operators_df = pd.DataFrame(flatten_profile(profile), columns=PROFILE_COLUMNS)
+    summary = summarize_profile(operators_df)
+    # Indent the operators by their depth in the plan
+    operators_df['OPERATOR'] = operators_df['DEPTH'].apply(lambda depth: '  ' * depth) + operators_df['OPERATOR']
+    report = [f'Query: {query_name}',
+              f'Profiled batch: {batch_index} ({batch_rows} rows)',
+              f'Database hits: {summary["DB_HITS"]}',
+              f'Eager operators: {summary["EAGER"]}',
+              f'Label scans: {", ".join(summary["SCANS"]) or "none"}',
+              '',
+              operators_df.drop(columns=['DEPTH']).to_string(index=False)]
+    report_file = report_dir / f'{query_name}.txt'
+    report_file.write_text('\n'.join(report) + '\n', encoding='utf-8')
+    report_file.with_suffix('.json').write_text(json.dumps(profile, indent=2, default=str), encoding='utf-8')
+    print(f'Query {query_name} profiled: {summary["DB_HITS"]} database hits, {summary["EAGER"]} eager operators, '
+          f'{len(summary["SCANS"])} label scans')
+    return report_file
@@ -0,0 +1,151 @@
+import re
+import argparse
+import pandas as pd
+
+from pathlib import Path
+from typing import Dict, List, Set, Tuple, TYPE_CHECKING
+
+from lib.neo4j_import.neo4j_import import INDEXES
+from lib.neo4j_import.settings import get_neo4j_settings, get_neo4j_driver
+from lib.neo4j_import.benchmark.query_benchmark import load_query_set
+
+if TYPE_CHECKING:
+    import neo4j
+
+
+# The plan operators scanning all the nodes of a label or all the relationships of a type
+NODE_SCAN_OPERATORS = {'NodeByLabelScan'}
+RELATIONSHIP_SCAN_OPERATORS = {'DirectedRelationshipTypeScan', 'UndirectedRelationshipTypeScan'}
+# The variable and label of the scan operators details, e.g. "e:Expedition" or "(m)-[r:LED]->(e)"
+NODE_SCAN_PATTERN = re.compile(r'^`?(\w+)`?:`?(\w+)`?')
+RELATIONSHIP_SCAN_PATTERN = re.compile(r'\[`?(\w+)`?:`?(\w+)`?\]')
+# The label or type and property of the index creation queries
+INDEX_PATTERN = re.compile(r'FOR\s+(?:\(\w*:(\w+)\)|\(\)-\[\w*:(\w+)\]-\(\))\s+ON\s+\(\w+\.(\w+)\)', re.IGNORECASE)
+
+
+def load_workload(workload_file: Path) -> Dict[str, str]:
+    """
+    Load the queries of a workload file, separated by semicolons
+    :param workload_file: The Cypher workload file
+    :return: A dictionary of the queries by name, the name of each query is the file name and its position in the file
+    """
+    try:
+        workload = workload_file.read_text(encoding='utf-8')
+    except Exception as e:
+        print(f'Error reading the Neo4j Cypher workload file {workload_file}', e)
+        raise e
+    queries = {}
+    for i, query in enumerate(workload.split(';')):
+        # Skip the empty statements and the comments after the last query
+        if any(line.strip() and not line.strip().startswith('//') for line in query.splitlines()):
+            queries[f'{workload_file.stem}:{i + 1}'] = query.strip()
+    return queries
+
+
+def declared_indexes(indexes: List[str] = None) -> Set[Tuple[str, str]]:
+    """
+    Get the labels or relationship types and properties of the declared indexes
+    :param indexes: The list of index creation queries, by default the INDEXES created by the import
+    :return: The set of (label or type, property) tuples
+    """
+    return {(label or rel_type, prop) for label, rel_type, prop in INDEX_PATTERN.findall(' '.join(indexes or INDEXES))}
+
+
+def find_label_scans(plan: Dict, filters: List[str] = None) -> List[Dict]:
+    """
+    Find the label and relationship type scans of a query plan, and the properties of the scanned variable filtered
+    by the Filter operators above the scan. An index on these properties would replace the scan and the filter by an
+    index seek.
+    :param plan: The query plan returned in the result summary of an EXPLAIN query
+    :param filters: The details of the Filter operators above this plan operator
+    :return: A list of dictionaries with the operator, variable, label, estimated rows and filtered properties of the
+    scans
+    """
+    filters = filters or []
+    # The operator types are suffixed by the runtime name, e.g. "NodeByLabelScan@neo4j"
+    operator = plan.get('operatorType', '').split('@')[0]
+    details = plan.get('args', {}).get('Details', '')
+    scans = []
+    if operator == 'Filter':
+        filters = filters + [details]
+    elif operator in NODE_SCAN_OPERATORS | RELATIONSHIP_SCAN_OPERATORS:
+        pattern = NODE_SCAN_PATTERN if operator in NODE_SCAN_OPERATORS else RELATIONSHIP_SCAN_PATTERN
+        match = pattern.search(details)
+        if match:
+            variable, label = match.groups()
+            properties = sorted({prop for details in filters
+                                 for prop in re.findall(rf'\b{variable}\.(\w+)', details)})
+            scans.append({'OPERATOR': operator, 'VARIABLE': variable, 'LABEL': label,
+                          'ESTIMATED_ROWS': plan.get('args', {}).get('EstimatedRows'),
+                          'FILTERED_PROPERTIES': properties})
+    for child in plan.get('children', []):
+        scans += find_label_scans(child, filters)
+    return scans
+
+
+def suggest_index(operator: str, label: str, prop: str) -> str:
+    """
+    Get the index creation query of a label or relationship type property
+    :param operator: The scan operator
+    :param label: The scanned label or relationship type
+    :param prop: The filtered property
+    :return: The index creation query
+    """
+    if operator in RELATIONSHIP_SCAN_OPERATORS:
+        return f'CREATE INDEX IF NOT EXISTS FOR ()-[r:{label}]-() ON (r.{prop});'
+    return f'CREATE INDEX IF NOT EXISTS FOR (n:{label}) ON (n.{prop});'
+
+
+def advise_indexes(driver: 'neo4j.Driver', db_name: str, queries: Dict[str, str]) -> pd.DataFrame:
+    """
+    EXPLAIN the queries of a workload and report their label and relationship type scans
+    :param driver: The Neo4j driver
+    :param db_name: The name of the Neo4j database
+    :param queries: The dictionary of the queries by name
+    :return: A dataframe with one row per scan and filtered property with the QUERY, OPERATOR, LABEL, PROPERTY,
+    ESTIMATED_ROWS, SUGGESTED_INDEX and DECLARED columns. The scans without a property filter have no suggested index,
+    as an index would not avoid reading all the nodes of the label
+    """
+    indexes = declared_indexes()
+    rows = []
+    with driver.session(database=db_name) as session:
+        for name, query in queries.items():
+            plan = session.run(f'EXPLAIN {query}').consume().plan
+            for scan in find_label_scans(plan):
+                for prop in scan['FILTERED_PROPERTIES'] or [None]:
+                    rows.append({'QUERY': name, 'OPERATOR': scan['OPERATOR'], 'LABEL': scan['LABEL'],
+                                 'PROPERTY': prop, 'ESTIMATED_ROWS': scan['ESTIMATED_ROWS'],
+                                 'SUGGESTED_INDEX': suggest_index(scan['OPERATOR'], scan['LABEL'], prop)
+                                 if prop else None,
+                                 'DECLARED': (scan['LABEL'], prop) in indexes})
+    return pd.DataFrame(rows, columns=['QUERY', 'OPERATOR', 'LABEL', 'PROPERTY', 'ESTIMATED_ROWS', 'SUGGESTED_INDEX',
+                                       'DECLARED'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Report the label scans of a query workload that an index would remove')
+    parser.add_argument('workload_files', nargs='*', type=Path,
+                        help='the Cypher workload files, with queries separated by semicolons. By default, the '
+                             'queries of the benchmark')
+    parser.add_argument('--database', help='the name of the Neo4j database, by default the NEO4J_DATABASE_NAME '
+                                           'environment variable')
+    args = parser.parse_args()
+
+    workload_queries = {}
+    for file in args.workload_files:
+        workload_queries.update(load_workload(file))
+    if not args.workload_files:
+        workload_queries, _ = load_query_set()
+    with get_neo4j_driver() as neo4j_driver:
+        scans_df = advise_indexes(neo4j_driver, args.database or get_neo4j_settings().database_name,
+                                  workload_queries)
+    pd.set_option('display.width', 200)
+    pd.set_option('display.max_colwidth', 100)
+    suggestions_df = scans_df[scans_df['SUGGESTED_INDEX'].notna()]
+    print(f'{len(scans_df)} label scans found in {len(workload_queries)} queries, '
+          f'{len(suggestions_df)} of them filter on a property')
+    if len(suggestions_df) > 0:
+        print(suggestions_df.to_string(index=False))
+        print('Suggested indexes which are not declared in the import:')
+        for index in suggestions_df.loc[~suggestions_df['DECLARED'], 'SUGGESTED_INDEX'].unique():
+            print(index)
@@ -1,44 +1,108 @@
-import os
+import re
+import math
 import time
+import hashlib
+import argparse
+import tempfile
 import pandas as pd
-import neo4j
 
-from tqdm import tqdm
 from pathlib import Path
-from typing import List, Tuple
-from dotenv import load_dotenv
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Tuple, Union, TYPE_CHECKING
 
+from lib.neo4j_import.aggregates import compute_peak_aggregates, compute_expedition_aggregates, \
+    compute_member_aggregates
+from lib.neo4j_import.settings import get_neo4j_settings, get_neo4j_driver
+from lib.neo4j_import.validation import assert_valid_data
+from lib.neo4j_import.streaming import CHUNK_SIZE, external_sort_csv, last_rows
+from lib.neo4j_import.import_profiler import save_profile_report
+from lib.neo4j_import.batch_pipeline import BatchPrefetcher, prepare_batches
+from lib.neo4j_import.dimensions import compute_expedition_dimensions, compute_peak_dimensions, add_peak_locations
 
-load_dotenv()
-JUST_TESTING = False
-NEO4J_SERVER_URL = os.environ.get('NEO4J_SERVER_URL')
-NEO4J_DATABASE_NAME = 'himalayandb' if os.environ.get('NEO4J_DATABASE_NAME') is None \
-    else os.environ.get('NEO4J_DATABASE_NAME')
-NEO4J_SERVER_USERNAME = os.environ.get('NEO4J_SERVER_USERNAME')
-NEO4J_SERVER_PASSWORD = os.environ.get('NEO4J_SERVER_PASSWORD')
+# The Neo4j driver and the progress bars are only imported when the database is imported
+if TYPE_CHECKING:
+    import neo4j
+
+
+# The aggregates are simple property updates on existing nodes, so they are written in larger batches
+AGGREGATES_BATCH_SIZE = 1000
+# The dimensions nodes are created once per distinct value with a single MERGE, so they are written in larger batches
+DIMENSIONS_BATCH_SIZE = 1000
+# The secondary indexes on the properties often used to filter the nodes and relationships. They are created after the
+# data is loaded, so the import writes do not have to maintain them
+INDEXES = ['CREATE INDEX expedition_year IF NOT EXISTS FOR (e:Expedition) ON (e.year);',
+           'CREATE INDEX expedition_season IF NOT EXISTS FOR (e:Expedition) ON (e.season);',
+           'CREATE INDEX member_last_name IF NOT EXISTS FOR (m:Member) ON (m.lastName);',
+           'CREATE INDEX peak_height_meters IF NOT EXISTS FOR (p:Peak) ON (p.heightMeters);',
+           'CREATE INDEX led_summit_success IF NOT EXISTS FOR ()-[r:LED]-() ON (r.summitSuccess);',
+           'CREATE INDEX led_death IF NOT EXISTS FOR ()-[r:LED]-() ON (r.death);',
+           'CREATE INDEX joined_summit_success IF NOT EXISTS FOR ()-[r:JOINED]-() ON (r.summitSuccess);',
+           'CREATE INDEX joined_death IF NOT EXISTS FOR ()-[r:JOINED]-() ON (r.death);',
+           'CREATE INDEX worked_for_summit_success IF NOT EXISTS FOR ()-[r:WORKED_FOR]-() ON (r.summitSuccess);',
+           'CREATE INDEX worked_for_death IF NOT EXISTS FOR ()-[r:WORKED_FOR]-() ON (r.death);',
+           'CREATE POINT INDEX peak_location IF NOT EXISTS FOR (p:Peak) ON (p.location);']
+# The maximum time in seconds to wait for the indexes to be populated
+INDEXES_TIMEOUT = 600
+# The number of characters of the hash of the imported data files identifying the imported data version
+DATA_VERSION_LENGTH = 12
+
+
+def compute_data_version(files: Iterable[Path], options: str = '') -> str:
+    """
+    Compute the version of the imported data, the hash of the content of the data files
+    :param files: The imported data files
+    :param options: The import options changing the imported data (e.g. the test mode), added to the hash
+    :return: The first DATA_VERSION_LENGTH characters of the SHA-256 hash of the files
+    """
+    data_hash = hashlib.sha256(options.encode('utf-8'))
+    for file in files:
+        with open(file, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                data_hash.update(block)
+    return data_hash.hexdigest()[:DATA_VERSION_LENGTH]
+
+
+def compute_frames_version(frames: Dict[str, pd.DataFrame], options: str = '') -> str:
+    """
+    Compute the version of the data imported from the dataframes handed over in memory, the hash of their tables,
+    columns and values. It differs from the version of the same data imported from the data files
+    :param frames: The imported dataframes by table name
+    :param options: The import options changing the imported data (e.g. the test mode), added to the hash
+    :return: The first DATA_VERSION_LENGTH characters of the SHA-256 hash of the dataframes
+    """
+    data_hash = hashlib.sha256(options.encode('utf-8'))
+    for table in sorted(frames):
+        data_hash.update(f'{table}:{",".join(map(str, frames[table].columns))}'.encode('utf-8'))
+        # The index is not imported, only the values of the rows
+        data_hash.update(pd.util.hash_pandas_object(frames[table], index=False).values.tobytes())
+    return data_hash.hexdigest()[:DATA_VERSION_LENGTH]
 
 
 class HimalayasDatabaseImport:
-    def __init__(self, db_name: str = NEO4J_DATABASE_NAME, expedition_file: str = 'processed/exped.csv',
+    def __init__(self, db_name: str = None, expedition_file: str = 'processed/exped.csv',
                  members_file: str = 'processed/members.csv', peaks_file: str = 'processed/peaks.csv',
-                 import_batch_size: int = 50, test_size: int = 100, extra_test_expeditions: List[str] = None):
+                 import_batch_size: int = 50, test_size: int = 100, extra_test_expeditions: List[str] = None,
+                 validate: bool = True, profile_dir: Path = None, profile_batch: int = 0,
+                 data: Dict[str, pd.DataFrame] = None):
         """
         Initialize the HimalayasDatabaseImport class to import the Himalayan Database data into a Neo4j graph database.
-        :param db_name: The name of the Neo4j database.
+        :param db_name: The name of the Neo4j database, by default the NEO4J_DATABASE_NAME environment variable.
         :param expedition_file: The path to the expedition file.
         :param members_file: The path to the members file.
         :param peaks_file: The path to the peaks file.
         :param import_batch_size: The number of records to import in a batch.
         :param test_size: The number of records to import in test mode.
         :param extra_test_expeditions: The list of extra expeditions to import in test mode.
+        :param validate: If True, the data files are validated before the database is created or replaced.
+        :param profile_dir: The folder of the query plan profiles of the import queries. If set, a batch of each import
+        query is run with PROFILE and a report of its plan is saved in this folder.
+        :param profile_batch: The index of the profiled batch of each import query, the last batch is profiled if there
+        are fewer batches.
+        :param data: The expeditions, members and peaks dataframes handed over in memory by the previous pipeline
+        stages, by table name. If set, they are imported instead of the data files.
         """
-        try:
-            self.driver = neo4j.GraphDatabase.driver(NEO4J_SERVER_URL, auth=(NEO4J_SERVER_USERNAME,
-                                                                             NEO4J_SERVER_PASSWORD))
-        except Exception as e:
-            print('Error connecting to the Neo4j server', e)
-            raise e
-        self.db_name = db_name
+        self.driver = get_neo4j_driver()
+        self.db_name = get_neo4j_settings().database_name if db_name is None else db_name
         self.script_path = Path(__file__)
         self.data_path = self.script_path.parent.parent.parent / 'assets/data'
         self.import_files = {
@@ -49,6 +113,14 @@ class HimalayasDatabaseImport:
         self.import_batch_size = import_batch_size
         self.test_size = test_size
         self.extra_test_expeditions = extra_test_expeditions
+        self.profile_dir = profile_dir
+        self.profile_batch = profile_batch
+        self.data = data
+        # The duration in seconds of each import step
+        self.timings: List[Dict] = []
+        # Validate the data before replacing the database, so invalid data does not fail halfway through the import
+        if validate:
+            self.validate_data()
         self._create_database()
 
     def close(self):
@@ -56,6 +128,27 @@ class HimalayasDatabaseImport:
         if self.driver is not None:
             self.driver.close()
 
+    def validate_data(self):
+        """
+        Check the expeditions, members and peaks data files against the validation rules and report all the violations
+        :return: None
+        """
+        print('====> Validating the data to import')
+        tables = {table: self._read_table(table) for table in self.import_files}
+        # The successful routes without a name are known and set to "Unknown" by the expeditions import
+        tables['expeditions'] = self._set_unkown_successful_routes(tables['expeditions'])
+        assert_valid_data(tables)
+
+    def _read_table(self, table: str) -> pd.DataFrame:
+        """
+        Read the data of a table, from the dataframe handed over in memory if any or else from its data file
+        :param table: The name of the table, expeditions, members or peaks
+        :return: The dataframe of the table, a copy of the dataframe handed over in memory
+        """
+        if self.data is not None:
+            return self.data[table].copy()
+        return pd.read_csv(self.import_files[table], encoding='utf-8', engine='python')
+
     def _create_database(self):
         """
         Create a new database if it does not exist or replace the existing database if it already exists
@@ -63,7 +156,20 @@ class HimalayasDatabaseImport:
         """
         with self.driver.session(database='system') as session:
             print(f'Creating or replacing the Neo4j database {self.db_name}')
-            session.run(f'CREATE OR REPLACE DATABASE {self.db_name}')
+            # The name is quoted as the names of the versioned databases contain a dash
+            session.run(f'CREATE OR REPLACE DATABASE `{self.db_name}`')
+
+    @contextmanager
+    def _timed(self, step: str):
+        """
+        Measure the duration of an import step and add it to the timings
+        :param step: The name of the step
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings.append({'STEP': step, 'SECONDS': round(time.perf_counter() - start, 3)})
 
     @staticmethod
     def _set_unkown_successful_routes(df: pd.DataFrame) -> pd.DataFrame:
@@ -79,36 +185,61 @@ class HimalayasDatabaseImport:
         return corrected_df
 
     @staticmethod
-    def _import_data_batch(tx: neo4j.Transaction, df: pd.DataFrame, query: str, table_name: str) \
+    def _import_data_batch(tx: 'neo4j.Transaction', records: List[Dict], query: str, table_name: str) \
             -> Tuple[int, int]:
         """
         Import a batch of data into the Neo4j database
         :param tx: the opened Neo4j transaction
-        :param df: the Pandas DataFrame containing the batch of data to import
+        :param records: the records of the batch of data to import
         :param query: the query to execute to import the data
         :param table_name: the name of the table in the Neo4j Cypher query
         :return: A tuple containing the number of nodes created and the number of relationships created
         """
-        res = tx.run(query, parameters={table_name: df.to_dict('records')})
+        res = tx.run(query, parameters={table_name: records})
         nodes_created = res.consume().counters.nodes_created
         relationships_created = res.consume().counters.relationships_created
         return nodes_created, relationships_created
 
-    def _import_data(self, table_name: str, df: pd.DataFrame, query: str, constraints: List[str] = None):
+    @staticmethod
+    def _profile_data_batch(tx: 'neo4j.Transaction', records: List[Dict], query: str, table_name: str) \
+            -> Tuple[int, int, Dict]:
+        """
+        Import a batch of data into the Neo4j database with a PROFILE query, which imports the batch and records its
+        query plan with the actual rows and database hits of each operator
+        :param tx: the opened Neo4j transaction
+        :param records: the records of the batch of data to import
+        :param query: the query to execute to import the data
+        :param table_name: the name of the table in the Neo4j Cypher query
+        :return: A tuple containing the number of nodes created, the number of relationships created and the profiled
+        query plan
+        """
+        summary = tx.run(f'PROFILE {query}', parameters={table_name: records}).consume()
+        return summary.counters.nodes_created, summary.counters.relationships_created, summary.profile
+
+    def _import_data(self, table_name: str, df: Union[pd.DataFrame, Iterable[pd.DataFrame]], query: str,
+                     constraints: List[str] = None, batch_size: int = None, query_name: str = None):
         """
-        Import the data into the Neo4j database in batches
+        Import the data into the Neo4j database in batches. The next batches are prepared in a background thread while
+        the current batch is committed
         :param table_name: The name of the table to import
-        :param df: The Pandas DataFrame containing the data to import
+        :param df: The Pandas DataFrame containing the data to import, or an iterable of DataFrame chunks to stream the
+        data without loading it all in memory
         :param query: The Neo4j Cypher query to execute to import the data
         :param constraints: The list of constraints to add to the table
+        :param batch_size: The number of records to import in a batch, by default the import_batch_size
+        :param query_name: The name of the query in the profile reports, by default the table name
         :return: None
         """
-        # Get the list of all the keys in the expedition_dtype dictionary which have a value set to the string type
-        # Fill the columns with a string type NaN values to an empty string because the Neo4j doesn't
-        # support NaN values for strings
-        columns_to_convert_nan = [k for k, v in df.dtypes.items() if v == str or v == object]
-        for column in columns_to_convert_nan:
-            df[column].fillna('', inplace=True)
+        from tqdm import tqdm
+        batch_size = self.import_batch_size if batch_size is None else batch_size
+        # The number of rows of the chunks is not known in advance
+        total_rows = len(df) if isinstance(df, pd.DataFrame) else None
+        chunks = [df] if isinstance(df, pd.DataFrame) else df
+        profile_batch = None
+        if self.profile_dir is not None:
+            profile_batch = self.profile_batch if total_rows is None else \
+                min(self.profile_batch, max(math.ceil(total_rows / batch_size) - 1, 0))
+        batch_index = 0
         with self.driver.session(database=self.db_name) as session:
             # You can't edit the schema and write data in the same transaction
             # First transaction to create unique constraints on the nodes
@@ -119,26 +250,66 @@ class HimalayasDatabaseImport:
             # Second transactions to import the nodes
             total_nodes_created = 0
             total_relationships_created = 0
-            # Split the expeditions DataFrame into batches of 100 rows and import each batch in a separate
-            # transaction. Use tqdm to show the progress bar
-            for i in tqdm(range(0, df.shape[0], self.import_batch_size), position=0, leave=True):
-                batch_df = df.iloc[i:i + self.import_batch_size]
-                nodes_created, relationships_created = session.execute_write(self._import_data_batch,  df=batch_df,
-                                                                             query=query, table_name=table_name)
-                total_nodes_created += nodes_created
-                total_relationships_created += relationships_created
+            # Split the chunks into batches of batch_size rows and import each batch in a separate transaction. The
+            # batches are prepared by the prefetcher thread while the previous batch is committed
+            with tqdm(total=total_rows, unit='rows', position=0, leave=True) as progress, \
+                    BatchPrefetcher(prepare_batches(chunks, batch_size)) as prefetcher:
+                for records in prefetcher:
+                    if batch_index == profile_batch:
+                        nodes_created, relationships_created, profile = session.execute_write(
+                            self._profile_data_batch, records=records, query=query, table_name=table_name)
+                        save_profile_report(profile, query_name or table_name, self.profile_dir, batch_index,
+                                            len(records))
+                    else:
+                        nodes_created, relationships_created = session.execute_write(
+                            self._import_data_batch, records=records, query=query, table_name=table_name)
+                    batch_index += 1
+                    total_nodes_created += nodes_created
+                    total_relationships_created += relationships_created
+                    progress.update(len(records))
             print(f'Number of nodes created: {total_nodes_created}')
             print(f'Number of relationships created: {total_relationships_created}')
+            stats = prefetcher.stats()
+            print(f'Batches prepared in advance: {stats["MEAN_QUEUE_DEPTH"]} on average, the writer waited '
+                  f'{stats["WRITER_STALL"]} seconds for the batches and the preparation waited '
+                  f'{stats["PREPARER_STALL"]} seconds for the commits')
         # Add a 1 sec time for the TQDM progress bar to finish
         time.sleep(1)
 
+    def _import_dimensions(self, dimensions: Dict[str, pd.DataFrame], constraints: List[str] = None):
+        """
+        Create the nodes shared by many rows (e.g. peaks, agencies, routes) once for each distinct value, before the rows
+        are imported and matched to these nodes
+        :param dimensions: The dataframes of the distinct values of each dimension by name of the parameter of its
+        import query
+        :param constraints: The list of constraints to add to the dimensions nodes, they are created first so the
+        dimensions are merged with an index lookup
+        :return: None
+        """
+        try:
+            with self.script_path.with_name('import-dimensions.cypher').open('r') as f:
+                queries = f.read().split(';')
+        except Exception as e:
+            print('Error reading the Neo4j Cypher query file import-dimensions.cypher', e)
+            raise e
+        for query in queries:
+            # Each query imports the dimension named by its UNWIND parameter
+            match = re.search(r'UNWIND \$(\w+)', query)
+            if match is None or match.group(1) not in dimensions:
+                continue
+            print(f'Creating the {match.group(1)} dimension')
+            self._import_data(table_name=match.group(1), df=dimensions[match.group(1)], query=query,
+                              constraints=constraints, batch_size=DIMENSIONS_BATCH_SIZE,
+                              query_name=f'import-dimensions-{match.group(1)}')
+            constraints = None
+
     def import_expeditions_data(self, test: bool = False):
         """
         Import the Himalayan Database expedition data into the Neo4j database
         :param test: If True, only the first 100 rows of the expedition data file will be imported
         :return: None
         """
-        exped_df = pd.read_csv(self.import_files['expeditions'], encoding='utf-8', engine='python')
+        exped_df = self._read_table('expeditions')
         exped_df = self._set_unkown_successful_routes(exped_df)
         # If testing we take only the first self.test_size rows
         if test:
@@ -156,23 +327,27 @@ class HimalayasDatabaseImport:
         constraints = ['CREATE CONSTRAINT IF NOT EXISTS FOR (e:Expedition) REQUIRE (e.expeditionId, e.year) IS UNIQUE;',
                        'CREATE CONSTRAINT IF NOT EXISTS FOR (p:Peak) REQUIRE p.peakId IS UNIQUE;',
                        'CREATE CONSTRAINT IF NOT EXISTS FOR (a:Agency) REQUIRE a.name IS UNIQUE;',
-                       'CREATE CONSTRAINT IF NOT EXISTS FOR (r:Route) REQUIRE r.name IS UNIQUE;']
+                       'CREATE CONSTRAINT IF NOT EXISTS FOR (r:Route) REQUIRE r.name IS UNIQUE;',
+                       'CREATE CONSTRAINT IF NOT EXISTS FOR (c:Country) REQUIRE c.name IS UNIQUE;']
         print(f'====> Importing the Himalayan Database expeditions data in the {self.db_name} database')
-        print('==> Creating the Expeditions, Peaks, Agencies and Routes nodes and their relationships')
-        self._import_data(table_name='expeditions', df=exped_df, query=query, constraints=constraints)
+        print('==> Creating the Peaks, Agencies, Countries and Routes nodes')
+        with self._timed('expeditions dimensions'):
+            self._import_dimensions(compute_expedition_dimensions(exped_df), constraints=constraints)
+        print('==> Creating the Expeditions nodes and their relationships')
+        with self._timed('expeditions'):
+            self._import_data(table_name='expeditions', df=exped_df, query=query, query_name='import-exped')
 
-    def import_members_data(self, test: bool = False):
+    def import_members_data(self, test: bool = False, chunk_size: int = CHUNK_SIZE):
         """
-        Import the Himalayan Database members data into the Neo4j database
+        Import the Himalayan Database members data into the Neo4j database. The members file is streamed in chunks, so
+        the memory used does not grow with the number of members
         :param test: If True, only import the members who are in the expeditions imported in test mode
+        :param chunk_size: The number of members rows read and sorted in memory at once
         :return: None
         """
-        members_df = pd.read_csv(self.import_files['members'], encoding='utf-8', engine='python')
-        # We sort the members by MYEAR and MSEASON so that the last members data (e.g. RESIDENCE) will be the one
-        # remaining in the database for the node
-        members_df.sort_values(by=['MYEAR', 'MSEASON'], inplace=True)
+        from tqdm import tqdm
         # Get the unique expedition by ID and year
-        exped_df = pd.read_csv(self.import_files['expeditions'], encoding='utf-8', engine='python')
+        exped_df = self._read_table('expeditions')
         exped_df = exped_df[['EXPID', 'YEAR']].drop_duplicates()
         # If testing, only import the members who are in the self.test_size expeditions that have been imported
         if test:
@@ -182,8 +357,17 @@ class HimalayasDatabaseImport:
                                       exped_df[exped_df['EXPID'].isin(self.extra_test_expeditions)]])
             else:
                 exped_df = exped_df.head(self.test_size)
-            # Get the members corresponding to the imported expeditions
-            members_df = members_df[members_df['EXPID'].isin(exped_df['EXPID'].tolist())]
+
+        def read_members(members: Union[Path, pd.DataFrame]) -> Iterator[pd.DataFrame]:
+            """Read the members file or dataframe in chunks, with only the members of the imported expeditions in test
+            mode"""
+            if isinstance(members, pd.DataFrame):
+                chunks = (members.iloc[i:i + chunk_size] for i in range(0, len(members), chunk_size))
+            else:
+                chunks = pd.read_csv(members, encoding='utf-8', engine='python', chunksize=chunk_size)
+            for chunk_df in chunks:
+                # Get the members corresponding to the imported expeditions
+                yield chunk_df[chunk_df['EXPID'].isin(exped_df['EXPID'])] if test else chunk_df
         try:
             with self.script_path.with_name('import-members.cypher').open('r') as f:
                 people_query = f.read()
@@ -209,10 +393,29 @@ class HimalayasDatabaseImport:
         print('==> Creating the Member and Country nodes')
         members_columns = ['PERSID', 'FNAME', 'LNAME', 'SEX', 'YOB', 'CITIZEN', 'RESIDENCE', 'OCCUPATION', 'SHERPA',
                            'TIBETAN']
-        people_df = members_df[members_columns].drop_duplicates(subset=['PERSID'], keep='last')
-        self._import_data(table_name='members', df=people_df, query=people_query, constraints=constraints)
+        sort_columns = ['PERSID', 'MYEAR', 'MSEASON']
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # We sort the members by PERSID, MYEAR and MSEASON with an external sort, so the rows of each member are
+            # consecutive and the last members data (e.g. RESIDENCE) will be the one remaining in the database for the
+            # node, keeping only a chunk of the members in memory
+            if self.data is None:
+                sorted_members = external_sort_csv(self.import_files['members'], Path(temp_dir) / 'members.csv',
+                                                   by=sort_columns, chunk_size=chunk_size,
+                                                   usecols=members_columns + ['EXPID', 'MYEAR', 'MSEASON'])
+            else:
+                # The members handed over in memory are already loaded and are sorted in memory, in the same stable
+                # order as the external sort
+                sorted_members = self.data['members'][members_columns + ['EXPID', 'MYEAR', 'MSEASON']] \
+                    .sort_values(by=sort_columns, kind='mergesort')
+            people_chunks = (people_df[members_columns] for people_df in
+                             last_rows(read_members(sorted_members), key='PERSID'))
+            self._import_data(table_name='members', df=people_chunks, query=people_query, constraints=constraints,
+                              query_name='import-members')
         print(f'==> Creating the members to expedition memberships')
-        self._import_data(table_name='members', df=members_df, query=members_query)
+        self._import_data(table_name='members',
+                          df=read_members(self.import_files['members'] if self.data is None else self.data['members']),
+                          query=members_query,
+                          query_name='import-memberships')
         print(f'==> Creating relationships between the members of the same expedition')
         total_relationships_created = 0
         with self.driver.session(database=self.db_name) as session:
@@ -237,9 +440,9 @@ class HimalayasDatabaseImport:
         :param test: If True, only import the peaks which have been climbed by the expeditions imported in test mode
         :return: None
         """
-        peaks_df = pd.read_csv(self.import_files['peaks'], encoding='utf-8', engine='python')
+        peaks_df = self._read_table('peaks')
         # Get the expedition IDs
-        exped_df = pd.read_csv(self.import_files['expeditions'], encoding='utf-8', engine='python')
+        exped_df = self._read_table('expeditions')
         # If testing, only import the peaks which have been climbed by the self.test_size expeditions that have been
         # imported
         if test:
@@ -259,21 +462,151 @@ class HimalayasDatabaseImport:
         except Exception as e:
             print('Error reading the Neo4j Cypher query file import-peaks.cypher', e)
             raise e
-        constraints = ['CREATE CONSTRAINT IF NOT EXISTS FOR (r:Range) REQUIRE r.name IS UNIQUE;',
+        constraints = ['CREATE CONSTRAINT IF NOT EXISTS FOR (p:Peak) REQUIRE p.peakId IS UNIQUE;',
+                       'CREATE CONSTRAINT IF NOT EXISTS FOR (r:Range) REQUIRE r.name IS UNIQUE;',
                        'CREATE CONSTRAINT IF NOT EXISTS FOR (d:District) REQUIRE d.name IS UNIQUE;',
-                       'CREATE CONSTRAINT IF NOT EXISTS FOR (p:Province) REQUIRE p.name IS UNIQUE;']
+                       'CREATE CONSTRAINT IF NOT EXISTS FOR (p:Province) REQUIRE p.name IS UNIQUE;',
+                       'CREATE CONSTRAINT IF NOT EXISTS FOR (c:Country) REQUIRE c.name IS UNIQUE;']
         print(f'====> Importing the Himalayan Database Peaks data in the {self.db_name} database')
-        print('==> Creating the Peaks, Ranges and Regions nodes and relationships')
-        self._import_data(table_name='peaks', df=peaks_df, query=query, constraints=constraints)
+        print('==> Creating the Peaks, Ranges, Provinces, Districts and Countries nodes')
+        with self._timed('peaks dimensions'):
+            self._import_dimensions(compute_peak_dimensions(peaks_df), constraints=constraints)
+        print('==> Setting the Peaks properties and their relationships')
+        with self._timed('peaks'):
+            self._import_data(table_name='peaks', df=add_peak_locations(peaks_df), query=query,
+                              query_name='import-peaks')
+
+    def import_aggregates(self, test: bool = False):
+        """
+        Compute the summary metrics of the peaks, expeditions and members (e.g. number of summits, death rates, first
+        summit year) with pandas and set them as properties of the existing nodes. This must run after the expeditions,
+        members and peaks imports, so these common questions are answered by property lookups instead of traversing
+        all the members relationships at query time.
+        :param test: If True, only compute the aggregates of the expeditions imported in test mode
+        :return: None
+        """
+        exped_df = self._read_table('expeditions')
+        members_df = self._read_table('members')
+        peaks_df = self._read_table('peaks')
+        # If testing, only use the self.test_size expeditions that have been imported and their members
+        if test:
+            expeditions = exped_df['EXPID'].tolist()[:self.test_size]
+            if self.extra_test_expeditions:
+                expeditions += self.extra_test_expeditions
+            exped_df = exped_df[exped_df['EXPID'].isin(expeditions)]
+            members_df = members_df[members_df['EXPID'].isin(expeditions)]
+        queries = {}
+        for query_file in ['import-peak-aggregates.cypher', 'import-expedition-aggregates.cypher',
+                           'import-member-aggregates.cypher']:
+            try:
+                with self.script_path.with_name(query_file).open('r') as f:
+                    queries[query_file] = f.read()
+            except Exception as e:
+                print(f'Error reading the Neo4j Cypher query file {query_file}', e)
+                raise e
+        print(f'====> Importing the precomputed aggregates in the {self.db_name} database')
+        print('==> Setting the Peaks aggregates')
+        self._import_data(table_name='peaks', df=compute_peak_aggregates(exped_df, members_df),
+                          query=queries['import-peak-aggregates.cypher'], batch_size=AGGREGATES_BATCH_SIZE,
+                          query_name='import-peak-aggregates')
+        print('==> Setting the Expeditions aggregates')
+        self._import_data(table_name='expeditions', df=compute_expedition_aggregates(members_df),
+                          query=queries['import-expedition-aggregates.cypher'], batch_size=AGGREGATES_BATCH_SIZE,
+                          query_name='import-expedition-aggregates')
+        print('==> Setting the Members aggregates')
+        self._import_data(table_name='members', df=compute_member_aggregates(members_df, peaks_df),
+                          query=queries['import-member-aggregates.cypher'], batch_size=AGGREGATES_BATCH_SIZE,
+                          query_name='import-member-aggregates')
+
+    def record_import_version(self, version: str):
+        """
+        Record the version of the imported data in an ImportVersion node, read by the database clients to know which
+        data they are querying
+        :param version: The version of the imported data
+        :return: None
+        """
+        with self.driver.session(database=self.db_name) as session:
+            session.run('MERGE (v:ImportVersion {version: $version}) SET v.importedAt = datetime()',
+                        parameters={'version': version}).consume()
+
+    def create_indexes(self, indexes: List[str] = None, timeout: int = INDEXES_TIMEOUT):
+        """
+        Create the secondary indexes and wait for them to be online. This must run after the data is loaded
+        :param indexes: The list of index creation queries, by default the declared INDEXES
+        :param timeout: The maximum time in seconds to wait for the indexes to be populated
+        :return: None
+        """
+        print(f'====> Creating the indexes in the {self.db_name} database')
+        with self.driver.session(database=self.db_name) as session:
+            for index in INDEXES if indexes is None else indexes:
+                session.run(index).consume()
+            print('Waiting for the indexes to be online')
+            session.run('CALL db.awaitIndexes($timeout)', parameters={'timeout': timeout}).consume()
+            failed_indexes = session.run('SHOW INDEXES YIELD name, state WHERE state <> "ONLINE" '
+                                         'RETURN name, state').data()
+        if failed_indexes:
+            print('Error creating the indexes', failed_indexes)
+            raise RuntimeError(f'The indexes are not online: {failed_indexes}')
+
+
+def import_himalayas_database(db_name: str = None, import_batch_size: int = 50, test: bool = False,
+                              test_size: int = 100, validate: bool = True, profile_dir: Path = None,
+                              profile_batch: int = 0, data: Dict[str, pd.DataFrame] = None):
+    """
+    Create the Neo4j database and import the processed expeditions, members and peaks data, their aggregates and the
+    indexes
+    :param db_name: The name of the Neo4j database, by default the NEO4J_DATABASE_NAME environment variable
+    :param import_batch_size: The number of records to import in a batch
+    :param test: If True, only the test_size first expeditions and their related data are imported
+    :param test_size: The number of expeditions to import in test mode
+    :param validate: If True, the data is validated before the database is created or replaced
+    :param profile_dir: If set, a batch of each import query is profiled and the plan reports are saved in this folder
+    :param profile_batch: The index of the profiled batch of each import query
+    :param data: The expeditions, members and peaks dataframes handed over in memory by the previous pipeline stages,
+    imported instead of the data files
+    :return: None
+    """
+    if test:
+        print(f"""====> IMPORTANT: The test mode is enabled.
+                                  Only {test_size} expeditions and their related data will be imported.""")
+    himalayas_db = HimalayasDatabaseImport(db_name=db_name, import_batch_size=import_batch_size, test_size=test_size,
+                                           validate=validate, profile_dir=profile_dir,
+                                           profile_batch=profile_batch, data=data)
+    try:
+        himalayas_db.import_expeditions_data(test=test)
+        with himalayas_db._timed('members'):
+            himalayas_db.import_members_data(test=test)
+        himalayas_db.import_peaks_data(test=test)
+        with himalayas_db._timed('aggregates'):
+            himalayas_db.import_aggregates(test=test)
+        with himalayas_db._timed('indexes'):
+            himalayas_db.create_indexes()
+        version_options = f'test={test_size}' if test else ''
+        himalayas_db.record_import_version(
+            compute_data_version(himalayas_db.import_files.values(), version_options) if data is None
+            else compute_frames_version(data, version_options))
+    finally:
+        himalayas_db.close()
+    print('====> Duration of the import steps')
+    print(pd.DataFrame(himalayas_db.timings, columns=['STEP', 'SECONDS']).to_string(index=False))
 
 
 if __name__ == '__main__':
-    if JUST_TESTING:
-        print("""====> IMPORTANT: The JUST_TESTING flag is set to True.
-                                  Only the amount of expeditions and the related data specified in the test_size 
-                                  variable in the class definition will be imported.""")
-    himalayas_db = HimalayasDatabaseImport()
-    himalayas_db.import_expeditions_data(test=JUST_TESTING)
-    himalayas_db.import_members_data(test=JUST_TESTING)
-    himalayas_db.import_peaks_data(test=JUST_TESTING)
-    himalayas_db.close()
+    arg_parser = argparse.ArgumentParser(description="Import the Himalayan Database data into a Neo4j database")
+    arg_parser.add_argument('--database', help="The name of the Neo4j database, by default the NEO4J_DATABASE_NAME "
+                                               "environment variable")
+    arg_parser.add_argument('--batch-size', type=int, default=50, help="The number of records to import in a batch")
+    arg_parser.add_argument('--test', action='store_true',
+                            help="Only import the first expeditions and their related data")
+    arg_parser.add_argument('--test-size', type=int, default=100,
+                            help="The number of expeditions to import in test mode")
+    arg_parser.add_argument('--skip-validation', action='store_true',
+                            help="Do not validate the data before replacing the database")
+    arg_parser.add_argument('--profile-dir', type=Path,
+                            help="Profile a batch of each import query and save the query plan reports in this folder")
+    arg_parser.add_argument('--profile-batch', type=int, default=0,
+                            help="The index of the profiled batch of each import query")
+    args = arg_parser.parse_args()
+    import_himalayas_database(db_name=args.database, import_batch_size=args.batch_size, test=args.test,
+                              test_size=args.test_size, validate=not args.skip_validation,
+                              profile_dir=args.profile_dir, profile_batch=args.profile_batch)
@@ -0,0 +1,9 @@
+// Peaks within a bounding box of WGS-84 coordinates, the highest first. The bounding box filter on the location
+// property is answered by the peak_location point index
+MATCH (p:Peak)
+WHERE point.withinBBox(p.location, point({latitude: $south, longitude: $west}),
+                       point({latitude: $north, longitude: $east}))
+RETURN p.peakId AS peakId, p.name AS peak, p.heightMeters AS heightMeters, p.latitude AS latitude,
+       p.longitude AS longitude
+ORDER BY heightMeters DESC, peakId
+LIMIT $limit
@@ -0,0 +1,9 @@
+// Peaks within a radius in meters of a WGS-84 location, the nearest first. The distance filter on the location property
+// is answered by the peak_location point index instead of computing the distance of all the peaks
+WITH point({latitude: $latitude, longitude: $longitude}) AS center
+MATCH (p:Peak)
+WHERE point.distance(p.location, center) <= $radius
+RETURN p.peakId AS peakId, p.name AS peak, p.heightMeters AS heightMeters, p.latitude AS latitude,
+       p.longitude AS longitude, round(point.distance(p.location, center) / 1000.0, 3) AS distanceKm
+ORDER BY distanceKm, peakId
+LIMIT $limit
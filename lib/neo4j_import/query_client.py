@@ -0,0 +1,245 @@
+import json
+import time
+import argparse
+import threading
+import pandas as pd
+
+from pathlib import Path
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple, TYPE_CHECKING
+
+from lib.neo4j_import.settings import get_neo4j_settings, get_shared_neo4j_driver
+from lib.neo4j_import.benchmark.query_benchmark import load_query_set, BENCHMARK_PATH
+
+if TYPE_CHECKING:
+    import neo4j
+
+
+# The named queries of the client: the benchmark queries, which are the representative analytics queries, and the
+# parameterized queries of the client helpers
+QUERY_FILES = [(BENCHMARK_PATH / 'queries', '*.cypher'), (Path(__file__).parent / 'queries', '*.cypher')]
+# The number of records fetched from the server at once
+FETCH_SIZE = 1000
+# The number of query results kept in the cache
+CACHE_SIZE = 128
+# The time in seconds the version of the imported data is reused before being read again from the database
+VERSION_TTL = 30
+VERSION_QUERY = 'MATCH (v:ImportVersion) ' \
+                'RETURN v.version + "@" + toString(v.importedAt) AS version ORDER BY v.importedAt DESC LIMIT 1'
+# The maximum number of peaks returned by the geographic lookups
+MAX_PEAKS = 100
+
+
+def cache_key(query_name: str, parameters: Optional[Dict], version: str) -> Tuple[str, str, str]:
+    """
+    Get the cache key of the result of a query
+    :param query_name: The name of the query
+    :param parameters: The parameters of the query
+    :param version: The version of the imported data
+    :return: A tuple of the query name, the JSON text of the parameters sorted by name and the version
+    """
+    return query_name, json.dumps(parameters or {}, sort_keys=True, default=str), version
+
+
+def _check_coordinates(latitude: float, longitude: float):
+    """
+    Check the WGS-84 coordinates of a location
+    :param latitude: The latitude in decimal degrees
+    :param longitude: The longitude in decimal degrees
+    :return: None
+    """
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        print(f'Error in the coordinates {latitude}, {longitude}')
+        raise ValueError('The latitude must be between -90 and 90 and the longitude between -180 and 180')
+
+
+def radius_parameters(latitude: float, longitude: float, radius_km: float, limit: int = MAX_PEAKS) -> Dict:
+    """
+    Get the parameters of the peaks-within-radius query
+    :param latitude: The latitude of the center in decimal degrees
+    :param longitude: The longitude of the center in decimal degrees
+    :param radius_km: The radius in kilometers
+    :param limit: The maximum number of peaks returned
+    :return: The dictionary of the query parameters, with the radius in meters
+    """
+    _check_coordinates(latitude, longitude)
+    if radius_km <= 0:
+        print(f'Error in the radius {radius_km}')
+        raise ValueError('The radius must be positive')
+    return {'latitude': float(latitude), 'longitude': float(longitude), 'radius': radius_km * 1000.0, 'limit': limit}
+
+
+def bounding_box_parameters(south: float, west: float, north: float, east: float, limit: int = MAX_PEAKS) -> Dict:
+    """
+    Get the parameters of the peaks-in-bounding-box query
+    :param south: The latitude of the south edge in decimal degrees
+    :param west: The longitude of the west edge in decimal degrees
+    :param north: The latitude of the north edge in decimal degrees
+    :param east: The longitude of the east edge in decimal degrees
+    :param limit: The maximum number of peaks returned
+    :return: The dictionary of the query parameters
+    """
+    _check_coordinates(south, west)
+    _check_coordinates(north, east)
+    # The bounding boxes crossing the antimeridian are not needed for the Himalayas
+    if south > north or west > east:
+        print(f'Error in the bounding box {south}, {west}, {north}, {east}')
+        raise ValueError('The south edge must be below the north edge and the west edge before the east edge')
+    return {'south': float(south), 'west': float(west), 'north': float(north), 'east': float(east), 'limit': limit}
+
+
+class ResultCache:
+    def __init__(self, max_size: int = CACHE_SIZE):
+        """
+        Least recently used cache of the query results, safe to use from several threads
+        :param max_size: The maximum number of results kept in the cache
+        """
+        self.max_size = max_size
+        self.results: 'OrderedDict[Hashable, pd.DataFrame]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[pd.DataFrame]:
+        """
+        Get a result from the cache and mark it as the most recently used
+        :param key: The cache key of the result
+        :return: A copy of the result, so the cached result is not modified by the caller, or None if not cached
+        """
+        with self.lock:
+            if key not in self.results:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.results.move_to_end(key)
+            return self.results[key].copy()
+
+    def put(self, key: Hashable, result_df: pd.DataFrame):
+        """
+        Add a result to the cache, evicting the least recently used result if the cache is full
+        :param key: The cache key of the result
+        :param result_df: The result
+        """
+        with self.lock:
+            self.results[key] = result_df.copy()
+            self.results.move_to_end(key)
+            while len(self.results) > self.max_size:
+                self.results.popitem(last=False)
+
+    def clear(self):
+        """Remove all the results from the cache"""
+        with self.lock:
+            self.results.clear()
+
+
+class AnalyticsClient:
+    def __init__(self, db_name: str = None, query_files: List[Tuple[Path, str]] = None, fetch_size: int = FETCH_SIZE,
+                 cache_size: int = CACHE_SIZE, version_ttl: float = VERSION_TTL, driver: 'neo4j.Driver' = None):
+        """
+        Read-side client running named and parameterized Cypher queries on the Himalayan Database graph. The queries run
+        over a driver shared by all the clients of the process, which pools the connections, and their results are
+        cached until the data is imported again.
+        :param db_name: The name of the Neo4j database or alias, by default the NEO4J_DATABASE_NAME environment variable
+        :param query_files: The list of (folder, glob pattern) tuples of the query files, named after their file name,
+        by default the benchmark queries and the queries of the geographic lookups
+        :param fetch_size: The number of records fetched from the server at once
+        :param cache_size: The number of query results kept in the cache, 0 to disable the cache
+        :param version_ttl: The time in seconds the version of the imported data is reused before being read again
+        :param driver: The Neo4j driver, by default the shared driver
+        """
+        self.db_name = get_neo4j_settings().database_name if db_name is None else db_name
+        self.queries, _ = load_query_set(query_files or QUERY_FILES)
+        self.fetch_size = fetch_size
+        self.cache = ResultCache(cache_size) if cache_size > 0 else None
+        self.version_ttl = version_ttl
+        self.driver = get_shared_neo4j_driver() if driver is None else driver
+        # The version of the imported data and when it was read
+        self._version: Optional[str] = None
+        self._version_time = float('-inf')
+
+    def import_version(self) -> Optional[str]:
+        """
+        Get the version of the imported data recorded in the ImportVersion node at the end of the import. The import
+        date time is part of the version, so the data imported again with the same files has a new version
+        :return: The version of the imported data, or None if the database has no ImportVersion node
+        """
+        if time.monotonic() - self._version_time > self.version_ttl:
+            with self.driver.session(database=self.db_name, fetch_size=self.fetch_size) as session:
+                record = session.execute_read(lambda tx: tx.run(VERSION_QUERY).single())
+            self._version = record['version'] if record else None
+            self._version_time = time.monotonic()
+        return self._version
+
+    def run(self, query_name: str, parameters: Dict = None, use_cache: bool = True) -> pd.DataFrame:
+        """
+        Run a named query, or get its result from the cache if it was run with the same parameters on the same version
+        of the imported data
+        :param query_name: The name of the query, the name of its file without extension
+        :param parameters: The parameters of the query
+        :param use_cache: If False, the query is run even if its result is cached
+        :return: A dataframe of the records of the query
+        """
+        if query_name not in self.queries:
+            print(f'Error running the {query_name} query, the queries are {", ".join(sorted(self.queries))}')
+            raise KeyError(f'Unknown query {query_name}')
+        # The results of the databases without a version can not be invalidated by an import and are not cached
+        version = self.import_version() if self.cache is not None and use_cache else None
+        key = cache_key(query_name, parameters, version)
+        if version is not None:
+            result_df = self.cache.get(key)
+            if result_df is not None:
+                return result_df
+        with self.driver.session(database=self.db_name, fetch_size=self.fetch_size) as session:
+            records = session.execute_read(
+                lambda tx: tx.run(self.queries[query_name], parameters=parameters or {}).data())
+        result_df = pd.DataFrame(records)
+        if version is not None:
+            self.cache.put(key, result_df)
+        return result_df
+
+    def peaks_within_radius(self, latitude: float, longitude: float, radius_km: float,
+                            limit: int = MAX_PEAKS) -> pd.DataFrame:
+        """
+        Get the peaks within a radius of a location (e.g. a base camp), the nearest first, with an index seek on the
+        peaks location
+        :param latitude: The latitude of the location in decimal degrees
+        :param longitude: The longitude of the location in decimal degrees
+        :param radius_km: The radius in kilometers
+        :param limit: The maximum number of peaks returned, the nearest ones
+        :return: A dataframe of the peaks with their peakId, peak name, heightMeters, latitude, longitude and distanceKm
+        """
+        return self.run('peaks-within-radius', radius_parameters(latitude, longitude, radius_km, limit))
+
+    def peaks_in_bounding_box(self, south: float, west: float, north: float, east: float,
+                              limit: int = MAX_PEAKS) -> pd.DataFrame:
+        """
+        Get the peaks within a bounding box, the highest first, with an index seek on the peaks location
+        :param south: The latitude of the south edge in decimal degrees
+        :param west: The longitude of the west edge in decimal degrees
+        :param north: The latitude of the north edge in decimal degrees
+        :param east: The longitude of the east edge in decimal degrees
+        :param limit: The maximum number of peaks returned, the highest ones
+        :return: A dataframe of the peaks with their peakId, peak name, heightMeters, latitude and longitude
+        """
+        return self.run('peaks-in-bounding-box', bounding_box_parameters(south, west, north, east, limit))
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description="Run a named analytics query on the Himalayan Database graph")
+    arg_parser.add_argument('query', help="The name of the query, the name of its file without extension")
+    arg_parser.add_argument('--database', help="The name of the Neo4j database, by default the NEO4J_DATABASE_NAME "
+                                               "environment variable")
+    arg_parser.add_argument('--param', action='append', default=[], metavar='NAME=VALUE',
+                            help="A query parameter, its value is read as JSON if possible")
+    arg_parser.add_argument('--fetch-size', type=int, default=FETCH_SIZE,
+                            help="The number of records fetched from the server at once")
+    args = arg_parser.parse_args()
+    query_parameters = {}
+    for param in args.param:
+        name, value = param.split('=', 1)
+        try:
+            query_parameters[name] = json.loads(value)
+        except json.JSONDecodeError:
+            query_parameters[name] = value
+    client = AnalyticsClient(db_name=args.database, fetch_size=args.fetch_size)
+    print(client.run(args.query, query_parameters).to_string(index=False))
@@ -0,0 +1,60 @@
+import os
+import atexit
+
+from functools import lru_cache
+from typing import NamedTuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import neo4j
+
+
+DEFAULT_DATABASE_NAME = 'himalayandb'
+
+
+class Neo4jSettings(NamedTuple):
+    server_url: str
+    database_name: str
+    username: str
+    password: str
+
+
+@lru_cache(maxsize=None)
+def get_neo4j_settings() -> Neo4jSettings:
+    """
+    Get the Neo4j connection settings from the environment variables. The .env file is loaded the first time the
+    settings are needed instead of when the scripts are imported
+    :return: The Neo4j server URL, database name, username and password
+    """
+    from dotenv import load_dotenv
+    load_dotenv()
+    return Neo4jSettings(server_url=os.environ.get('NEO4J_SERVER_URL'),
+                         database_name=os.environ.get('NEO4J_DATABASE_NAME') or DEFAULT_DATABASE_NAME,
+                         username=os.environ.get('NEO4J_SERVER_USERNAME'),
+                         password=os.environ.get('NEO4J_SERVER_PASSWORD'))
+
+
+def get_neo4j_driver() -> 'neo4j.Driver':
+    """
+    Connect to the Neo4j server
+    :return: The Neo4j driver
+    """
+    import neo4j
+    settings = get_neo4j_settings()
+    try:
+        return neo4j.GraphDatabase.driver(settings.server_url, auth=(settings.username, settings.password))
+    except Exception as e:
+        print('Error connecting to the Neo4j server', e)
+        raise e
+
+
+@lru_cache(maxsize=None)
+def get_shared_neo4j_driver() -> 'neo4j.Driver':
+    """
+    Get the driver shared by the read-side clients of the process. The driver is thread safe and pools its
+    connections, so the clients reuse the opened connections instead of connecting to the server for each query. The
+    driver is closed when the process exits
+    :return: The shared Neo4j driver
+    """
+    driver = get_neo4j_driver()
+    atexit.register(driver.close)
+    return driver
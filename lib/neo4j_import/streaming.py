@@ -0,0 +1,92 @@
+import csv
+import heapq
+import tempfile
+import pandas as pd
+
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+
+# The number of rows of the csv files read, sorted and imported at once
+CHUNK_SIZE = 10000
+
+
+def _sort_key(header: List[str], by: List[str], numeric_columns: List[str]) -> Callable[[List[str]], Tuple]:
+    """
+    Create the sort key of the rows read from a csv file, which sorts like pandas the values of the numeric columns by
+    number, the other values as strings and the missing values last
+    :param header: The columns of the csv file
+    :param by: The sorted columns
+    :param numeric_columns: The sorted columns with a numeric type
+    :return: A function returning the sort key of a csv row
+    """
+    positions = [(header.index(column), column in numeric_columns) for column in by]
+
+    def key(row: List[str]) -> Tuple:
+        # The empty values are sorted last, as the missing values sorted by pandas in the runs and in memory
+        return tuple((row[i] == '', float(row[i]) if numeric and row[i] != '' else row[i]) for i, numeric in positions)
+    return key
+
+
+def external_sort_csv(source_file: Path, target_file: Path, by: List[str], chunk_size: int = CHUNK_SIZE,
+                      usecols: List[str] = None) -> Path:
+    """
+    Sort a csv file larger than the memory. The file is read in chunks, each chunk is sorted and written to a temporary
+    run file, and the sorted runs are merged row by row into the target file. So only a chunk of the file is in memory
+    at any time. The sort is stable: the rows with the same sort values keep the order of the source file
+    :param source_file: The csv file to sort
+    :param target_file: The sorted csv file
+    :param by: The columns to sort by
+    :param chunk_size: The number of rows sorted in memory at once
+    :param usecols: The columns to keep in the sorted file, by default all the columns
+    :return: The path of the sorted csv file
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        run_files = []
+        numeric_columns = set()
+        for i, chunk in enumerate(pd.read_csv(source_file, encoding='utf-8', engine='python', usecols=usecols,
+                                              chunksize=chunk_size)):
+            numeric_columns.update(column for column in by if pd.api.types.is_numeric_dtype(chunk[column]))
+            run_file = Path(temp_dir) / f'run-{i}.csv'
+            chunk.sort_values(by=by, kind='mergesort').to_csv(run_file, index=False)
+            run_files.append(run_file)
+        if not run_files:
+            # The source file has no rows
+            pd.read_csv(source_file, encoding='utf-8', usecols=usecols, nrows=0).to_csv(target_file, index=False)
+            return target_file
+        run_handles = [open(run_file, 'r', encoding='utf-8', newline='') for run_file in run_files]
+        try:
+            readers = [csv.reader(run_handle) for run_handle in run_handles]
+            headers = [next(reader) for reader in readers]
+            with open(target_file, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(headers[0])
+                # heapq.merge takes the row of the first run on ties, which keeps the sort stable
+                writer.writerows(heapq.merge(*readers, key=_sort_key(headers[0], by, list(numeric_columns))))
+        finally:
+            for run_handle in run_handles:
+                run_handle.close()
+    return target_file
+
+
+def last_rows(chunks: Iterable[pd.DataFrame], key: str) -> Iterator[pd.DataFrame]:
+    """
+    Keep the last row of each key value of chunks sorted by key, without loading all the chunks. The rows of the last
+    key value of a chunk may continue in the next chunk, so they are carried over to it
+    :param chunks: The dataframe chunks, sorted by key
+    :param key: The key column
+    :return: An iterator of dataframes with the last row of each key value
+    """
+    carried_rows = None
+    for chunk in chunks:
+        if carried_rows is not None:
+            chunk = pd.concat([carried_rows, chunk], ignore_index=True)
+        if chunk.empty:
+            continue
+        last_key = chunk[key].iloc[-1]
+        carried_rows = chunk[chunk[key] == last_key]
+        complete_rows = chunk[chunk[key] != last_key]
+        if not complete_rows.empty:
+            yield complete_rows.drop_duplicates(subset=[key], keep='last')
+    if carried_rows is not None and not carried_rows.empty:
+        yield carried_rows.tail(1)
@@ -0,0 +1,6 @@
+// Get all the expeditions, their members and the peaks climbed by the expeditions
+MATCH (m:Member)-[:LED|JOINED|WORKED_FOR]->(e:Expedition)-[:CLIMBED|ATTEMPTED]->(:Route)-[:ON_PEAK]->(p:Peak)
+// Return the nodes for which the precomputed aggregates are missing (there should be none)
+WITH e, m, p
+WHERE e.nbParticipants IS NULL OR m.nbExpeditions IS NULL OR p.nbExpeditions IS NULL
+RETURN DISTINCT e, m, p
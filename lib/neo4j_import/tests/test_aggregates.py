@@ -0,0 +1,48 @@
+import pandas as pd
+
+from lib.neo4j_import.aggregates import compute_peak_aggregates, compute_expedition_aggregates, \
+    compute_member_aggregates
+
+
+exped_df = pd.DataFrame({
+    'EXPID': ['EVER53101', 'EVER60101', 'LHOT70101'],
+    'YEAR': [1953, 1960, 1970],
+    'PEAKID': ['EVER', 'EVER', 'LHOT'],
+    'SUCCESS1': [True, False, False],
+    'SUCCESS2': [False, True, False],
+    'SUCCESS3': [False, False, None],
+    'SUCCESS4': [False, False, None]
+})
+members_df = pd.DataFrame({
+    'EXPID': ['EVER53101', 'EVER53101', 'EVER60101', 'EVER60101', 'LHOT70101'],
+    'MYEAR': [1953, 1953, 1960, 1960, 1970],
+    'PEAKID': ['EVER', 'EVER', 'EVER', 'EVER', 'LHOT'],
+    'PERSID': [1, 2, 1, 3, 1],
+    'MSUCCESS': [True, True, True, False, False],
+    'DEATH': [False, False, False, True, False]
+})
+peaks_df = pd.DataFrame({'PEAKID': ['EVER', 'LHOT'], 'HEIGHTM': [8849, 8516]})
+
+
+def test_peak_aggregates():
+    aggregates_df = compute_peak_aggregates(exped_df, members_df).set_index('PEAKID')
+    assert aggregates_df.loc['EVER', ['NB_EXPEDITIONS', 'NB_SUCCESSFUL_EXPEDITIONS', 'NB_SUMMITS', 'NB_DEATHS']] \
+               .tolist() == [2, 2, 3, 1]
+    assert aggregates_df.loc['EVER', 'DEATH_RATE'] == 0.25
+    assert aggregates_df.loc['EVER', 'FIRST_SUMMIT_YEAR'] == 1953
+    # Peaks never summited have no first summit year
+    assert aggregates_df.loc['LHOT', 'NB_SUMMITS'] == 0
+    assert aggregates_df.loc['LHOT', 'FIRST_SUMMIT_YEAR'] is None
+
+
+def test_expedition_aggregates():
+    aggregates_df = compute_expedition_aggregates(members_df).set_index(['EXPID', 'YEAR'])
+    assert aggregates_df.loc[('EVER60101', 1960)].tolist() == [2, 1, 1, 0.5, 0.5]
+
+
+def test_member_aggregates():
+    aggregates_df = compute_member_aggregates(members_df, peaks_df).set_index('PERSID')
+    # Member 1 summited Everest twice and attempted Lhotse
+    assert aggregates_df.loc[1].tolist() == [3, 2, 2, 1, 1953, 1970, 1953]
+    assert aggregates_df.loc[3, 'NB_SUMMITS'] == 0
+    assert aggregates_df.loc[3, 'FIRST_SUMMIT_YEAR'] is None
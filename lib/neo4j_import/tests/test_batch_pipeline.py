@@ -0,0 +1,50 @@
+import time
+import pytest
+import pandas as pd
+
+from lib.neo4j_import.batch_pipeline import prepare_batches, BatchPrefetcher
+
+
+def test_prepare_batches():
+    chunks = [pd.DataFrame({'PEAKID': ['EVER', 'LHOT', 'MAKA'], 'PKNAME2': [None, 'Lhotse Main', None]}),
+              pd.DataFrame({'PEAKID': ['CHOY'], 'PKNAME2': [None]})]
+    batches = list(prepare_batches(chunks, batch_size=2))
+    # The batches do not span the chunks and the missing strings are empty strings
+    assert [len(batch) for batch in batches] == [2, 1, 1]
+    assert batches[0] == [{'PEAKID': 'EVER', 'PKNAME2': ''}, {'PEAKID': 'LHOT', 'PKNAME2': 'Lhotse Main'}]
+
+
+def test_batch_prefetcher():
+    prepared = []
+
+    def items():
+        for i in range(10):
+            prepared.append(i)
+            yield i
+
+    with BatchPrefetcher(items(), max_size=2) as prefetcher:
+        consumed = []
+        for item in prefetcher:
+            # The producer prepares at most the queued items and the one waiting for room ahead of the consumer
+            time.sleep(0.01)
+            assert len(prepared) - len(consumed) <= 4
+            consumed.append(item)
+    assert consumed == list(range(10))
+    stats = prefetcher.stats()
+    assert stats['BATCHES'] == 10 and stats['MEAN_QUEUE_DEPTH'] > 0
+
+
+def test_batch_prefetcher_errors():
+    def failing_items():
+        yield 1
+        raise ValueError('Invalid chunk')
+
+    # The preparation errors are raised in the consumer thread
+    with pytest.raises(ValueError):
+        with BatchPrefetcher(failing_items()) as prefetcher:
+            list(prefetcher)
+    # The producer is stopped when the consumer stops early
+    with BatchPrefetcher(iter(range(1000)), max_size=1) as prefetcher:
+        for item in prefetcher:
+            break
+    assert not prefetcher._producer.is_alive()
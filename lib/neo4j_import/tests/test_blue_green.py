@@ -0,0 +1,48 @@
+import pandas as pd
+
+from lib.neo4j_import.neo4j_import import compute_data_version, compute_frames_version, DATA_VERSION_LENGTH
+from lib.neo4j_import.blue_green import version_database_name, is_version_database, reimport_database_name
+
+
+def test_data_version(tmp_path):
+    (tmp_path / 'exped.csv').write_text('EXPID,YEAR\nEVER53101,1953\n', encoding='utf-8')
+    (tmp_path / 'members.csv').write_text('EXPID,MYEAR,MEMBID\nEVER53101,1953,1\n', encoding='utf-8')
+    files = [tmp_path / 'exped.csv', tmp_path / 'members.csv']
+    version = compute_data_version(files)
+    assert len(version) == DATA_VERSION_LENGTH
+    assert compute_data_version(files) == version
+    # The version changes with the data and with the import options
+    assert compute_data_version(files, 'test=100') != version
+    (tmp_path / 'members.csv').write_text('EXPID,MYEAR,MEMBID\nEVER53101,1953,2\n', encoding='utf-8')
+    assert compute_data_version(files) != version
+
+
+def test_version_database_name():
+    assert version_database_name('himalayandb', '0123456789ab') == 'himalayandb-0123456789ab'
+
+
+def test_frames_version():
+    frames = {'expeditions': pd.DataFrame({'EXPID': ['EVER53101'], 'YEAR': [1953]}),
+              'members': pd.DataFrame({'EXPID': ['EVER53101'], 'MEMBID': [1]})}
+    version = compute_frames_version(frames)
+    assert len(version) == DATA_VERSION_LENGTH
+    # The version does not depend on the index of the dataframes
+    assert compute_frames_version({table: df.set_axis([5]) for table, df in frames.items()}) == version
+    # The version changes with the data, the columns and the import options
+    assert compute_frames_version(frames, 'test=100') != version
+    assert compute_frames_version({**frames, 'members': frames['members'].assign(MEMBID=2)}) != version
+    assert compute_frames_version({**frames, 'members': frames['members'].rename(columns={'MEMBID': 'ID'})}) \
+        != version
+
+
+def test_reimport_database_name():
+    assert is_version_database('himalayandb-0123456789ab', 'himalayandb', '0123456789ab')
+    assert is_version_database('himalayandb-0123456789ab-2', 'himalayandb', '0123456789ab')
+    assert not is_version_database('himalayandb-ba9876543210', 'himalayandb', '0123456789ab')
+    assert not is_version_database(None, 'himalayandb', '0123456789ab')
+    # The database of a version imported again does not replace the existing databases of the version
+    assert reimport_database_name('himalayandb', '0123456789ab', ['himalayandb-0123456789ab']) == \
+        'himalayandb-0123456789ab-2'
+    assert reimport_database_name('himalayandb', '0123456789ab',
+                                  ['himalayandb-0123456789ab', 'himalayandb-0123456789ab-2']) == \
+        'himalayandb-0123456789ab-3'
@@ -0,0 +1,54 @@
+import pandas as pd
+
+from lib.neo4j_import.dimensions import compute_expedition_dimensions, compute_peak_dimensions, add_peak_locations
+
+
+exped_df = pd.DataFrame({
+    'EXPID': ['EVER53101', 'EVER60101', 'LHOT70101'],
+    'PEAKID': ['EVER', 'EVER', 'LHOT'],
+    'AGENCY': [None, 'Asian Trekking', 'Asian Trekking'],
+    'HOST_DESC': ['Nepal', 'China', 'Nepal'],
+    'ROUTE1': ['S Col-SE Ridge', 'N Col-NE Ridge', 'W Face'],
+    'ROUTE2': [None, 'S Col-SE Ridge', None],
+    'ROUTE3': [None, None, None],
+    'ROUTE4': [None, None, 'W Face']
+})
+peaks_df = pd.DataFrame({
+    'PEAKID': ['EVER', 'LHOT', 'CHOY', 'KANJ', 'DHA1', 'UNKN'],
+    'RANGE': ['Khumbu', 'Khumbu', None, 'Kanjiroba', 'Dhaulagiri', None],
+    'DISTRICT': ['Solukhumbu/NC', 'Solukhumbu', 'NC/Solukhumbu ', 'Dolpa/Mustang', 'Myagdi', 'Humla'],
+    'PROVINCE': ['Koshi', 'Koshi', 'Koshi', 'Karnali ', 'Gandaki', None]
+})
+
+
+def test_expedition_dimensions():
+    dimensions = compute_expedition_dimensions(exped_df)
+    assert dimensions['peaks']['PEAKID'].tolist() == ['EVER', 'LHOT']
+    assert dimensions['agencies']['NAME'].tolist() == ['Asian Trekking']
+    assert dimensions['countries']['NAME'].tolist() == ['Nepal', 'China']
+    # The routes are distinct by name and peak
+    assert sorted(dimensions['routes']['NAME'].tolist()) == ['N Col-NE Ridge (EVER)', 'S Col-SE Ridge (EVER)',
+                                                             'W Face (LHOT)']
+
+
+def test_peak_dimensions():
+    dimensions = compute_peak_dimensions(peaks_df)
+    assert dimensions['ranges']['NAME'].tolist() == ['Khumbu', 'Kanjiroba', 'Dhaulagiri']
+    assert dimensions['provinces']['NAME'].tolist() == ['Koshi', 'Karnali', 'Gandaki']
+    # The NC and NI codes are not districts, and the peaks without a province are not located
+    assert dimensions['districts']['NAME'].tolist() == ['Solukhumbu', 'Dolpa', 'Mustang', 'Myagdi']
+    assert dimensions['countries']['NAME'].tolist() == ['Nepal', 'China']
+    # The districts of the peaks at the border of two provinces are not linked to the province
+    assert dimensions['district_provinces'].values.tolist() == [['Solukhumbu', 'Koshi'], ['Myagdi', 'Gandaki']]
+
+
+def test_peak_locations():
+    located_df = add_peak_locations(peaks_df).set_index('PEAKID')
+    assert located_df.loc['EVER', 'DISTRICTS'] == ['Solukhumbu']
+    assert located_df.loc['EVER', 'COUNTRIES'] == ['Nepal', 'China']
+    assert located_df.loc['CHOY', 'COUNTRIES'] == ['China', 'Nepal']
+    # The peaks in a single district have no country
+    assert located_df.loc['LHOT', 'COUNTRIES'] == []
+    assert located_df.loc['KANJ', 'DISTRICTS'] == []
+    assert located_df.loc['KANJ', 'COUNTRIES'] == ['Nepal']
+    assert located_df.loc['UNKN', 'DISTRICTS'] == []
@@ -0,0 +1,40 @@
+import json
+import pandas as pd
+
+from lib.neo4j_import.import_profiler import flatten_profile, summarize_profile, save_profile_report, PROFILE_COLUMNS
+
+
+profile = {
+    'operatorType': 'ProduceResults@neo4j', 'dbHits': 0, 'rows': 0, 'args': {'EstimatedRows': 10.0},
+    'children': [{
+        'operatorType': 'MergeCreateNode@neo4j', 'dbHits': 120, 'rows': 50,
+        'args': {'Details': 'MERGE (e:Expedition {expeditionId: row.EXPID})', 'EstimatedRows': 10.0},
+        'children': [{
+            'operatorType': 'Eager@neo4j', 'dbHits': 0, 'rows': 50, 'args': {'EstimatedRows': 10.0},
+            'children': [{
+                'operatorType': 'NodeByLabelScan@neo4j', 'dbHits': 5001, 'rows': 5000,
+                'args': {'Details': 'p:Peak', 'EstimatedRows': 100.0}, 'children': []
+            }]
+        }]
+    }]
+}
+
+
+def test_flatten_profile():
+    operators_df = pd.DataFrame(flatten_profile(profile), columns=PROFILE_COLUMNS)
+    assert operators_df['OPERATOR'].tolist() == ['ProduceResults', 'MergeCreateNode', 'Eager', 'NodeByLabelScan']
+    assert operators_df['DEPTH'].tolist() == [0, 1, 2, 3]
+    assert operators_df['ROWS'].tolist() == [0, 50, 50, 5000]
+    summary = summarize_profile(operators_df)
+    assert summary == {'DB_HITS': 5121, 'EAGER': 1, 'SCANS': ['p:Peak']}
+
+
+def test_save_profile_report(tmp_path):
+    report_file = save_profile_report(profile, 'import-exped', tmp_path / 'profiles', batch_index=0, batch_rows=50)
+    assert report_file == tmp_path / 'profiles' / 'import-exped.txt'
+    report = report_file.read_text(encoding='utf-8')
+    assert 'Profiled batch: 0 (50 rows)' in report
+    assert 'Label scans: p:Peak' in report
+    assert json.loads(report_file.with_suffix('.json').read_text(encoding='utf-8')) == profile
+    # The queries without a profile have no report
+    assert save_profile_report(None, 'import-peaks', tmp_path, batch_index=0, batch_rows=50) is None
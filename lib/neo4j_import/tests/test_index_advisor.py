@@ -0,0 +1,41 @@
+from lib.neo4j_import.index_advisor import load_workload, declared_indexes, find_label_scans, suggest_index
+
+
+def test_load_workload(tmp_path):
+    workload_file = tmp_path / 'workload.cypher'
+    workload_file.write_text("""// Expeditions of a year
+MATCH (e:Expedition) WHERE e.year = 2019 RETURN e;
+MATCH (m:Member) WHERE m.lastName = 'Messner'
+RETURN m;
+// No query after the last semicolon
+""")
+    queries = load_workload(workload_file)
+    assert list(queries.keys()) == ['workload:1', 'workload:2']
+    assert queries['workload:2'] == "MATCH (m:Member) WHERE m.lastName = 'Messner'\nRETURN m"
+
+
+def test_declared_indexes():
+    indexes = declared_indexes()
+    assert ('Expedition', 'year') in indexes
+    assert ('WORKED_FOR', 'death') in indexes
+    assert ('Peak', 'location') in indexes
+    assert len(indexes) == 11
+
+
+def test_find_label_scans():
+    # Plan of MATCH (e:Expedition)<-[r:LED]-(m) WHERE e.year > 2000 AND r.death RETURN m
+    plan = {'operatorType': 'ProduceResults@neo4j', 'args': {'Details': 'm'}, 'children': [
+        {'operatorType': 'Filter@neo4j', 'args': {'Details': 'e:Expedition AND cache[e.year] > $autoint_0'},
+         'children': [
+             {'operatorType': 'Filter@neo4j', 'args': {'Details': 'r.death'}, 'children': [
+                 {'operatorType': 'DirectedRelationshipTypeScan@neo4j',
+                  'args': {'Details': '(m)-[r:LED]->(e)', 'EstimatedRows': 500.0}, 'children': []}]}]},
+        {'operatorType': 'NodeByLabelScan@neo4j', 'args': {'Details': 'p:Peak', 'EstimatedRows': 480.0},
+         'children': []}]}
+    scans = find_label_scans(plan)
+    assert scans == [{'OPERATOR': 'DirectedRelationshipTypeScan', 'VARIABLE': 'r', 'LABEL': 'LED',
+                      'ESTIMATED_ROWS': 500.0, 'FILTERED_PROPERTIES': ['death']},
+                     {'OPERATOR': 'NodeByLabelScan', 'VARIABLE': 'p', 'LABEL': 'Peak', 'ESTIMATED_ROWS': 480.0,
+                      'FILTERED_PROPERTIES': []}]
+    assert suggest_index('DirectedRelationshipTypeScan', 'LED', 'death') == \
+           'CREATE INDEX IF NOT EXISTS FOR ()-[r:LED]-() ON (r.death);'
@@ -2,13 +2,14 @@
 # This code is based on the code from the following articles:
 # Alexey Smirnov (2020, Sept 6). Testing database with pytest. https://smirnov-am.github.io/pytest-testing_database/
 # Alexey Smirnov (2020, Sept 6). Advanced fixtures with pytest. https://smirnov-am.github.io/pytest-advanced-fixtures/
+import re
 import pytest
 
 from pathlib import Path
 from typing import List
 from neo4j import Result
 
-from lib.neo4j_import.neo4j_import import HimalayasDatabaseImport
+from lib.neo4j_import.neo4j_import import HimalayasDatabaseImport, INDEXES
 
 
 # Some expeditions have been creating issues during the import, we list some of them here to test that they are imported
@@ -69,6 +70,8 @@ def setup_neo4j_test_db(neo4j_test_db):
     neo4j_test_db.import_expeditions_data(test=just_testing)
     neo4j_test_db.import_members_data(test=just_testing)
     neo4j_test_db.import_peaks_data(test=just_testing)
+    neo4j_test_db.import_aggregates(test=just_testing)
+    neo4j_test_db.create_indexes()
 
 
 @pytest.fixture
@@ -146,3 +149,32 @@ def test_districts(db_cache):
     nb_districts = len(query_res)
     assert nb_districts == 0, f"There should be no district not part of any province. Found {nb_districts}" \
                               " districts in no province."
+
+
+def test_aggregates(db_cache):
+    # Test that the aggregates have been set on all the expeditions, their members and the peaks they climbed
+    query_res = db_cache.run_test_query(test_path, 'test-missing-aggregates.cypher')
+    nb_nodes = len(query_res)
+    assert nb_nodes == 0, "All Expeditions, Members and Peaks should have their precomputed aggregates. Found " \
+                          f"{nb_nodes} expeditions subgraphs with missing aggregates."
+    # Test that the query finds a peak missing its aggregates, in a transaction rolled back to keep the test database
+    missing_aggregates_query = test_path.with_name('test-missing-aggregates.cypher').read_text()
+    with db_cache.test_db.driver.session(database=db_cache.test_db.db_name) as session:
+        with session.begin_transaction() as tx:
+            peak_id = tx.run('MATCH (:Route)-[:ON_PEAK]->(p:Peak) WITH DISTINCT p LIMIT 1 '
+                             'REMOVE p.nbExpeditions RETURN p.peakId AS peakId').single()['peakId']
+            query_res = list(tx.run(missing_aggregates_query))
+            tx.rollback()
+    assert len(query_res) > 0 and all(record['p']['peakId'] == peak_id for record in query_res), \
+        "The peaks missing their precomputed aggregates should be found."
+
+
+def test_indexes(neo4j_test_db):
+    # Test that all the declared indexes have been created and are online
+    declared_indexes = {re.search(r'CREATE (?:POINT )?INDEX (\w+)', index).group(1) for index in INDEXES}
+    with neo4j_test_db.driver.session(database=neo4j_test_db.db_name) as session:
+        online_indexes = {record['name'] for record in session.run('SHOW INDEXES YIELD name, state '
+                                                                   'WHERE state = "ONLINE" RETURN name')}
+    missing_indexes = declared_indexes - online_indexes
+    assert len(missing_indexes) == 0, f"All the declared indexes should be online. Found {len(missing_indexes)} " \
+                                      f"missing or offline indexes: {missing_indexes}"
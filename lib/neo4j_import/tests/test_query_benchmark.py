@@ -0,0 +1,50 @@
+from lib.neo4j_import.benchmark.query_benchmark import load_query_set, latency_percentiles, sum_db_hits, \
+    compare_results, save_results, load_latest_results, QUERY_SET_VERSION
+
+
+def test_query_set():
+    queries, version = load_query_set()
+    # The query set contains the benchmark queries and the tests queries
+    assert 'peak-summits' in queries
+    assert 'test-members-mesh' in queries
+    assert version.startswith(f'{QUERY_SET_VERSION}-')
+    assert load_query_set()[1] == version
+
+
+def test_query_set_version_changes(tmp_path):
+    (tmp_path / 'count.cypher').write_text('MATCH (p:Peak) RETURN count(p)')
+    _, version = load_query_set([(tmp_path, '*.cypher')])
+    (tmp_path / 'count.cypher').write_text('MATCH (e:Expedition) RETURN count(e)')
+    assert load_query_set([(tmp_path, '*.cypher')])[1] != version
+
+
+def test_latency_percentiles():
+    percentiles = latency_percentiles([i / 1000 for i in range(1, 101)])
+    assert percentiles['p50_ms'] == 50.5
+    assert 95 <= percentiles['p95_ms'] < percentiles['p99_ms'] <= 100
+
+
+def test_sum_db_hits():
+    profile = {'operatorType': 'ProduceResults', 'dbHits': 0, 'children': [
+        {'operatorType': 'Filter', 'dbHits': 10, 'children': [
+            {'operatorType': 'NodeByLabelScan', 'dbHits': 11, 'children': []}]},
+        {'operatorType': 'Argument', 'dbHits': 1}]}
+    assert sum_db_hits(profile) == 22
+    assert sum_db_hits(None) == 0
+
+
+def test_compare_results(tmp_path):
+    def results(started_at, query_hash, p50):
+        return {'query_set_version': '1-abc', 'started_at': started_at, 'queries': {
+            'peaks': {'hash': 'a', 'p50_ms': p50, 'p95_ms': 2 * p50, 'p99_ms': 3 * p50, 'db_hits': 100},
+            'changed': {'hash': query_hash, 'p50_ms': p50, 'p95_ms': p50, 'p99_ms': p50, 'db_hits': 1}}}
+
+    save_results(results('2023-01-01T10:00:00', 'b', 10.0), tmp_path)
+    save_results(results('2023-01-02T10:00:00', 'b', 8.0), tmp_path)
+    baseline = load_latest_results(tmp_path)
+    assert baseline['started_at'] == '2023-01-02T10:00:00'
+    comparison_df = compare_results(baseline, results('2023-01-03T10:00:00', 'c', 12.0))
+    # The changed query is not compared
+    assert comparison_df['QUERY'].tolist() == ['peaks']
+    assert comparison_df.loc[0, 'P50_MS_BASELINE'] == 8.0
+    assert comparison_df.loc[0, 'P50_CHANGE'] == 0.5
@@ -0,0 +1,40 @@
+import pytest
+import pandas as pd
+
+from lib.neo4j_import.query_client import cache_key, ResultCache, radius_parameters, bounding_box_parameters
+
+
+def test_cache_key():
+    # The order of the parameters does not change the key, the version of the data does
+    assert cache_key('peak-summits', {'year': 2019, 'peakId': 'EVER'}, 'v1') == \
+        cache_key('peak-summits', {'peakId': 'EVER', 'year': 2019}, 'v1')
+    assert cache_key('peak-summits', None, 'v1') == cache_key('peak-summits', {}, 'v1')
+    assert cache_key('peak-summits', None, 'v1') != cache_key('peak-summits', None, 'v2')
+
+
+def test_result_cache():
+    cache = ResultCache(max_size=2)
+    cache.put('a', pd.DataFrame({'peak': ['Everest']}))
+    cache.put('b', pd.DataFrame({'peak': ['Lhotse']}))
+    # The returned results are copies of the cached results
+    cache.get('a')['peak'] = 'Changed'
+    assert cache.get('a')['peak'].tolist() == ['Everest']
+    # The least recently used result is evicted
+    cache.put('c', pd.DataFrame({'peak': ['Makalu']}))
+    assert cache.get('b') is None and cache.get('c') is not None
+    assert (cache.hits, cache.misses) == (3, 1)
+    cache.clear()
+    assert cache.get('a') is None
+
+
+def test_geographic_parameters():
+    # The radius is sent in meters
+    assert radius_parameters(27.98, 86.92, 10) == {'latitude': 27.98, 'longitude': 86.92, 'radius': 10000.0,
+                                                   'limit': 100}
+    assert bounding_box_parameters(27.8, 86.8, 28.1, 87.0, limit=5)['limit'] == 5
+    with pytest.raises(ValueError):
+        radius_parameters(127.98, 86.92, 10)
+    with pytest.raises(ValueError):
+        radius_parameters(27.98, 86.92, 0)
+    with pytest.raises(ValueError):
+        bounding_box_parameters(28.1, 86.8, 27.8, 87.0)
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from lib.neo4j_import.streaming import external_sort_csv, last_rows
+
+
+members_df = pd.DataFrame({
+    'PERSID': [30, 1000, 30, 2, 1000, 2, 30, 2],
+    'MYEAR': [1990, 1975, 1985, 2001, 1975, 1999, 1990, 2001],
+    'MSEASON': [1, 3, 1, 3, 1, 1, 3, 1],
+    'RESIDENCE': ['Paris', 'Lyon', None, 'Khumjung', 'Lyon, France', 'Kathmandu', 'Nice', 'Namche'],
+    'MEMO': ['first "quoted"\nline', '', 'a,b', None, 'x', 'y', 'z', 'w']
+})
+
+
+def test_external_sort_csv(tmp_path):
+    members_df.to_csv(tmp_path / 'members.csv', index=False)
+    sorted_file = external_sort_csv(tmp_path / 'members.csv', tmp_path / 'sorted.csv',
+                                    by=['PERSID', 'MYEAR', 'MSEASON'], chunk_size=3)
+    expected_df = pd.read_csv(tmp_path / 'members.csv').sort_values(by=['PERSID', 'MYEAR', 'MSEASON'],
+                                                                    kind='mergesort', ignore_index=True)
+    pd.testing.assert_frame_equal(pd.read_csv(sorted_file), expected_df)
+    # Only the selected columns are kept
+    sorted_file = external_sort_csv(tmp_path / 'members.csv', tmp_path / 'sorted.csv', by=['PERSID'],
+                                    chunk_size=3, usecols=['PERSID', 'RESIDENCE'])
+    assert pd.read_csv(sorted_file).columns.tolist() == ['PERSID', 'RESIDENCE']
+    # The missing sort values spread across the chunks are sorted last, as in memory
+    pd.DataFrame({'K': [3, None, 1, None, 2, 5], 'NAME': ['c', None, 'a', 'b', None, 'e']}) \
+        .to_csv(tmp_path / 'missing.csv', index=False)
+    for by in [['K'], ['NAME']]:
+        sorted_file = external_sort_csv(tmp_path / 'missing.csv', tmp_path / 'sorted.csv', by=by, chunk_size=2)
+        expected_df = pd.read_csv(tmp_path / 'missing.csv').sort_values(by=by, kind='mergesort', ignore_index=True)
+        pd.testing.assert_frame_equal(pd.read_csv(sorted_file), expected_df)
+
+
+def test_last_rows():
+    sorted_df = members_df.sort_values(by=['PERSID', 'MYEAR', 'MSEASON'], kind='mergesort', ignore_index=True)
+    expected_df = sorted_df.drop_duplicates(subset=['PERSID'], keep='last')
+    # The rows of the members are split across the chunks
+    for chunk_size in [1, 2, 3, len(sorted_df)]:
+        chunks = [sorted_df.iloc[i:i + chunk_size] for i in range(0, len(sorted_df), chunk_size)]
+        result_df = pd.concat(list(last_rows(chunks, key='PERSID')))
+        pd.testing.assert_frame_equal(result_df.reset_index(drop=True), expected_df.reset_index(drop=True))
+    assert list(last_rows([], key='PERSID')) == []
@@ -0,0 +1,87 @@
+import pytest
+import pandas as pd
+
+from lib.neo4j_import.validation import validate_data, assert_valid_data
+
+
+def valid_tables():
+    exped_df = pd.DataFrame({
+        'EXPID': ['EVER53101', 'LHOT70101'],
+        'YEAR': [1953, 1970],
+        'PEAKID': ['EVER', 'LHOT'],
+        'SEASON_DESC': ['Spring', 'Autumn'],
+        'HOST_DESC': ['Nepal', None],
+        'TERMREASON_DESC': ['Success (main peak)', 'Unknown'],
+        'BCDATE': ['1953-04-12', None],
+        'SMTDATE': ['1953-05-29', ''],
+        'TERMDATE': [None, None],
+        'SMTTIME': ['11:30+0545', None],
+        'SUCCESS1': [True, False], 'ROUTE1': ['S Col-SE Ridge', None],
+        'SUCCESS2': [False, False], 'ROUTE2': [None, None],
+        'SUCCESS3': [False, False], 'ROUTE3': [None, None],
+        'SUCCESS4': [False, False], 'ROUTE4': [None, None]
+    })
+    members_df = pd.DataFrame({
+        'EXPID': ['EVER53101', 'EVER53101', 'LHOT70101'],
+        'MYEAR': [1953, 1953, 1970],
+        'MEMBID': [1, 2, 1],
+        'SEX': ['M', 'M', 'F'],
+        'LEADER': [True, False, True],
+        'HIRED': [False, True, False],
+        'MSMTDATE1': ['1953-05-29', '1953-05-29', None],
+        'DEATHDATE': [None, None, None],
+        'INJURYDATE': [None, None, None],
+        'MSMTTIME1': ['11:30+0545', '11:30+0545', None],
+        'DEATHTIME': [None, None, None],
+        'INJURYTIME': [None, None, None],
+        'DEATHTYPE_DESC': ['Unspecified', 'Unspecified', 'Unspecified'],
+        'DEATHCLASS_DESC': ['Unspecified', 'Unspecified', 'Unspecified'],
+        'INJURYTYPE_DESC': ['Unspecified', 'Unspecified', 'Unspecified'],
+        'MSMTBID_DESC': ['Unspecified', 'Unspecified', 'Unspecified'],
+        'MSMTTERM_DESC': ['Success', 'Success', 'Unspecified']
+    })
+    peaks_df = pd.DataFrame({'PEAKID': ['EVER', 'LHOT']})
+    return {'expeditions': exped_df, 'members': members_df, 'peaks': peaks_df}
+
+
+def test_valid_data():
+    assert validate_data(valid_tables()).empty
+    assert_valid_data(valid_tables())
+
+
+def test_all_violations_reported():
+    tables = valid_tables()
+    tables['expeditions'].loc[1, ['EXPID', 'YEAR']] = ['EVER53101', 1953]
+    tables['expeditions'].loc[0, 'SMTDATE'] = '1953-02-30'
+    tables['expeditions'].loc[0, 'SMTTIME'] = '25:00+0545'
+    tables['expeditions'].loc[1, 'SEASON_DESC'] = 'Monsoon'
+    tables['expeditions'].loc[1, 'SUCCESS2'] = True
+    tables['members'].loc[2, 'EXPID'] = 'MAKA70101'
+    tables['peaks'] = tables['peaks'].head(1)
+    violations_df = validate_data(tables).set_index(['TABLE', 'RULE'])
+    assert set(violations_df.index) == {('expeditions', 'duplicated key'), ('expeditions', 'invalid date'),
+                                        ('expeditions', 'invalid time'), ('expeditions', 'unknown code value'),
+                                        ('expeditions', 'successful route without name'),
+                                        ('members', 'unknown expeditions reference'),
+                                        ('expeditions', 'unknown peaks reference')}
+    assert violations_df.loc[('expeditions', 'duplicated key'), 'COUNT'] == 2
+    assert violations_df.loc[('expeditions', 'invalid date'), 'EXAMPLES'] == ['EVER53101 1953 1953-02-30']
+    assert violations_df.loc[('expeditions', 'unknown peaks reference'), 'SEVERITY'] == 'warning'
+    with pytest.raises(ValueError):
+        assert_valid_data(tables)
+
+
+def test_missing_columns():
+    tables = valid_tables()
+    tables['members'] = tables['members'].drop(columns=['DEATHTIME', 'MYEAR'])
+    violations_df = validate_data(tables)
+    assert violations_df['RULE'].tolist() == ['missing column']
+    assert violations_df['COLUMNS'].tolist() == ['DEATHTIME, MYEAR']
+
+
+def test_warnings_do_not_fail():
+    tables = valid_tables()
+    tables['members'].loc[0, 'SEX'] = 'X'
+    violations_df = validate_data(tables)
+    assert violations_df['SEVERITY'].tolist() == ['warning']
+    assert_valid_data(tables)
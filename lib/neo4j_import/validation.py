@@ -0,0 +1,262 @@
+import json
+import pandas as pd
+
+from pathlib import Path
+from functools import lru_cache
+from typing import Dict, List
+
+
+DESCRIPTIONS_FILE = Path(__file__).parent.parent / 'data_etl/hd_descrips.json'
+# The unique keys of the processed tables, they identify the nodes and relationships created by the import
+UNIQUE_KEYS = {
+    'expeditions': ['EXPID', 'YEAR'],
+    'members': ['EXPID', 'MYEAR', 'MEMBID'],
+    'peaks': ['PEAKID']
+}
+# The references between the tables as (table, columns, referenced table, referenced columns, severity) tuples. The
+# memberships of a member whose expedition does not exist are silently skipped by the MATCH of the import query. The
+# expeditions peaks without a row in the peaks table are created as Peak nodes without properties
+REFERENCES = [
+    ('members', ['EXPID', 'MYEAR'], 'expeditions', ['EXPID', 'YEAR'], 'error'),
+    ('expeditions', ['PEAKID'], 'peaks', ['PEAKID'], 'warning')
+]
+# The columns converted with the Cypher date() and time() functions, an empty value is imported as null
+DATE_COLUMNS = {
+    'expeditions': ['BCDATE', 'SMTDATE', 'TERMDATE'],
+    'members': ['MSMTDATE1', 'DEATHDATE', 'INJURYDATE']
+}
+TIME_COLUMNS = {
+    'expeditions': ['SMTTIME'],
+    'members': ['MSMTTIME1', 'DEATHTIME', 'INJURYTIME']
+}
+DATE_PATTERN = r'^\d{4}-\d{2}-\d{2}$'
+# The staging adds the Nepal time zone to the times, e.g. "09:45+0545"
+TIME_PATTERN = r'^([01]\d|2[0-3]):[0-5]\d(:[0-5]\d)?([+-]\d{4}|Z)?$'
+# The descriptions columns and the codes descriptions they are looked up from, and the other columns with a fixed set
+# of values, as (table, column, domain, severity) tuples. The domain is either the name of a descriptions dictionary or
+# the list of the allowed values
+DOMAINS = [
+    ('expeditions', 'SEASON_DESC', 'SEAS_DESC', 'error'),
+    ('expeditions', 'HOST_DESC', 'EXHOST_DESC', 'error'),
+    ('expeditions', 'TERMREASON_DESC', 'EXTERM_DESC', 'error'),
+    ('members', 'DEATHTYPE_DESC', 'MEMDEATHTYPE_DESC', 'error'),
+    ('members', 'DEATHCLASS_DESC', 'MEMDEATHCLASS_DESC', 'error'),
+    ('members', 'INJURYTYPE_DESC', 'MEMINJ_DESC', 'error'),
+    ('members', 'MSMTBID_DESC', 'MEMSUMMBID_DESC', 'error'),
+    ('members', 'MSMTTERM_DESC', 'MEMSUMMBIDTERM_DESC', 'error'),
+    ('members', 'SEX', ['M', 'F'], 'warning'),
+    # The LEADER and HIRED flags select the LED, WORKED_FOR or JOINED relationship of the membership
+    ('members', 'LEADER', [True, False], 'error'),
+    ('members', 'HIRED', [True, False], 'error')
+]
+# The expeditions successful routes must have a name, otherwise no Route node is created for the ascent
+ROUTES = [(f'SUCCESS{i}', f'ROUTE{i}') for i in range(1, 5)]
+VIOLATIONS_COLUMNS = ['TABLE', 'RULE', 'COLUMNS', 'SEVERITY', 'COUNT', 'EXAMPLES']
+# The number of violating values reported for each rule
+MAX_EXAMPLES = 5
+
+
+@lru_cache(maxsize=None)
+def load_descriptions() -> Dict[str, List[str]]:
+    """
+    Load the descriptions of the Himalayan Database codes, used by the staging to create the descriptions columns
+    :return: A dictionary of the list of the descriptions of each code
+    """
+    with DESCRIPTIONS_FILE.open('r') as f:
+        return {name: list(descriptions.values()) for name, descriptions in json.load(f).items()}
+
+
+def _is_empty(column: pd.Series) -> pd.Series:
+    """
+    Get the empty values of a column, they are imported as an empty string or as null
+    :param column: The column
+    :return: A boolean series set to True for the NaN and empty string values
+    """
+    return column.isna() | (column.astype(str) == '')
+
+
+def _violation(df: pd.DataFrame, table: str, rule: str, columns: List[str], severity: str,
+               mask: pd.Series) -> Dict:
+    """
+    Create the violation of a rule by the rows of a table
+    :param df: The table dataframe
+    :param table: The name of the table
+    :param rule: The name of the rule
+    :param columns: The columns checked by the rule
+    :param severity: The severity of the violation, error or warning
+    :param mask: The boolean series of the rows violating the rule
+    :return: A dictionary with the TABLE, RULE, COLUMNS, SEVERITY, COUNT of violating rows and EXAMPLES of the key and
+    checked values of these rows
+    """
+    example_columns = list(dict.fromkeys(UNIQUE_KEYS.get(table, []) + columns))
+    examples = df.loc[mask, [column for column in example_columns if column in df.columns]] \
+        .drop_duplicates().head(MAX_EXAMPLES)
+    return {'TABLE': table, 'RULE': rule, 'COLUMNS': ', '.join(columns), 'SEVERITY': severity,
+            'COUNT': int(mask.sum()),
+            'EXAMPLES': [' '.join(str(value) for value in row) for row in examples.itertuples(index=False)]}
+
+
+def check_unique_key(df: pd.DataFrame, table: str, key: List[str]) -> List[Dict]:
+    """
+    Check that the key of a table is set and unique
+    :param df: The table dataframe
+    :param table: The name of the table
+    :param key: The key columns
+    :return: The list of the violations
+    """
+    violations = []
+    missing_key = pd.concat([_is_empty(df[column]) for column in key], axis=1).any(axis=1)
+    if missing_key.any():
+        violations.append(_violation(df, table, 'missing key', key, 'error', missing_key))
+    duplicated_key = df.duplicated(subset=key, keep=False) & ~missing_key
+    if duplicated_key.any():
+        violations.append(_violation(df, table, 'duplicated key', key, 'error', duplicated_key))
+    return violations
+
+
+def check_reference(df: pd.DataFrame, table: str, columns: List[str], referenced_df: pd.DataFrame,
+                    referenced_table: str, referenced_columns: List[str], severity: str) -> List[Dict]:
+    """
+    Check that the rows of a table reference existing rows of another table
+    :param df: The table dataframe
+    :param table: The name of the table
+    :param columns: The referencing columns
+    :param referenced_df: The referenced table dataframe
+    :param referenced_table: The name of the referenced table
+    :param referenced_columns: The referenced columns
+    :param severity: The severity of the violations
+    :return: The list of the violations
+    """
+    references = pd.MultiIndex.from_frame(df[columns])
+    referenced = pd.MultiIndex.from_frame(referenced_df[referenced_columns])
+    unknown_reference = pd.Series(~references.isin(referenced), index=df.index)
+    if unknown_reference.any():
+        return [_violation(df, table, f'unknown {referenced_table} reference', columns, severity, unknown_reference)]
+    return []
+
+
+def check_pattern(df: pd.DataFrame, table: str, column: str, rule: str, pattern: str,
+                  date_format: str = None) -> List[Dict]:
+    """
+    Check that the non-empty values of a column match a regular expression
+    :param df: The table dataframe
+    :param table: The name of the table
+    :param column: The checked column
+    :param rule: The name of the rule
+    :param pattern: The regular expression of the valid values
+    :param date_format: The format of the dates, to also check that the dates exist in the calendar (e.g. not 2001-02-30)
+    :return: The list of the violations
+    """
+    values = df[column].astype(str)
+    invalid = ~_is_empty(df[column]) & ~values.str.match(pattern)
+    if date_format:
+        invalid |= ~_is_empty(df[column]) & pd.to_datetime(values, format=date_format, errors='coerce').isna()
+    if invalid.any():
+        return [_violation(df, table, rule, [column], 'error', invalid)]
+    return []
+
+
+def check_domain(df: pd.DataFrame, table: str, column: str, values: List, severity: str) -> List[Dict]:
+    """
+    Check that the non-empty values of a column are in a set of allowed values
+    :param df: The table dataframe
+    :param table: The name of the table
+    :param column: The checked column
+    :param values: The allowed values
+    :param severity: The severity of the violations
+    :return: The list of the violations
+    """
+    unknown_value = ~_is_empty(df[column]) & ~df[column].isin(values)
+    if unknown_value.any():
+        return [_violation(df, table, 'unknown code value', [column], severity, unknown_value)]
+    return []
+
+
+def check_successful_routes(df: pd.DataFrame) -> List[Dict]:
+    """
+    Check that the successful routes of the expeditions have a name
+    :param df: The expeditions dataframe
+    :return: The list of the violations
+    """
+    violations = []
+    for success_column, route_column in ROUTES:
+        unnamed_route = df[success_column].fillna(False).astype(bool) & _is_empty(df[route_column])
+        if unnamed_route.any():
+            violations.append(_violation(df, 'expeditions', 'successful route without name',
+                                         [success_column, route_column], 'error', unnamed_route))
+    return violations
+
+
+def validate_data(tables: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Check the processed tables against the declared rules: unique keys, references between the tables, date and time
+    formats and code domains. All the rules are checked with vectorized operations on the whole tables, and all the
+    violations are reported instead of stopping at the first one
+    :param tables: The expeditions, members and peaks dataframes by table name
+    :return: A dataframe of the violations with the TABLE, RULE, COLUMNS, SEVERITY, COUNT and EXAMPLES columns
+    """
+    descriptions = load_descriptions()
+    violations = []
+    # The columns checked by the rules of each table
+    checked_columns = {table: set(key) for table, key in UNIQUE_KEYS.items()}
+    for table, columns, referenced_table, referenced_columns, _ in REFERENCES:
+        checked_columns[table].update(columns)
+        checked_columns[referenced_table].update(referenced_columns)
+    for table, columns in list(DATE_COLUMNS.items()) + list(TIME_COLUMNS.items()):
+        checked_columns[table].update(columns)
+    for table, column, _, _ in DOMAINS:
+        checked_columns[table].add(column)
+    checked_columns['expeditions'].update(column for route in ROUTES for column in route)
+    # Report the missing columns, the rules using them are skipped
+    missing_columns = {table: sorted(columns - set(tables[table].columns)) for table, columns in checked_columns.items()}
+    for table, columns in missing_columns.items():
+        if columns:
+            violations.append({'TABLE': table, 'RULE': 'missing column', 'COLUMNS': ', '.join(columns),
+                               'SEVERITY': 'error', 'COUNT': len(columns), 'EXAMPLES': []})
+
+    def has_columns(table: str, columns: List[str]) -> bool:
+        return not set(columns) & set(missing_columns[table])
+
+    for table, key in UNIQUE_KEYS.items():
+        if has_columns(table, key):
+            violations += check_unique_key(tables[table], table, key)
+    for table, columns, referenced_table, referenced_columns, severity in REFERENCES:
+        if has_columns(table, columns) and has_columns(referenced_table, referenced_columns):
+            violations += check_reference(tables[table], table, columns, tables[referenced_table], referenced_table,
+                                          referenced_columns, severity)
+    for table, columns in DATE_COLUMNS.items():
+        for column in columns:
+            if has_columns(table, [column]):
+                violations += check_pattern(tables[table], table, column, 'invalid date', DATE_PATTERN,
+                                          date_format='%Y-%m-%d')
+    for table, columns in TIME_COLUMNS.items():
+        for column in columns:
+            if has_columns(table, [column]):
+                violations += check_pattern(tables[table], table, column, 'invalid time', TIME_PATTERN)
+    for table, column, domain, severity in DOMAINS:
+        if has_columns(table, [column]):
+            values = descriptions[domain] if isinstance(domain, str) else domain
+            violations += check_domain(tables[table], table, column, values, severity)
+    if has_columns('expeditions', [column for route in ROUTES for column in route]):
+        violations += check_successful_routes(tables['expeditions'])
+    return pd.DataFrame(violations, columns=VIOLATIONS_COLUMNS)
+
+
+def assert_valid_data(tables: Dict[str, pd.DataFrame]):
+    """
+    Validate the processed tables and fail if a rule is violated with an error severity. The warnings are only reported
+    :param tables: The expeditions, members and peaks dataframes by table name
+    :return: None
+    """
+    violations_df = validate_data(tables)
+    if violations_df.empty:
+        print('The data passed all the validation rules')
+        return
+    pd.set_option('display.width', 200)
+    pd.set_option('display.max_colwidth', 120)
+    print(violations_df.to_string(index=False))
+    errors_df = violations_df[violations_df['SEVERITY'] == 'error']
+    if not errors_df.empty:
+        print(f'Error validating the data, {len(errors_df)} rules violated')
+        raise ValueError(f'The data violates {len(errors_df)} validation rules: '
+                         f'{", ".join(errors_df["TABLE"] + " " + errors_df["RULE"] + " (" + errors_df["COLUMNS"] + ")")}')
@@ -0,0 +1,231 @@
+import io
+import time
+import pstats
+import cProfile
+import argparse
+
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict, List, TYPE_CHECKING
+
+from lib.pipeline.sampling_profiler import SamplingProfiler
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+DATA_DIR = Path(__file__).parent.parent.parent / 'assets/data'
+RUNS_DIR = DATA_DIR / 'runs'
+# The pipeline stages in their execution order
+STAGES = ['collection', 'preprocessing', 'staging', 'merge', 'import']
+# The collection scrapes the websites and is run on demand, as in the DVC pipeline
+DEFAULT_STAGES = ['preprocessing', 'staging', 'merge', 'import']
+PROFILERS = ['none', 'cprofile', 'sampling']
+
+
+# The outputs of the stages are handed over in memory to the next stages of the run in args.frames, with the values of
+# their files. The files are still written, for DVC and for the runs of a single stage
+def _hand_over(args: argparse.Namespace, name: str, df: 'pd.DataFrame'):
+    if not args.read_files and df is not None:
+        from lib.pipeline.handoff import as_csv_values
+        args.frames[name] = as_csv_values(df)
+
+
+# The stages modules are only imported when the stage is run, so running a single stage does not load the dependencies
+# and data files of the other stages
+def _run_collection(args: argparse.Namespace):
+    from lib.data_collection.nhpp_collection import collect_peaks_data
+    collect_peaks_data(parse_only=args.parse_only, resume=args.resume, selenium=args.selenium,
+                       max_workers=args.workers)
+
+
+def _run_preprocessing(args: argparse.Namespace):
+    from lib.data_collection.nhpp_preprocessing import merge_nepal_peaks_datasets
+    _hand_over(args, 'nepal_peaks', merge_nepal_peaks_datasets())
+
+
+def _run_staging(args: argparse.Namespace):
+    from lib.data_etl.etl_staging import stage_hd_data
+    for table, df in stage_hd_data().items():
+        _hand_over(args, f'staged_{table}', df)
+
+
+def _run_merge(args: argparse.Namespace):
+    from lib.data_etl.merge_processing import merge_processed_data
+    staged_data = {table: args.frames.get(f'staged_{table}') for table in ['expeditions', 'members', 'peaks']}
+    # The staged files are read if the staging stage did not run in this run
+    if any(df is None for df in staged_data.values()):
+        staged_data = None
+    processed_data = merge_processed_data(nepal_peaks_df=args.frames.get('nepal_peaks'), staged_data=staged_data)
+    # The staged and preprocessed dataframes are not used by the next stages
+    args.frames.clear()
+    if processed_data is not None:
+        # The staged expeditions and members already have the values of their files, only the peaks are merged
+        args.frames.update(expeditions=processed_data['expeditions'], members=processed_data['members'])
+        _hand_over(args, 'peaks', processed_data['peaks'])
+
+
+def _run_import(args: argparse.Namespace):
+    # The query plan reports are saved with the timing summary of the run
+    profile_dir = args.output_dir / 'import-profiles' if args.profile_queries else None
+    # The data files are imported if the merge stage did not run in this run
+    data = {table: args.frames[table] for table in ['expeditions', 'members', 'peaks']} \
+        if 'expeditions' in args.frames else None
+    if args.blue_green:
+        from lib.neo4j_import.blue_green import import_blue_green
+        import_blue_green(alias=args.database, import_batch_size=args.batch_size, test=args.test,
+                          test_size=args.test_size, validate=not args.skip_validation, profile_dir=profile_dir,
+                          data=data)
+    else:
+        from lib.neo4j_import.neo4j_import import import_himalayas_database
+        import_himalayas_database(db_name=args.database, import_batch_size=args.batch_size, test=args.test,
+                                  test_size=args.test_size, validate=not args.skip_validation,
+                                  profile_dir=profile_dir, data=data)
+
+
+STAGE_FUNCTIONS: Dict[str, Callable[[argparse.Namespace], None]] = {
+    'collection': _run_collection,
+    'preprocessing': _run_preprocessing,
+    'staging': _run_staging,
+    'merge': _run_merge,
+    'import': _run_import
+}
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    """
+    Parse the command line arguments of the pipeline
+    :param argv: The command line arguments, by default the arguments of the process
+    :return: The parsed arguments, with the stages sorted in the pipeline order
+    """
+    parser = argparse.ArgumentParser(prog='python -m lib.pipeline',
+                                     description='Run the Himalayan Database collection, processing and Neo4j import '
+                                                 'pipeline')
+    parser.add_argument('stages', nargs='*',
+                        help=f'The stages to run among {", ".join(STAGES)}, by default {" ".join(DEFAULT_STAGES)}')
+    parser.add_argument('--output-dir', type=Path,
+                        help='The folder of the timing summary and profiles, by default a new folder in '
+                             'assets/data/runs')
+    parser.add_argument('--profile', choices=PROFILERS, default='none',
+                        help='Profile each stage with cProfile or with the low overhead sampling profiler')
+    parser.add_argument('--sampling-interval', type=float, default=0.005,
+                        help='The sampling interval in seconds of the sampling profiler')
+    parser.add_argument('--read-files', action='store_true',
+                        help='Read the outputs of the previous stages from their files instead of handing them over in '
+                             'memory')
+    collection = parser.add_argument_group('collection stage')
+    collection.add_argument('--parse-only', action='store_true',
+                            help='Only parse again the pages archived by a previous run, without accessing the '
+                                 'websites')
+    collection.add_argument('--resume', action='store_true', help='Resume the previous collection')
+    collection.add_argument('--selenium', action='store_true',
+                            help="Render the peaks' table with Selenium instead of requesting its data over HTTP")
+    collection.add_argument('--workers', type=int, default=None,
+                            help='Number of parser worker processes, by default the number of CPUs')
+    neo4j_import = parser.add_argument_group('import stage')
+    neo4j_import.add_argument('--database', default=None,
+                              help='The name of the Neo4j database, by default the NEO4J_DATABASE_NAME setting')
+    neo4j_import.add_argument('--batch-size', type=int, default=50, help='The number of records to import in a batch')
+    neo4j_import.add_argument('--test', action='store_true',
+                              help='Only import the first expeditions and their related data')
+    neo4j_import.add_argument('--test-size', type=int, default=100,
+                              help='The number of expeditions to import in test mode')
+    neo4j_import.add_argument('--skip-validation', action='store_true',
+                              help='Do not validate the data before replacing the database')
+    neo4j_import.add_argument('--blue-green', action='store_true',
+                              help='Import the data in a new versioned database and switch the --database alias to '
+                                   'it once checked, instead of replacing the database')
+    neo4j_import.add_argument('--profile-queries', action='store_true',
+                              help='Profile the first batch of each import query and save the query plan reports in '
+                                   'the import-profiles folder of the output folder')
+    args = parser.parse_args(argv)
+    unknown_stages = [stage for stage in args.stages if stage not in STAGES]
+    if unknown_stages:
+        parser.error(f'unknown stages {", ".join(unknown_stages)}, the stages are {", ".join(STAGES)}')
+    args.stages = [stage for stage in STAGES if stage in (args.stages or DEFAULT_STAGES)]
+    return args
+
+
+def run_stage(stage: str, stage_function: Callable[[], None], output_dir: Path, profile: str = 'none',
+              sampling_interval: float = 0.005) -> Dict:
+    """
+    Run a pipeline stage, measure its duration and profile it
+    :param stage: The name of the stage
+    :param stage_function: The function running the stage
+    :param output_dir: The folder of the profiles
+    :param profile: The profiler to use, none, cprofile or sampling. The cProfile profiles are saved to a .prof file,
+    readable with pstats or snakeviz, and the sampled stacks to a .collapsed.txt file. A summary of the functions taking
+    the most time is saved to a .txt file
+    :param sampling_interval: The sampling interval in seconds of the sampling profiler
+    :return: A dictionary with the STAGE, STATUS and SECONDS of the stage run, and the ERROR raised by the stage if it
+    failed
+    """
+    print(f'========> Running the {stage} stage')
+    if profile == 'cprofile':
+        profiler = cProfile.Profile()
+    elif profile == 'sampling':
+        profiler = SamplingProfiler(sampling_interval)
+    error = None
+    start = time.perf_counter()
+    if profile == 'cprofile':
+        profiler.enable()
+    elif profile == 'sampling':
+        profiler.start()
+    try:
+        stage_function()
+    except Exception as e:
+        error = e
+    finally:
+        if profile == 'cprofile':
+            profiler.disable()
+        elif profile == 'sampling':
+            profiler.stop()
+    seconds = round(time.perf_counter() - start, 3)
+    # The profile of a failed stage is saved as well, it may show where the stage failed
+    if profile == 'cprofile':
+        profiler.dump_stats(output_dir / f'{stage}.prof')
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(30)
+        (output_dir / f'{stage}.txt').write_text(summary.getvalue(), encoding='utf-8')
+    elif profile == 'sampling':
+        import pandas as pd
+        profiler.save(output_dir / f'{stage}.collapsed.txt')
+        top_functions_df = pd.DataFrame(profiler.top_functions(30),
+                                        columns=['FUNCTION', 'SELF_SAMPLES', 'TOTAL_SAMPLES'])
+        (output_dir / f'{stage}.txt').write_text(top_functions_df.to_string(index=False), encoding='utf-8')
+    status = 'success' if error is None else 'failed'
+    print(f'========> The {stage} stage took {seconds} seconds ({status})')
+    return {'STAGE': stage, 'STATUS': status, 'SECONDS': seconds, 'ERROR': error}
+
+
+def run_pipeline(args: argparse.Namespace) -> 'pd.DataFrame':
+    """
+    Run the selected pipeline stages and save their timing summary to the timings.csv file of the output folder
+    :param args: The parsed command line arguments
+    :return: The timing summary dataframe
+    """
+    import pandas as pd
+    output_dir = args.output_dir or RUNS_DIR / datetime.now().strftime('%Y%m%d-%H%M%S')
+    output_dir.mkdir(parents=True, exist_ok=True)
+    args.output_dir = output_dir
+    # The dataframes handed over in memory between the stages
+    args.frames = {}
+    timings = []
+    for stage in args.stages:
+        timings.append(run_stage(stage, lambda: STAGE_FUNCTIONS[stage](args), output_dir, args.profile,
+                                 args.sampling_interval))
+        # The next stages depend on the outputs of the failed stage
+        if timings[-1]['ERROR'] is not None:
+            break
+    timings_df = pd.DataFrame(timings, columns=['STAGE', 'STATUS', 'SECONDS'])
+    timings_df.to_csv(output_dir / 'timings.csv', index=False)
+    print(f'Timing summary saved in {output_dir}')
+    print(timings_df.to_string(index=False))
+    if timings[-1]['ERROR'] is not None:
+        print(f"Error running the {timings[-1]['STAGE']} stage", timings[-1]['ERROR'])
+        raise timings[-1]['ERROR']
+    return timings_df
+
+
+if __name__ == '__main__':
+    run_pipeline(parse_args())
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+
+BOOLEAN_TEXTS = {'True': True, 'False': False}
+
+
+def as_csv_values(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert the values of a dataframe handed over in memory to the next pipeline stage to the values the next stage
+    would read back from its CSV file: the empty strings are missing values and the text columns of numbers are numeric.
+    The stages then give the same results whether their input is handed over in memory or read from the files
+    :param df: The dataframe output by a stage
+    :return: A copy of the dataframe with the values of its CSV file
+    """
+    df = df.copy()
+    for column in df.columns[df.dtypes == object]:
+        values = df[column].replace('', np.nan)
+        # The boolean columns with missing values, and the True and False texts, are read back as booleans
+        if values.dropna().map(lambda x: isinstance(x, (bool, np.bool_)) or
+                                 (isinstance(x, str) and x in BOOLEAN_TEXTS)).all():
+            values = values.map(lambda x: BOOLEAN_TEXTS.get(x, x) if isinstance(x, str) else x)
+        else:
+            try:
+                values = pd.to_numeric(values)
+            except (ValueError, TypeError):
+                pass
+        df[column] = values
+    return df
@@ -0,0 +1,77 @@
+import re
+import sys
+import subprocess
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+# The data libraries used by all the stages are imported before measuring the import time of the modules, so the
+# measures only include the startup cost specific to each module
+PRELOADED_MODULES = ['numpy', 'pandas']
+# The maximum import time in milliseconds of each module, without the preloaded modules, and the heavy dependencies
+# which must only be imported on first use
+STARTUP_BUDGETS = {
+    'lib.data_collection.nhpp_collection': (100, ['selenium', 'bs4', 'lxml', 'dms2dec', 'dbfread', 'httpx',
+                                                 'requests', 'shapely', 'tqdm']),
+    'lib.data_collection.nhpp_preprocessing': (40, ['selenium', 'bs4', 'httpx', 'requests', 'shapely']),
+    'lib.data_collection.http_cache': (20, ['requests']),
+    'lib.data_collection.async_fetcher': (60, ['httpx', 'requests']),
+    'lib.data_etl.etl_staging': (40, ['neo4j', 'dotenv']),
+    'lib.data_etl.merge_processing': (20, ['neo4j', 'dotenv']),
+    'lib.neo4j_import.neo4j_import': (40, ['neo4j', 'dotenv', 'tqdm']),
+    'lib.neo4j_import.index_advisor': (40, ['neo4j', 'dotenv', 'tqdm']),
+    'lib.neo4j_import.blue_green': (40, ['neo4j', 'dotenv', 'tqdm']),
+    'lib.neo4j_import.benchmark.query_benchmark': (40, ['neo4j', 'dotenv']),
+    'lib.neo4j_import.query_client': (40, ['neo4j', 'dotenv']),
+    'lib.pipeline.__main__': (40, ['pandas', 'numpy', 'neo4j', 'selenium', 'bs4', 'httpx', 'requests', 'dbfread'])
+}
+# An import time line: "import time: <self us> | <cumulative us> | <indentation><module>"
+IMPORT_TIME_REGEX = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$')
+
+
+def measure_import_time(module: str, preloaded_modules: List[str] = None) -> Dict[str, Tuple[int, int]]:
+    """
+    Measure the import time of a module and of all the modules it imports in a new Python process with the
+    -X importtime option
+    :param module: The name of the module to import
+    :param preloaded_modules: The modules imported before the module, by default the PRELOADED_MODULES. Pass an empty
+    list to measure the full startup cost of the module
+    :return: A dictionary of the self and cumulative import times in microseconds of each module imported by the
+    module, excluding the preloaded modules and their dependencies
+    """
+    preloaded_modules = PRELOADED_MODULES if preloaded_modules is None else preloaded_modules
+    statements = [f'import {preloaded_module}' for preloaded_module in preloaded_modules] + [f'import {module}']
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', '; '.join(statements)], cwd=ROOT_DIR,
+                             capture_output=True, text=True)
+    if process.returncode != 0:
+        print(f'Error importing the {module} module', process.stderr)
+        raise RuntimeError(f'The {module} module could not be imported')
+    import_times = {}
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME_REGEX.match(line)
+        if not match:
+            continue
+        self_time, cumulative_time, indentation, name = match.groups()
+        # The modules are listed when their import completes, so the modules listed before the end of the import of
+        # the last preloaded module are the preloaded modules and their dependencies
+        if len(indentation) == 1 and name in preloaded_modules:
+            import_times = {}
+        else:
+            import_times[name] = (int(self_time), int(cumulative_time))
+    return import_times
+
+
+def heaviest_imports(import_times: Dict[str, Tuple[int, int]], limit: int = 5) -> List[Tuple[str, float]]:
+    """
+    Get the top level packages taking the most time to import
+    :param import_times: The import times returned by measure_import_time
+    :param limit: The maximum number of packages to return
+    :return: A list of (package, self import time in milliseconds of all its modules) tuples sorted by decreasing time
+    """
+    package_times = {}
+    for name, (self_time, _) in import_times.items():
+        package = name.split('.')[0]
+        package_times[package] = package_times.get(package, 0) + self_time / 1000
+    return sorted(package_times.items(), key=lambda package_time: -package_time[1])[:limit]
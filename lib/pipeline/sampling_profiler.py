@@ -0,0 +1,80 @@
+import sys
+import threading
+
+from pathlib import Path
+from collections import Counter
+from typing import List, Optional, Tuple
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        """
+        Statistical profiler sampling the call stack of a thread at a regular interval. Unlike cProfile, it does not
+        instrument every function call, so its overhead is low and does not depend on the number of calls, which makes
+        it suitable for profiling long running stages. The sampled stacks are saved in the collapsed stacks format
+        read by the flame graph tools (e.g. speedscope or flamegraph.pl).
+        :param interval: The sampling interval in seconds
+        :param thread_id: The identifier of the profiled thread, by default the thread starting the profiler
+        """
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples = Counter()
+        self._stop_event = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop_event.clear()
+        self._sampler = threading.Thread(target=self._sample, name='sampling-profiler', daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._sampler.join()
+
+    def __enter__(self) -> 'SamplingProfiler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _sample(self):
+        """Record the call stack of the profiled thread until the profiler is stopped"""
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{Path(code.co_filename).name}:{code.co_name}')
+                frame = frame.f_back
+            if stack:
+                # The collapsed stacks go from the outermost to the innermost function
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def top_functions(self, limit: int = 20) -> List[Tuple[str, int, int]]:
+        """
+        Get the functions in which the most samples were taken
+        :param limit: The maximum number of functions to return
+        :return: A list of (function, self samples, total samples) tuples sorted by decreasing total samples. The self
+        samples are taken in the function itself, the total samples include the functions it called
+        """
+        self_samples = Counter()
+        total_samples = Counter()
+        for stack, count in self.samples.items():
+            functions = stack.split(';')
+            self_samples[functions[-1]] += count
+            # Count recursive functions only once per sample
+            for function in set(functions):
+                total_samples[function] += count
+        return [(function, self_samples[function], count) for function, count in total_samples.most_common(limit)]
+
+    def save(self, profile_file: Path):
+        """
+        Save the sampled stacks in the collapsed stacks format, one "outer;...;inner count" line per stack
+        :param profile_file: The path of the profile file
+        """
+        with open(profile_file, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f'{stack} {count}\n')
@@ -0,0 +1,23 @@
+# Benchmark of the startup cost of the pipeline modules, checked against their import time budgets
+# Run it from the repository root folder with:
+# python -m lib.pipeline.tests.bench_import_time
+import sys
+
+from lib.pipeline.import_time import measure_import_time, heaviest_imports, STARTUP_BUDGETS, PRELOADED_MODULES
+
+
+if __name__ == '__main__':
+    repeat = 5
+    over_budget = []
+    print(f'Import time of the modules after importing {", ".join(PRELOADED_MODULES)}, best of {repeat} runs')
+    for module, (budget, _) in STARTUP_BUDGETS.items():
+        runs = [measure_import_time(module) for _ in range(repeat)]
+        best_run = min(runs, key=lambda import_times: import_times[module][1])
+        import_time = best_run[module][1] / 1000
+        heaviest = ', '.join(f'{package} {package_time:.1f} ms' for package, package_time in heaviest_imports(best_run))
+        print(f'{module}: {import_time:.1f} ms (budget {budget} ms) - {heaviest}')
+        if import_time > budget:
+            over_budget.append(module)
+    if over_budget:
+        print(f'Modules over their import time budget: {", ".join(over_budget)}')
+        sys.exit(1)
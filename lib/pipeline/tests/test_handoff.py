@@ -0,0 +1,57 @@
+import io
+import numpy as np
+import pandas as pd
+
+import lib.data_etl.etl_staging as etl_staging
+import lib.data_etl.merge_processing as merge_processing
+import lib.data_collection.nhpp_preprocessing as nhpp_preprocessing
+
+from lib.pipeline.__main__ import parse_args, STAGE_FUNCTIONS
+from lib.pipeline.handoff import as_csv_values
+
+
+def test_as_csv_values():
+    staged_df = pd.DataFrame({
+        'EXPID': ['EVER53101', 'EVER60101', 'LHOT70101'],
+        'YEAR': [1953, 1960, 1970],
+        'SUCCESS1': [True, False, True],
+        'STDRTE': ['True', '', 'False'],
+        'PSTATUS': pd.Series([True, np.nan, False], dtype=object),
+        'YOB': [1919, '', 1935],
+        'PYEAR': ['1953', '1960', ''],
+        'SMTDATE': ['1953-05-29', '', '1970-05-12'],
+        'HEIGHTM': [8849.0, np.nan, 8516.0],
+        'ROUTEMEMO': ['', '', '']
+    })
+    # The dataframe handed over in memory has the values read back from its CSV file by the next stage
+    csv_df = pd.read_csv(io.StringIO(staged_df.to_csv(index=False)))
+    pd.testing.assert_frame_equal(as_csv_values(staged_df), csv_df)
+    # The dataframe of the stage is not modified
+    assert staged_df['YOB'].tolist() == [1919, '', 1935]
+
+
+def test_stages_handoff(monkeypatch):
+    nepal_peaks_df = pd.DataFrame({'PEAKID': ['EVER', 'LHOT'], 'LAT': ['27.98', '']})
+    staged_data = {'expeditions': pd.DataFrame({'EXPID': ['EVER53101'], 'SUCCESS1': [True]}),
+                   'members': pd.DataFrame({'EXPID': ['EVER53101'], 'YOB': ['']}),
+                   'peaks': pd.DataFrame({'PEAKID': ['EVER', 'LHOT'], 'HEIGHTM': [8849, 8516]})}
+    merge_inputs = {}
+
+    def merge_processed_data(nepal_peaks_df=None, staged_data=None):
+        merge_inputs.update(nepal_peaks_df=nepal_peaks_df, staged_data=staged_data)
+        return {**staged_data, 'peaks': staged_data['peaks'].merge(nepal_peaks_df, on='PEAKID')}
+
+    monkeypatch.setattr(nhpp_preprocessing, 'merge_nepal_peaks_datasets', lambda: nepal_peaks_df)
+    monkeypatch.setattr(etl_staging, 'stage_hd_data', lambda: staged_data)
+    monkeypatch.setattr(merge_processing, 'merge_processed_data', merge_processed_data)
+    args = parse_args([])
+    args.frames = {}
+    for stage in ['preprocessing', 'staging', 'merge']:
+        STAGE_FUNCTIONS[stage](args)
+    # The merge stage gets the outputs of the previous stages with the values of their files
+    assert merge_inputs['nepal_peaks_df']['LAT'].tolist()[0] == 27.98
+    assert sorted(merge_inputs['staged_data']) == ['expeditions', 'members', 'peaks']
+    assert merge_inputs['staged_data']['members']['YOB'].isna().all()
+    # The import stage gets the processed dataframes
+    assert sorted(args.frames) == ['expeditions', 'members', 'peaks']
+    assert args.frames['peaks']['PEAKID'].tolist() == ['EVER', 'LHOT']
@@ -0,0 +1,24 @@
+import pytest
+
+from lib.pipeline.import_time import measure_import_time, heaviest_imports, STARTUP_BUDGETS
+
+
+def test_measure_import_time():
+    import_times = measure_import_time('lib.data_etl.merge_processing')
+    assert 'lib.data_etl.merge_processing' in import_times
+    # The preloaded modules are not included in the measures
+    assert 'pandas' not in import_times
+    self_time, cumulative_time = import_times['lib.data_etl.merge_processing']
+    assert 0 < self_time <= cumulative_time
+    assert 'pandas' in measure_import_time('lib.data_etl.merge_processing', preloaded_modules=[])
+    assert heaviest_imports({'shapely': (10, 90), 'shapely.lib': (80, 80), 'json': (5, 5)}) == \
+           [('shapely', 0.09), ('json', 0.005)]
+
+
+@pytest.mark.parametrize('module', STARTUP_BUDGETS.keys())
+def test_lazy_dependencies(module):
+    # The heavy dependencies of the modules are only imported when they are used
+    _, lazy_dependencies = STARTUP_BUDGETS[module]
+    imported_packages = {name.split('.')[0] for name in measure_import_time(module, preloaded_modules=[])}
+    assert imported_packages.isdisjoint(lazy_dependencies), \
+        f'{module} imports {", ".join(imported_packages.intersection(lazy_dependencies))} at startup'
@@ -0,0 +1,58 @@
+import pstats
+import pytest
+import pandas as pd
+
+from lib.pipeline.__main__ import parse_args, run_stage, run_pipeline, STAGE_FUNCTIONS, DEFAULT_STAGES
+from lib.pipeline.sampling_profiler import SamplingProfiler
+
+
+def busy_function(n: int = 200000) -> int:
+    return sum(i * i for i in range(n))
+
+
+def test_parse_args():
+    assert parse_args([]).stages == DEFAULT_STAGES
+    # The stages run in the pipeline order whatever the order of the arguments
+    args = parse_args(['import', 'collection', '--batch-size', '500', '--workers', '4', '--profile', 'sampling'])
+    assert args.stages == ['collection', 'import']
+    assert (args.batch_size, args.workers, args.profile) == (500, 4, 'sampling')
+    with pytest.raises(SystemExit):
+        parse_args(['scraping'])
+
+
+def test_sampling_profiler(tmp_path):
+    with SamplingProfiler(interval=0.001) as profiler:
+        for _ in range(20):
+            busy_function()
+    assert sum(profiler.samples.values()) > 0
+    # The busy function is in the stacks of most samples, the innermost function being its generator expression
+    total_samples = {function: total for function, _, total in profiler.top_functions(limit=100)}
+    assert total_samples['test_pipeline.py:busy_function'] >= 0.5 * sum(profiler.samples.values())
+    profiler.save(tmp_path / 'stage.collapsed.txt')
+    stack, count = (tmp_path / 'stage.collapsed.txt').read_text().splitlines()[0].rsplit(' ', 1)
+    assert int(count) > 0 and 'test_pipeline.py:test_sampling_profiler' in stack.split(';')
+
+
+def test_run_stage(tmp_path):
+    timing = run_stage('staging', busy_function, tmp_path, profile='cprofile')
+    assert timing['STATUS'] == 'success' and timing['SECONDS'] >= 0
+    stats = pstats.Stats(str(tmp_path / 'staging.prof'))
+    assert any(function == 'busy_function' for _, _, function in stats.stats)
+    assert (tmp_path / 'staging.txt').exists()
+
+
+def test_run_pipeline(tmp_path, monkeypatch):
+    def fail(args):
+        raise ValueError('No staged data')
+
+    stages_run = []
+    monkeypatch.setitem(STAGE_FUNCTIONS, 'preprocessing', lambda args: stages_run.append('preprocessing'))
+    monkeypatch.setitem(STAGE_FUNCTIONS, 'merge', fail)
+    monkeypatch.setitem(STAGE_FUNCTIONS, 'import', lambda args: stages_run.append('import'))
+    with pytest.raises(ValueError):
+        run_pipeline(parse_args(['preprocessing', 'merge', 'import', '--output-dir', str(tmp_path)]))
+    # The stages after the failed stage are not run
+    assert stages_run == ['preprocessing']
+    timings_df = pd.read_csv(tmp_path / 'timings.csv')
+    assert timings_df['STAGE'].tolist() == ['preprocessing', 'merge']
+    assert timings_df['STATUS'].tolist() == ['success', 'failed']